@@ -1,87 +1,76 @@
 # app.py
 
-from flask import Flask, Response
-import cv2
+from flask import Flask, Response, abort, jsonify, request
+import os
+import sys
 import threading
-import time
 
-# === KAMERA BİLGİLERİ (Kolay erişim için sabit olarak tanımlandı) ===
-CAMERA_IP = '192.168.1.64'
-CAMERA_USER = 'admin'
-CAMERA_PASS = 'ErenEnerji'
-
-# RTSP URL'leri
-RTSP_URL_NORMAL = f'rtsp://{CAMERA_USER}:{CAMERA_PASS}@{CAMERA_IP}:554/Streaming/Channels/101'
-RTSP_URL_THERMAL = f'rtsp://{CAMERA_USER}:{CAMERA_PASS}@{CAMERA_IP}:554/Streaming/Channels/201'
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from ortak.frame_bus import FrameBus
+from ortak.isapi_client import ISAPIClient
+from ortak.mjpeg_cache import SharedJPEGEncoder, relay_bus
+from ortak.stream_profiles import StreamProfileManager, THERMAL, VISIBLE
 
-# Global değişkenler - Farklı thread'lerin iletişim kurması için
-normal_frame = None
-thermal_frame = None
-lock = threading.Lock() # Frame'lere erişirken çakışmayı önlemek için kilit
+# === KAMERA BİLGİLERİ (Kolay erişim için sabit olarak tanımlandı) ===
+# Ortam değişkenleriyle ezilebilir (ör. benchmarks/camera_simulator.py ile yerel test için).
+CAMERA_IP = os.environ.get('CAMERA_IP', '192.168.1.64')
+CAMERA_PORT = int(os.environ.get('CAMERA_PORT', 80))
+CAMERA_USER = os.environ.get('CAMERA_USER', 'admin')
+CAMERA_PASS = os.environ.get('CAMERA_PASS', 'ErenEnerji')
+RTSP_PORT = int(os.environ.get('RTSP_PORT', 554))
+
+# RTSP URL'leri: MJPEG önizleme 640x360 gösterildiği için ana akış yerine alt akış (102/202) çözülür.
+# Profiller okunamazsa ana akışa (101/201) dönülür.
+stream_profiles = StreamProfileManager(ISAPIClient.for_camera(CAMERA_IP, CAMERA_USER, CAMERA_PASS, CAMERA_PORT),
+                                       CAMERA_IP, CAMERA_USER, CAMERA_PASS, RTSP_PORT)
+
+# Akış başına tek çözücü. Kareler kilitli bir global değişkene kopyalanmak yerine veri yolunda
+# salt okunur yayınlanır; URL her bağlanışta çözülür.
+buses = {
+    "normal": FrameBus(lambda: stream_profiles.display_url(VISIBLE), "normal"),
+    "thermal": FrameBus(lambda: stream_profiles.display_url(THERMAL), "thermal"),
+}
+
+# Her akış için tek kodlayıcı: bir kare kaç izleyici olursa olsun katman başına sadece bir kez JPEG'e çevrilir.
+encoders = {
+    "normal": SharedJPEGEncoder(),
+    "thermal": SharedJPEGEncoder(),
+}
 
 # Flask uygulamasını oluştur
 app = Flask(__name__)
 
-def capture_frames(rtsp_url, frame_type):
+def capture_frames(frame_type):
     """
-    Belirtilen RTSP URL'sinden sürekli olarak video kareleri yakalar ve global bir değişkene yazar.
+    Akışın veri yolunu başlatır ve karelerini ortak kodlayıcıya aktarır.
     Bu fonksiyon bir thread içinde çalışacak.
+
+    Çözülen dizi kopyalanmadan kodlayıcıya geçer; yakalama ile izleyiciler arasında ortak kilit
+    yoktur. İzleyen yokken çözücü sadece grab() yapar (renk dönüşümü, kopya ve kodlama yok).
     """
-    global normal_frame, thermal_frame
-
-    while True:
-        try:
-            cap = cv2.VideoCapture(rtsp_url)
-            if not cap.isOpened():
-                print(f"HATA: {frame_type} akışı açılamadı. 5 saniye sonra tekrar denenecek.")
-                time.sleep(5)
-                continue
-
-            print(f"BAŞARILI: {frame_type} akışına bağlanıldı.")
-            
-            while True:
-                ret, frame = cap.read()
-                if not ret:
-                    print(f"UYARI: {frame_type} akışından veri alınamadı. Yeniden bağlanılıyor...")
-                    break # İç döngüyü kırarak yeniden bağlantı kurulmasını sağla
-
-                with lock:
-                    if frame_type == "normal":
-                        normal_frame = frame.copy()
-                    elif frame_type == "thermal":
-                        thermal_frame = frame.copy()
-        except Exception as e:
-            print(f"{frame_type} thread'inde hata oluştu: {e}")
-            time.sleep(5) # Hata durumunda 5 saniye bekle ve tekrar dene
-
-def generate_stream(frame_type):
+    bus = buses[frame_type]
+    bus.add_status_listener(lambda status: print(f"{frame_type} akışı: {status}"))
+    bus.start()
+    relay_bus(bus, encoders[frame_type])
+
+def generate_stream(frame_type, tier=None):
     """
-    Global değişkendeki kareyi alıp MJPEG formatında bir HTTP yanıtı olarak yayınlar.
+    Akışın ortak kodlayıcısındaki JPEG'leri MJPEG formatında bir HTTP yanıtı olarak yayınlar.
+    Yeni kare gelene kadar bekler; aynı kareyi iki kez göndermez. Katman (çözünürlük + kalite)
+    istemcinin ölçülen gönderim hızına göre seçilir; tier verilirse o katman sabit kullanılır.
     """
-    global normal_frame, thermal_frame
-
-    while True:
-        with lock:
-            if frame_type == "normal":
-                frame = normal_frame
-            elif frame_type == "thermal":
-                frame = thermal_frame
-            else:
-                frame = None
-
-        if frame is None:
-            # Henüz bir kare yakalanmadıysa veya akış koptuysa bekle
-            time.sleep(0.1)
-            continue
-        
-        # Kareyi JPEG formatına dönüştür
-        (flag, encodedImage) = cv2.imencode(".jpg", frame)
-        if not flag:
-            continue
-
-        # HTTP yanıtı olarak kareyi yield et (stream et)
-        yield (b'--frame\r\n'
-               b'Content-Type: image/jpeg\r\n\r\n' + bytearray(encodedImage) + b'\r\n')
+    encoder = encoders.get(frame_type)
+    if encoder is None:
+        return
+    yield from encoder.stream(tier=tier)
+
+def stream_response(frame_type):
+    # ?katman=320x180 gibi bir değer katmanı sabitler; verilmezse uyarlamalı seçilir.
+    tier = request.args.get('katman')
+    if tier is not None and encoders[frame_type].tier_index(tier) is None:
+        abort(400, f"Geçersiz katman. Seçenekler: {', '.join(t.name for t in encoders[frame_type].tiers)}")
+    return Response(generate_stream(frame_type, tier),
+                    mimetype="multipart/x-mixed-replace; boundary=frame")
 
 # === API Uç Noktaları (Endpoints) ===
 
@@ -120,20 +109,32 @@ def index():
 @app.route("/stream/normal")
 def stream_normal():
     """Normal kamera için video akışını sunar."""
-    return Response(generate_stream("normal"),
-                    mimetype="multipart/x-mixed-replace; boundary=frame")
+    return stream_response("normal")
 
 @app.route("/stream/thermal")
 def stream_thermal():
     """Termal kamera için video akışını sunar."""
-    return Response(generate_stream("thermal"),
-                    mimetype="multipart/x-mixed-replace; boundary=frame")
+    return stream_response("thermal")
+
+@app.route("/stats")
+def stats():
+    """Akış başına izleyici, kodlanan ve gönderilen kare sayıları, katman dağılımı ve çözücünün durumu."""
+    return jsonify({name: {**encoder.stats(), 'bus': buses[name].stats()} for name, encoder in encoders.items()})
+
+@app.route("/profiles")
+def profiles():
+    """Kameranın akış profilleri ve önizlemede alt akış kullanmanın kazancı."""
+    return jsonify({
+        'profiles': {ch: p.as_dict() for ch, p in sorted(stream_profiles.profiles().items())},
+        'normal': stream_profiles.saving(VISIBLE),
+        'thermal': stream_profiles.saving(THERMAL),
+    })
 
 
 if __name__ == '__main__':
     # Arka planda video karelerini yakalamak için thread'leri başlat
-    normal_thread = threading.Thread(target=capture_frames, args=(RTSP_URL_NORMAL, "normal"), daemon=True)
-    thermal_thread = threading.Thread(target=capture_frames, args=(RTSP_URL_THERMAL, "thermal"), daemon=True)
+    normal_thread = threading.Thread(target=capture_frames, args=("normal",), daemon=True)
+    thermal_thread = threading.Thread(target=capture_frames, args=("thermal",), daemon=True)
     
     normal_thread.start()
     thermal_thread.start()
@@ -1,11 +1,15 @@
 # app.py
 
 from flask import Flask, Response, jsonify, request
-from camera_manager import CameraManager
+from async_camera_manager import AsyncCameraManager
 import cv2
+import os
+import time
 
 app = Flask(__name__)
-manager = CameraManager()
+# Tüm kameralar tek bir asyncio event loop'unda çalışır; Flask istekleri loop'a call() ile iş gönderir.
+manager = AsyncCameraManager(os.environ.get('CAMERA_CONFIG', 'config.json'),
+                             store_dir=os.environ.get('THERMOMETRY_STORE_DIR', 'thermometry_db'))
 
 # === Video Akışı Bölümü (Değişiklik yok) ===
 # ... (Önceki koddan generate_stream fonksiyonu)
@@ -30,6 +34,8 @@ def ptz_goto(camera_id):
     worker = manager.get_worker(camera_id)
     if not worker:
         return jsonify({"error": "Kamera bulunamadı"}), 404
+    if not worker.ready:
+        return jsonify({"error": "Kameranın PTZ bağlantısı henüz hazır değil"}), 503
         
     data = request.json
     pan = data.get('pan')
@@ -38,11 +44,34 @@ def ptz_goto(camera_id):
     if pan is None or tilt is None:
         return jsonify({"error": "Eksik parametre: pan ve tilt gerekli"}), 400
         
-    worker.set_manual_override() # Otonom taramayı durdur
-    worker.go_to_degree(pan, tilt) # İstenen pozisyona git
+    manager.call(worker.set_manual_override()) # Otonom taramayı durdur
+    manager.call(worker.go_to_degree(pan, tilt)) # İstenen pozisyona git
     
     return jsonify({"status": "ok", "message": f"Kamera {camera_id}, {pan}°/{tilt}° pozisyonuna gidiyor."})
 
+@app.route("/api/health", methods=['GET'])
+def get_health():
+    """Her kameranın akış, PTZ ve bağlantı durumunu döndürür."""
+    return jsonify(manager.health())
+
+@app.route("/api/cameras/<int:camera_id>/thermometry/<int:rule_id>", methods=['GET'])
+def get_thermometry_history(camera_id, rule_id):
+    """
+    Bir kuralın Max/Min/Ortalama geçmişini döndürür. Parametreler: start, end (epoch saniye,
+    varsayılan son 1 saat), resolution (auto, raw, 1m, 15m, 1h), max_points.
+    """
+    if manager.get_worker(camera_id) is None:
+        return jsonify({"error": "Kamera bulunamadı"}), 404
+    end = request.args.get('end', time.time(), type=float)
+    start = request.args.get('start', end - 3600, type=float)
+    try:
+        result = manager.store.query(camera_id, 2, rule_id, start, end,
+                                     request.args.get('resolution', 'auto'),
+                                     request.args.get('max_points', 2000, type=int))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"camera_id": camera_id, "rule_id": rule_id, "start": start, "end": end, **result.as_dict()})
+
 # ... Diğer API endpoint'leri (move, zoom, vs.) buraya eklenebilir ...
 
 if __name__ == '__main__':
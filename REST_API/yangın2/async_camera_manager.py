@@ -0,0 +1,345 @@
+# async_camera_manager.py
+
+import os
+import sys
+import asyncio
+import threading
+import time
+import json
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+import httpx
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from ortak.async_isapi import AsyncISAPIClient
+from ortak.ptz_tracker import PTZState, parse_ptz_status
+from ortak.thermometry_store import ThermometryStore
+
+THERMOMETRY_PATH = '/ISAPI/Thermal/channels/2/thermometry/realTimethermometry/rules?format=json'
+PTZ_STATUS_PATH = '/ISAPI/PTZCtrl/channels/1/status'
+PTZ_ABSOLUTE_PATH = '/ISAPI/PTZCtrl/channels/1/absolute'
+PTZ_CONTINUOUS_PATH = '/ISAPI/PTZCtrl/channels/1/continuous'
+
+# Kamera yapılandırmasında belirtilmezse kullanılan süreler (saniye)
+DEFAULT_ALARM_COOLDOWN = 60.0
+PTZ_FAST_INTERVAL = 0.2
+PTZ_IDLE_INTERVAL = 5.0
+HEALTH_INTERVAL = 10.0
+STALE_AFTER = 30.0
+
+
+class Alarm(NamedTuple):
+    """Eşik aşımı. received_at mesajın alındığı, detected_at alarmın üretildiği andır (time.time())."""
+    camera_id: int
+    temperature: float
+    rule_id: int | None
+    received_at: float
+    detected_at: float
+    data: dict
+
+
+def max_temperature(data: dict):
+    """realTimethermometry mesajındaki en yüksek kural sıcaklığını (sıcaklık, kural_id) olarak döndürür."""
+    uploads = data.get('ThermometryUploadList', {}).get('ThermometryUpload', [])
+    if isinstance(uploads, dict):
+        uploads = [uploads]
+    best = (None, None)
+    for upload in uploads:
+        temp = upload.get('LinePolygonThermCfg', {}).get('MaxTemperature')
+        if temp is not None and (best[0] is None or temp > best[0]):
+            best = (temp, upload.get('ruleID'))
+    return best
+
+
+# Her kamera, tek event loop üzerinde çalışan işbirlikçi görevlerden oluşur.
+class AsyncCameraWorker:
+    def __init__(self, config, manager):
+        self.config = config
+        self.manager = manager
+        self.id = config['id']
+        self.isapi = AsyncISAPIClient(config['ip'], config['user'], config['password'], port=config.get('port', 80))
+        self.ptz_limits = {'pan_min': 0, 'pan_max': 360, 'tilt_min': -90, 'tilt_max': 90}
+        self.alarm_cooldown = config.get('alarm_cooldown', DEFAULT_ALARM_COOLDOWN)
+
+        self.manual_override = False
+        self.last_manual_command_time = 0
+
+        self.status = "Başlatılıyor"
+        self.thermal_data = {}
+        self.ptz_state: PTZState | None = None
+        self.messages = 0
+        self.reconnects = 0
+        self.last_message_time = 0.0
+        self.last_alarm_time = 0.0
+        self.online = False
+
+        self._fast_until = 0.0
+        self._ptz_wake = asyncio.Event()
+        self._tasks = []
+
+    @property
+    def ready(self) -> bool:
+        """Kameradan en az bir PTZ durumu alındı; komutlar gönderilebilir."""
+        return self.ptz_state is not None
+
+    def start(self):
+        self._tasks = [
+            asyncio.create_task(self.thermometry_loop(), name=f"kamera{self.id}-termal"),
+            asyncio.create_task(self.scan_loop(), name=f"kamera{self.id}-tarama"),
+            asyncio.create_task(self.ptz_status_loop(), name=f"kamera{self.id}-ptz"),
+            asyncio.create_task(self.health_loop(), name=f"kamera{self.id}-saglik"),
+        ]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self.ready:
+            try:
+                await self.stop_motion()
+            except httpx.HTTPError:
+                pass
+        await self.isapi.aclose()
+        print(f"Kamera {self.id} worker durduruldu.")
+
+    # --- Görevler ---
+    async def thermometry_loop(self):
+        """realTimethermometry akışını okur; ayrıştırma yöneticinin işçi havuzunda yapılır."""
+        while True:
+            try:
+                self.status = "Termal Veri: Bağlanıyor"
+                async for received_at, data in self.isapi.stream_json(THERMOMETRY_PATH, executor=self.manager.parse_pool):
+                    self.status = "Termal Veri: Bağlandı"
+                    self.thermal_data = data
+                    self.messages += 1
+                    self.last_message_time = received_at
+                    if self.manager.store is not None:
+                        self.manager.store.append_message(self.id, data, received_at)
+                    self.check_alarm(data, received_at)
+            except httpx.HTTPError as e:
+                self.status = "Termal Veri: Bağlantı Hatası"
+                self.reconnects += 1
+                print(f"Kamera {self.id}: termal veri bağlantı hatası: {e}. 5 saniye sonra tekrar denenecek.")
+                await asyncio.sleep(5)
+            except Exception as e:
+                self.status = "Termal Veri: Bağlantı Hatası"
+                self.reconnects += 1
+                print(f"Kamera {self.id}: beklenmedik termal veri hatası: {e}. 10 saniye sonra tekrar denenecek.")
+                await asyncio.sleep(10)
+
+    def check_alarm(self, data: dict, received_at: float):
+        temperature, rule_id = max_temperature(data)
+        threshold = self.config['anomaly_detection']['thermal_threshold']
+        if temperature is None or temperature < threshold:
+            return
+        if received_at - self.last_alarm_time < self.alarm_cooldown:
+            return
+        self.last_alarm_time = received_at
+        self.manager.publish_alarm(Alarm(self.id, temperature, rule_id, received_at, time.time(), data))
+
+    async def scan_loop(self):
+        """Otonom tarama döngüsü."""
+        scan_params = self.config['autonomous_scan']
+        if not scan_params['enabled']:
+            return
+        while True:
+            try:
+                if self.manual_override:
+                    if time.time() - self.last_manual_command_time > self.config['manual_override_timeout']:
+                        print(f"Kamera {self.id}: Manuel kontrol zaman aşımına uğradı, otonom taramaya dönülüyor.")
+                        self.manual_override = False
+                    else:
+                        await asyncio.sleep(1)
+                        continue
+
+                for pan in (scan_params['pan_start'], scan_params['pan_end']):
+                    if self.manual_override:
+                        break
+                    await self.go_to_degree(pan, scan_params['tilt'])
+                    await asyncio.sleep(scan_params['dwell_time'])
+            except httpx.HTTPError as e:
+                print(f"Kamera {self.id} tarama döngüsü hatası: {e}")
+                await asyncio.sleep(5)
+
+    async def ptz_status_loop(self):
+        """PTZ konumunu hareket sırasında sık, boştayken seyrek sorgular (PTZTracker'ın asenkron karşılığı)."""
+        fast_interval = self.config.get('ptz_fast_interval', PTZ_FAST_INTERVAL)
+        idle_interval = self.config.get('ptz_idle_interval', PTZ_IDLE_INTERVAL)
+        error_streak = 0
+        while True:
+            try:
+                await self.poll_ptz_status()
+                error_streak = 0
+            except (httpx.HTTPError, ValueError) as e:
+                error_streak += 1
+                if error_streak == 1:
+                    print(f"Kamera {self.id}: PTZ durumu alınamadı: {e}")
+            interval = fast_interval if time.time() < self._fast_until else idle_interval
+            if error_streak:
+                interval = max(interval, min(idle_interval, 0.5 * error_streak))
+            try:
+                await asyncio.wait_for(self._ptz_wake.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+            self._ptz_wake.clear()
+
+    async def poll_ptz_status(self) -> PTZState:
+        response = await self.isapi.get(PTZ_STATUS_PATH, timeout=1.0)
+        response.raise_for_status()
+        parsed = parse_ptz_status(response.content)
+        if parsed is None:
+            raise ValueError("PTZ XML yanıtında 'azimuth' veya 'elevation' bulunamadı")
+        now = time.time()
+        previous = self.ptz_state
+        moved = previous is not None and parsed != (previous.pan, previous.tilt, previous.zoom)
+        if moved:
+            self._fast_until = max(self._fast_until, now + 1.0)
+        self.ptz_state = PTZState(*parsed, now, moved)
+        return self.ptz_state
+
+    async def health_loop(self):
+        """Akış durgunlaştıysa kamerayı çevrimdışı işaretler."""
+        interval = self.config.get('health_interval', HEALTH_INTERVAL)
+        while True:
+            await asyncio.sleep(interval)
+            now = time.time()
+            fresh_ptz = self.ptz_state is not None and now - self.ptz_state.timestamp < STALE_AFTER
+            fresh_data = now - self.last_message_time < STALE_AFTER
+            online = fresh_ptz or fresh_data
+            if online != self.online:
+                print(f"Kamera {self.id}: {'çevrimiçi' if online else 'çevrimdışı'}")
+            self.online = online
+
+    # --- PTZ Kontrol Metotları ---
+    def notify_move(self, duration: float = 0.0):
+        self._fast_until = max(self._fast_until, time.time() + duration + 1.0)
+        self._ptz_wake.set()
+
+    async def set_manual_override(self):
+        """Manuel kontrolü başlatır."""
+        self.manual_override = True
+        self.last_manual_command_time = time.time()
+        await self.stop_motion()
+        print(f"Kamera {self.id}: Manuel kontrol devralındı.")
+
+    async def stop_motion(self):
+        xml = '<PTZData><pan>0</pan><tilt>0</tilt></PTZData>'
+        response = await self.isapi.put(PTZ_CONTINUOUS_PATH, content=xml, timeout=2.0)
+        response.raise_for_status()
+
+    async def go_to_degree(self, pan_deg, tilt_deg):
+        """ISAPI AbsoluteHigh ile mutlak konuma gider; değerler kameraya 10 ile çarpılarak gönderilir."""
+        pan_deg = max(self.ptz_limits['pan_min'], min(self.ptz_limits['pan_max'], pan_deg))
+        tilt_deg = max(self.ptz_limits['tilt_min'], min(self.ptz_limits['tilt_max'], tilt_deg))
+        zoom = self.ptz_state.zoom if self.ptz_state and self.ptz_state.zoom else 1.0
+        xml = (f'<PTZData><AbsoluteHigh><elevation>{int(tilt_deg * 10)}</elevation>'
+               f'<azimuth>{int(pan_deg * 10)}</azimuth><absoluteZoom>{int(zoom * 10)}</absoluteZoom>'
+               f'</AbsoluteHigh></PTZData>')
+        response = await self.isapi.put(PTZ_ABSOLUTE_PATH, content=xml, timeout=2.0)
+        response.raise_for_status()
+        self.notify_move()
+
+    def health(self) -> dict:
+        return {
+            'id': self.id,
+            'status': self.status,
+            'online': self.online,
+            'messages': self.messages,
+            'reconnects': self.reconnects,
+            'last_message_time': self.last_message_time,
+            'ptz': self.ptz_state.as_dict() if self.ptz_state else None,
+            'manual_override': self.manual_override,
+        }
+
+
+class AsyncCameraManager:
+    """
+    Tüm kameraları tek bir asyncio event loop'unda çalıştırır.
+
+    Kamera başına iki OS thread'i yerine dört işbirlikçi görev (termal akış, tarama,
+    PTZ durumu, sağlık) açılır; akış ayrıştırma gibi CPU işleri sınırlı bir işçi
+    havuzunda yapılır. Flask gibi senkron kodlar call() ile loop'a iş gönderir.
+
+        manager = AsyncCameraManager('config.json')
+        manager.start_all()
+        manager.call(manager.get_worker(1).go_to_degree(90, 0))
+
+    store_dir verilirse (veya yapılandırmada 'thermometry_store_dir' varsa) tüm kural
+    ölçümleri ThermometryStore'a yazılır.
+    """
+
+    def __init__(self, config_path='config.json', config: dict | None = None, parse_workers: int = 4,
+                 alarm_history: int = 1000, store_dir: str | None = None):
+        if config is None:
+            with open(config_path, 'r') as f:
+                config = json.load(f)
+        self.config = config
+        store_dir = store_dir or config.get('thermometry_store_dir')
+        self.store = ThermometryStore(store_dir) if store_dir else None
+        self.parse_pool = ThreadPoolExecutor(max_workers=parse_workers, thread_name_prefix="TermalAyristirma")
+        self.alarms = deque(maxlen=alarm_history)
+        self._alarm_listeners = []
+        self.workers = {}
+        self.loop = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._stopped = None
+
+    def add_alarm_listener(self, callback):
+        """Her alarmda callback(alarm: Alarm) event loop thread'inden çağrılır; bloklamamalıdır."""
+        self._alarm_listeners.append(callback)
+
+    def publish_alarm(self, alarm: Alarm):
+        self.alarms.append(alarm)
+        print(f"Kamera {alarm.camera_id}: ALARM {alarm.temperature:.1f} °C (kural {alarm.rule_id})")
+        for callback in list(self._alarm_listeners):
+            try:
+                callback(alarm)
+            except Exception as e:
+                print(f"Alarm dinleyici hatası: {e}")
+
+    async def run(self):
+        """Worker'ları başlatır ve stop_all() çağrılana kadar çalışır."""
+        self.loop = asyncio.get_running_loop()
+        self._stopped = asyncio.Event()
+        if self.store is not None:
+            self.store.start()
+        for cam_config in self.config['cameras']:
+            if cam_config.get('enabled', False):
+                worker = AsyncCameraWorker(cam_config, self)
+                self.workers[cam_config['id']] = worker
+                worker.start()
+        print(f"{len(self.workers)} kamera tek event loop üzerinde başlatıldı.")
+        self._ready.set()
+        await self._stopped.wait()
+        await asyncio.gather(*(worker.stop() for worker in self.workers.values()))
+        self.parse_pool.shutdown(wait=False)
+        if self.store is not None:
+            await asyncio.to_thread(self.store.close)
+
+    def start_all(self):
+        """Event loop'u arka plan thread'inde başlatır (senkron uygulamalar için)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=asyncio.run, args=(self.run(),), name="AsyncCameraManager", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def stop_all(self):
+        if self.loop is None or self._stopped is None:
+            return
+        self.loop.call_soon_threadsafe(self._stopped.set)
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+
+    def call(self, coro, timeout: float = 10.0):
+        """Başka bir thread'den loop'ta bir coroutine çalıştırıp sonucunu bekler."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    def get_worker(self, camera_id):
+        return self.workers.get(camera_id)
+
+    def health(self) -> list:
+        return [worker.health() for worker in self.workers.values()]
@@ -1,11 +1,15 @@
 # camera_manager.py
 
+import os
+import sys
 import threading
 import time
-import requests
 import json
-from onvif import ONVIFCamera
-from requests.auth import HTTPDigestAuth
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from ortak.isapi_client import ISAPIClient
+from ortak.onvif_init import OnvifInitializer
+from ortak.thermometry_hub import ThermometryHub
 
 # Bu sınıf, her bir kamera için ayrı bir thread'de çalışarak
 # otonom tarama ve veri toplama işlemlerini yapar.
@@ -14,9 +18,11 @@ class CameraWorker:
         self.config = config
         self.manager = manager # Ana yöneticiye erişim için
         self.id = config['id']
-        self.auth = HTTPDigestAuth(config['user'], config['password'])
+        self.port = config.get('port', 80)
+        self.isapi = ISAPIClient.for_camera(config['ip'], config['user'], config['password'], self.port)
         self.ptz = None
         self.token = None
+        self.onvif_ready = threading.Event()
         self.ptz_limits = {'pan_min': 0, 'pan_max': 360, 'tilt_min': -90, 'tilt_max': 90}
         
         self.running = True
@@ -24,24 +30,17 @@ class CameraWorker:
         self.last_manual_command_time = 0
         
         self.thermal_data = {}
-
-        self._init_onvif()
         
         # Her kamera için kendi thread'lerini başlat
         self.scan_thread = threading.Thread(target=self.scan_loop, daemon=True)
         self.data_thread = threading.Thread(target=self.data_loop, daemon=True)
 
-    def _init_onvif(self):
-        try:
-            cam = ONVIFCamera(self.config['ip'], 80, self.config['user'], self.config['password'])
-            self.ptz = cam.create_ptz_service()
-            profile = cam.create_media_service().GetProfiles()[0]
-            self.token = profile.token
-            # ... (ONVIF limit alma kodu)
-            print(f"Kamera {self.id}: ONVIF bağlantısı başarılı.")
-        except Exception as e:
-            print(f"Kamera {self.id}: ONVIF bağlantı hatası: {e}")
-            self.ptz = None
+    def on_onvif_ready(self, key, result):
+        """ONVIF bağlantısı arka planda kurulunca OnvifInitializer tarafından çağrılır."""
+        self.token = result.token
+        self.ptz_limits.update(result.limits)
+        self.ptz = result.ptz
+        self.onvif_ready.set()
     
     def start(self):
         self.scan_thread.start()
@@ -59,6 +58,10 @@ class CameraWorker:
         scan_params = self.config['autonomous_scan']
         direction = 1
 
+        # Tarama PTZ servisi hazır olana kadar bekler; diğer kameralar bundan etkilenmez.
+        while self.running and not self.onvif_ready.wait(timeout=1.0):
+            pass
+
         while self.running:
             try:
                 # Manuel kontrol var mı diye kontrol et
@@ -85,19 +88,13 @@ class CameraWorker:
     
     def data_loop(self):
         """ISAPI'den termal veri çekme döngüsü."""
-        url = f"http://{self.config['ip']}/ISAPI/Thermal/channels/2/thermometry/realTimethermometry/rules?format=json"
-        while self.running:
-            try:
-                with requests.get(url, auth=self.auth, stream=True, timeout=(5,65)) as r:
-                    if r.status_code == 200:
-                        buffer = b''
-                        for chunk in r.iter_content(1024):
-                            buffer += chunk
-                            while b'--boundary' in buffer:
-                                # ... (Önceki koddan JSON ayrıştırma mantığı)
-                                pass
-            except:
-                time.sleep(5)
+        url = f"http://{self.config['ip']}:{self.port}/ISAPI/Thermal/channels/2/thermometry/realTimethermometry/rules?format=json"
+        hub = ThermometryHub.for_camera(url, self.config['user'], self.config['password'])
+        with hub.subscribe() as sub:
+            while self.running:
+                data = sub.get(timeout=1.0)
+                if data is not None:
+                    self.thermal_data = data
                 
     # --- PTZ Kontrol Metotları ---
     def set_manual_override(self):
@@ -118,17 +115,24 @@ class CameraManager:
         with open(config_path, 'r') as f:
             self.config = json.load(f)
         
+        # Tüm kameraların ONVIF bağlantıları paralel kurulur; API beklemeden açılır.
+        self.onvif_init = OnvifInitializer()
         for cam_config in self.config['cameras']:
             if cam_config.get('enabled', False):
-                self.workers[cam_config['id']] = CameraWorker(cam_config, self)
+                worker = CameraWorker(cam_config, self)
+                self.workers[cam_config['id']] = worker
+                self.onvif_init.submit(worker.id, cam_config['ip'], worker.port, cam_config['user'], cam_config['password'],
+                                       on_ready=worker.on_onvif_ready)
     
     def start_all(self):
         for worker in self.workers.values():
             worker.start()
             
     def stop_all(self):
+        self.onvif_init.shutdown()
         for worker in self.workers.values():
             worker.stop()
+        print("ONVIF başlangıç süreleri:\n" + self.onvif_init.summary())
             
     def get_worker(self, camera_id):
         return self.workers.get(camera_id)
\ No newline at end of file
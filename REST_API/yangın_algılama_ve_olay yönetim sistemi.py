@@ -4,12 +4,16 @@ import asyncio
 import time
 import json
 import os
+import sys
 import uuid
 from datetime import datetime
 import requests
 from fastapi import FastAPI, BackgroundTasks
 from requests.auth import HTTPDigestAuth
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from ortak.multipart_parser import MultipartStreamParser, iter_json_payloads
+
 import camera_handler
 from config import (
     CAMERA_USER, CAMERA_PASS, REALTIME_THERMOMETRY_URL,
@@ -93,28 +97,15 @@ async def listen_for_thermal_anomalies(background_tasks: BackgroundTasks):
                     await asyncio.sleep(5)
                     continue
 
-                buffer = b''
-                for chunk in response.iter_content(chunk_size=1024):
-                    buffer += chunk
-                    # Kameradan gelen multipart/x-mixed-replace verisini parçala
-                    while b'--boundary' in buffer:
-                        parts = buffer.split(b'--boundary', 1)
-                        block, buffer = parts[0], parts[1]
-                        if b'Content-Type: application/json' in block:
-                            json_start = block.find(b'{')
-                            json_end = block.rfind(b'}')
-                            if json_start != -1 and json_end != -1:
-                                json_str = block[json_start:json_end+1].decode('utf-8')
-                                try:
-                                    data = json.loads(json_str)
-                                    # ANOMALİ KONTROL MANTIĞI BURADA
-                                    max_temp = data.get('ThermometryUploadList', {}).get('ThermometryUpload', [{}])[0].get('LinePolygonThermCfg', {}).get('MaxTemperature')
-                                    if max_temp and max_temp >= ALARM_TEMPERATURE:
-                                        # ÖNEMLİ: create_event'i doğrudan çağırmak yerine
-                                        # background task olarak ekliyoruz ki ana döngü bloklanmasın.
-                                        background_tasks.add_task(create_event, data)
-                                except json.JSONDecodeError:
-                                    pass
+                # Kameradan gelen multipart/x-mixed-replace verisi, yanıttaki boundary ile artımlı çözülür.
+                parser = MultipartStreamParser.from_response(response)
+                for data in iter_json_payloads(parser, response.iter_content(chunk_size=1024)):
+                    # ANOMALİ KONTROL MANTIĞI BURADA
+                    max_temp = data.get('ThermometryUploadList', {}).get('ThermometryUpload', [{}])[0].get('LinePolygonThermCfg', {}).get('MaxTemperature')
+                    if max_temp and max_temp >= ALARM_TEMPERATURE:
+                        # ÖNEMLİ: create_event'i doğrudan çağırmak yerine
+                        # background task olarak ekliyoruz ki ana döngü bloklanmasın.
+                        background_tasks.add_task(create_event, data)
         except requests.exceptions.RequestException as e:
             print(f"Termal veri bağlantı hatası: {e}")
             await asyncio.sleep(5) # Hata durumunda 5 saniye bekle ve tekrar dene
@@ -1,58 +1,51 @@
 # camera_handler.py
 
 import os
+import sys
 import cv2
 import requests
 import xml.etree.ElementTree as ET
-from requests.auth import HTTPDigestAuth
 from config import (
-    CAMERA_USER, CAMERA_PASS, PTZ_STATUS_URL
+    CAMERA_IP, CAMERA_PORT, CAMERA_USER, CAMERA_PASS, PTZ_STATUS_URL
 )
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from ortak.frame_bus import FrameBus
+from ortak.isapi_client import ISAPIClient
+
 # OpenCV'nin RTSP için TCP kullanmasını zorlayarak bağlantı stabilitesini artırır.
 os.environ["OPENCV_FFMPEG_CAPTURE_OPTIONS"] = "rtsp_transport;tcp"
 
-# Her istekte tekrar tekrar oluşturmamak için ortak authentication nesnesi
-auth = HTTPDigestAuth(CAMERA_USER, CAMERA_PASS)
+# Her istekte yeni bağlantı ve 401 turu yaşamamak için ortak, kalıcı ISAPI istemcisi
+isapi = ISAPIClient.for_camera(CAMERA_IP, CAMERA_USER, CAMERA_PASS, CAMERA_PORT)
 
-def capture_snapshot(rtsp_url: str) -> bytes | None:
+def capture_snapshot(rtsp_url: str, timeout: float = 5.0) -> bytes | None:
     """
-    Verilen RTSP URL'sinden tek bir kare yakalar ve JPEG formatında byte olarak döndürür.
-    Eğer başarısız olursa None döndürür.
+    Verilen RTSP akışından tek bir kare yakalar ve JPEG formatında byte olarak döndürür.
+    Akış, süreç içindeki ortak veri yolundan (FrameBus) okunur: ilk çağrıda bağlantı kurulur,
+    sonraki olaylarda yeniden bağlanıp ilk kareleri atmaya gerek kalmaz. Başarısızsa None döndürür.
     """
-    cap = None
-    try:
-        cap = cv2.VideoCapture(rtsp_url, cv2.CAP_FFMPEG)
-        if not cap.isOpened():
-            print(f"HATA: RTSP akışına bağlanılamadı: {rtsp_url}")
-            return None
-        
-        # Akıştan stabil bir kare almak için birkaç kare okuyalım
-        for _ in range(5):
-            ret, frame = cap.read()
+    bus = FrameBus.shared(rtsp_url)
+    with bus.subscribe("anlık görüntü") as sub:
+        frame = sub.next(timeout)
+    if frame is None:
+        print(f"HATA: RTSP akışından kare okunamadı ({bus.status}): {rtsp_url}")
+        return None
+
+    # Görüntüyü JPEG formatında belleğe kodla
+    ret, buffer = cv2.imencode('.jpg', frame.image)
+    if not ret:
+        print("HATA: Görüntü JPEG formatına çevrilemedi.")
+        return None
+    return buffer.tobytes()
 
-        if not ret or frame is None:
-            print(f"HATA: RTSP akışından kare okunamadı: {rtsp_url}")
-            return None
-            
-        # Görüntüyü JPEG formatında belleğe kodla
-        ret, buffer = cv2.imencode('.jpg', frame)
-        if not ret:
-            print("HATA: Görüntü JPEG formatına çevrilemedi.")
-            return None
-            
-        return buffer.tobytes()
-    finally:
-        if cap:
-            cap.release()
- 
 def get_ptz_status() -> dict | None:
     """
     Kameranın anlık Pan ve Tilt pozisyonunu derece cinsinden alır.
     Başarısız olursa None döndürür.
     """
     try:
-        response = requests.get(PTZ_STATUS_URL, auth=auth, timeout=2)
+        response = isapi.get(PTZ_STATUS_URL, timeout=2)
         response.raise_for_status() # Hatalı HTTP kodları için (4xx, 5xx) exception fırlatır
 
         root = ET.fromstring(response.content)
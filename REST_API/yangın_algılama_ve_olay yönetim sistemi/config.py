@@ -1,21 +1,85 @@
 # config.py
 
+import os
+
 # --- KAMERA BİLGİLERİ ---
-CAMERA_IP = '192.168.1.64'
-CAMERA_PORT = 80
-CAMERA_USER = 'admin'
-CAMERA_PASS = 'ErenEnerji' # Şifrenizi buraya girin
+# Ortam değişkenleriyle ezilebilir (ör. yerel simülatör veya yük testi için).
+CAMERA_IP = os.environ.get('CAMERA_IP', '192.168.1.64')
+CAMERA_PORT = int(os.environ.get('CAMERA_PORT', 80))
+CAMERA_USER = os.environ.get('CAMERA_USER', 'admin')
+CAMERA_PASS = os.environ.get('CAMERA_PASS', 'ErenEnerji') # Şifrenizi buraya girin
+RTSP_PORT = int(os.environ.get('RTSP_PORT', 554))
 
 # --- URL'ler ---
 # Bu URL'leri kameranızın belgelerine göre doğrulayın. Genellikle bu formattadır.
-RTSP_URL_NORMAL = f'rtsp://{CAMERA_USER}:{CAMERA_PASS}@{CAMERA_IP}:554/Streaming/Channels/101'
-RTSP_URL_THERMAL = f'rtsp://{CAMERA_USER}:{CAMERA_PASS}@{CAMERA_IP}:554/Streaming/Channels/201'
-REALTIME_THERMOMETRY_URL = f'http://{CAMERA_IP}/ISAPI/Thermal/channels/2/thermometry/realTimethermometry/rules?format=json'
-PTZ_STATUS_URL = f'http://{CAMERA_IP}/ISAPI/PTZCtrl/channels/1/status'
+# Olay kanıtı (ring buffer kaydı, anlık görüntü) ana akıştan alınır; ekran önizlemeleri alt akışı
+# kullanır (ortak/stream_profiles.py).
+RTSP_URL_NORMAL = f'rtsp://{CAMERA_USER}:{CAMERA_PASS}@{CAMERA_IP}:{RTSP_PORT}/Streaming/Channels/101'
+RTSP_URL_THERMAL = f'rtsp://{CAMERA_USER}:{CAMERA_PASS}@{CAMERA_IP}:{RTSP_PORT}/Streaming/Channels/201'
+REALTIME_THERMOMETRY_PATH = '/ISAPI/Thermal/channels/2/thermometry/realTimethermometry/rules?format=json'
+PTZ_STATUS_PATH = '/ISAPI/PTZCtrl/channels/1/status'
+REALTIME_THERMOMETRY_URL = f'http://{CAMERA_IP}:{CAMERA_PORT}{REALTIME_THERMOMETRY_PATH}'
+PTZ_STATUS_URL = f'http://{CAMERA_IP}:{CAMERA_PORT}{PTZ_STATUS_PATH}'
+# ISAPI anlık görüntü (/ISAPI/Streaming/channels/<no>/picture) için akış kanalları
+NORMAL_STREAM_CHANNEL = 101
+THERMAL_STREAM_CHANNEL = 201
+
+# --- PTZ KONUM TAKİBİ ---
+# Kamera hareket ederken durum bu aralıkla sorgulanır; hareketsizken yavaş nabız kullanılır (saniye).
+PTZ_FAST_INTERVAL = 0.1
+PTZ_IDLE_INTERVAL = 2.0
 
 # --- ALARM AYARLARI ---
 # Bu sıcaklığın (°C) üzerine çıkıldığında alarm tetiklenir.
 ALARM_TEMPERATURE = 75.0
 
-# Arka arkaya sürekli olay oluşturmasını engellemek için bekleme süresi (saniye).
-EVENT_COOLDOWN_SECONDS = 60
\ No newline at end of file
+# Olay kapanma eşiği ALARM_TEMPERATURE - ALARM_HYSTERESIS; eşik çevresinde salınan sıcaklık olayı açıp kapatmaz.
+ALARM_HYSTERESIS = 5.0
+# Olay açılmadan önce eşik üstünde kesintisiz kalma süresi (saniye); tek örneklik sıçramaları eler.
+ALARM_MIN_DURATION = 3.0
+# Bu hızı (°C/sn) aşan ani yükselme eşik beklenmeden olay açar; varsayılan kapalı (None), ör. 2.0 ile açılır.
+ALARM_RISE_RATE = None
+# Kapanma eşiği altında bu kadar kalan olay kapanır (saniye).
+ALARM_CLEAR_SECONDS = 30.0
+# Olay kuralı ve sıcak nokta hücresi bazında izlenir (normalize hücre boyu, 0.25 -> 4x4 ızgara).
+# Komşu hücreye kayan (veya aynı kuralda daha uzağa sıçrayan) sıcak nokta aynı olayda kalır.
+ALARM_CELL_SIZE = 0.25
+
+# --- TERMAL ÖLÇÜM GEÇMİŞİ ---
+# Her kuralın Max/Min/Ortalama değerleri bu klasörde zaman serisi olarak saklanır.
+THERMOMETRY_STORE_DIR = os.environ.get('THERMOMETRY_STORE_DIR', 'thermometry_db')
+# Seviye bazında saklama süresi (saniye); özetler ham veriden çok daha uzun tutulabilir.
+THERMOMETRY_RETENTION = {'raw': 30 * 86400, '1m': 180 * 86400, '15m': 730 * 86400, '1h': 3650 * 86400}
+# Saklama süresi dolan bölümler açılışta ve bu aralıkla (saniye) silinir.
+THERMOMETRY_PRUNE_INTERVAL = 3600.0
+
+# --- OLAY İŞLEME HATTI ---
+# Aşama başına (eşzamanlı işçi, kuyruk boyutu). Giriş (detect) kuyruğu doluysa yeni anomali
+# düşülür ve sayılır; diğer aşamalar arasında geri basınç vardır.
+EVENT_PIPELINE_STAGES = {'detect': (1, 256), 'enrich': (4, 16), 'persist': (2, 16), 'notify': (1, 64)}
+
+# --- OLAY KATALOĞU ---
+# Olay klasörleri EVENTS_DIR altına yazılır; aranabilir dizin aynı klasördeki SQLite dosyasındadır.
+EVENTS_DIR = os.environ.get('EVENTS_DIR', 'events')
+EVENT_CATALOG_PATH = os.path.join(EVENTS_DIR, 'catalog.db')
+
+# --- OLAY ÖNCESİ/SONRASI GÖRÜNTÜ TAMPONU ---
+# Her iki akış sürekli açık tutulur ve son N saniye bellekte JPEG olarak saklanır.
+RING_BUFFER_SECONDS = 20
+RING_BUFFER_FPS = 5
+# Olay klasörüne kaydedilecek kısa klibin olay öncesi/sonrası süreleri (saniye).
+PRE_EVENT_SECONDS = 10
+POST_EVENT_SECONDS = 5
+
+# --- SÜREKLİ KAYIT ---
+# 101/201 akışları ffmpeg ile kod çözmeden (-c copy) sabit süreli MPEG-TS segmentlerine yazılır.
+# Devam eden segment kapanınca (en geç RECORDING_SEGMENT_SECONDS sonra) aranabilir olur.
+# Oturum sayısı: kayıt ffmpeg'i ana akışlara kendi RTSP oturumunu açar. Halka tamponlar aynı
+# akışları FrameBus ile ayrıca çözdüğünden kanal başına iki ana akış oturumu kullanılır (ekran
+# önizlemeleri alt akıştadır). OpenCV paketleri dışarı vermediği için kod çözmeyen kayıt aynı
+# oturumdan beslenemez; kamera oturum sınırına yakınsa RECORDING_ENABLED=0 ile kayıt kapatılır.
+RECORDING_ENABLED = os.environ.get('RECORDING_ENABLED', '1') != '0'
+RECORDINGS_DIR = os.environ.get('RECORDINGS_DIR', 'recordings')
+RECORDING_SEGMENT_SECONDS = 60
+# Tüm kanallar için toplam disk kotası (bayt); aşılınca en eski segmentler silinir.
+RECORDING_MAX_BYTES = int(os.environ.get('RECORDING_MAX_BYTES', 100 * 2 ** 30))
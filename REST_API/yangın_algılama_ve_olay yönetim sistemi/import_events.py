@@ -0,0 +1,35 @@
+# import_events.py
+#
+# Katalog öncesi yazılmış olay klasörlerini (events/<zaman>_<id>/data.json) olay kataloğuna
+# ekler. Tekrar çalıştırmak güvenlidir; kayıtlı olaylar atlanır.
+#
+# Kullanım:
+#   python import_events.py [--klasor events] [--kamera 192.168.1.64]
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from ortak.event_catalog import EventCatalog, import_event_folders
+from config import CAMERA_IP, EVENTS_DIR
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Eski olay klasörlerini olay kataloğuna aktarır")
+    ap.add_argument('--klasor', default=EVENTS_DIR, help="Olay klasörlerinin bulunduğu dizin")
+    ap.add_argument('--kamera', default=CAMERA_IP,
+                    help="data.json'da kamera bilgisi olmayan olaylar için kamera adı")
+    args = ap.parse_args()
+
+    catalog = EventCatalog(os.path.join(args.klasor, 'catalog.db'))
+    start = time.perf_counter()
+    added, failed = import_event_folders(catalog, args.klasor, args.kamera)
+    print(f"{added} olay eklendi, {failed} klasör okunamadı ({time.perf_counter() - start:.1f} sn). "
+          f"Katalogda toplam {catalog.count()} olay var.")
+    catalog.close()
+
+
+if __name__ == '__main__':
+    main()
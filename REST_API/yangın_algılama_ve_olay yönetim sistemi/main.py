@@ -5,123 +5,328 @@ import os
 import asyncio
 import time
 import json
+import threading
 import uuid
 from datetime import datetime
-import requests
+import httpx
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
-from requests.auth import HTTPDigestAuth
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import FileResponse, StreamingResponse
 
 # Proje klasörünü Python'un modül arama yoluna ekle (güvenlik için)
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+# Depo kökündeki ortak modüller (ortak/)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
 
 # Yerel modüllerimizi import ediyoruz
 import camera_handler
+from ortak.async_isapi import AsyncISAPIClient
+from ortak.thermometry_hub import ThermometryHub, thermometry_uploads
+from ortak.frame_ring_buffer import RingBufferRecorder, export_clip
+from ortak.ptz_tracker import PTZTracker
+from ortak.thermometry_store import ThermometryStore, LEVELS
+from ortak.event_catalog import EventCatalog, FILE_COLUMNS, THUMBNAIL_NAME, make_thumbnail
+from ortak.event_pipeline import EventPipeline, PipelineStage
+from ortak.alarm_engine import AlarmEngine, AlarmSettings, OPENED
+from ortak.segment_recorder import ContinuousRecorder
 from config import (
-    CAMERA_USER, CAMERA_PASS, REALTIME_THERMOMETRY_URL,
-    RTSP_URL_NORMAL, RTSP_URL_THERMAL, ALARM_TEMPERATURE, EVENT_COOLDOWN_SECONDS
+    CAMERA_IP, CAMERA_PORT, CAMERA_USER, CAMERA_PASS,
+    REALTIME_THERMOMETRY_URL, REALTIME_THERMOMETRY_PATH,
+    RTSP_URL_NORMAL, RTSP_URL_THERMAL, NORMAL_STREAM_CHANNEL, THERMAL_STREAM_CHANNEL,
+    ALARM_TEMPERATURE, ALARM_HYSTERESIS, ALARM_MIN_DURATION, ALARM_RISE_RATE, ALARM_CLEAR_SECONDS, ALARM_CELL_SIZE,
+    RING_BUFFER_SECONDS, RING_BUFFER_FPS, PRE_EVENT_SECONDS, POST_EVENT_SECONDS,
+    PTZ_FAST_INTERVAL, PTZ_IDLE_INTERVAL, THERMOMETRY_STORE_DIR, THERMOMETRY_RETENTION,
+    THERMOMETRY_PRUNE_INTERVAL,
+    EVENTS_DIR, EVENT_CATALOG_PATH, EVENT_PIPELINE_STAGES,
+    RECORDINGS_DIR, RECORDING_ENABLED, RECORDING_SEGMENT_SECONDS, RECORDING_MAX_BYTES
 )
 
 # Paylaşılan değişkenler
-auth = HTTPDigestAuth(CAMERA_USER, CAMERA_PASS)
+# Tüm ISAPI çağrıları (termal akış, PTZ durumu, anlık görüntü) event loop'u bloklamayan bu istemciden geçer.
+isapi = AsyncISAPIClient(CAMERA_IP, CAMERA_USER, CAMERA_PASS, port=CAMERA_PORT)
 last_event_time = 0
-is_processing_event = False
+# Olaylar (kamera, kural, sıcak nokta hücresi) bazında açılır, güncellenir ve kapanır.
+alarm_engine = AlarmEngine(AlarmSettings(
+    threshold=ALARM_TEMPERATURE, hysteresis=ALARM_HYSTERESIS, min_duration=ALARM_MIN_DURATION,
+    rise_rate=ALARM_RISE_RATE, clear_duration=ALARM_CLEAR_SECONDS, cell_size=ALARM_CELL_SIZE,
+))
+incident_save_lock = threading.Lock()
+background_tasks = set()
+# Kaydedilen her olay için callback(event: PendingEvent) çağrılır (bildirim aşaması).
+event_listeners = []
 
-def create_and_save_event(thermal_data: dict):
-    """Anomali tespit edildiğinde tetiklenir. Gerekli tüm verileri toplar ve kaydeder."""
-    global last_event_time, is_processing_event
+# Olay anındaki kareler için sürekli beslenen halka tamponlar (yeni RTSP bağlantısı gerektirmez)
+recorders = {
+    "thermal": RingBufferRecorder(RTSP_URL_THERMAL, "Termal", RING_BUFFER_SECONDS, RING_BUFFER_FPS),
+    "normal": RingBufferRecorder(RTSP_URL_NORMAL, "Normal", RING_BUFFER_SECONDS, RING_BUFFER_FPS),
+}
 
-    current_time = time.time()
-    if current_time - last_event_time < EVENT_COOLDOWN_SECONDS:
-        print(f"Cooldown aktif. {int(EVENT_COOLDOWN_SECONDS - (current_time - last_event_time))} saniye sonra tekrar denenebilir.")
-        return
-    
-    is_processing_event = True
+# Ana akışlar yeniden kodlanmadan segmentlere kaydedilir; herhangi bir an dizinden bulunup okunur.
+# Kayıt kanal başına ikinci bir ana akış oturumu açar (bkz. config.py, RECORDING_ENABLED).
+continuous_recorder = ContinuousRecorder(
+    RECORDINGS_DIR, CAMERA_IP,
+    {NORMAL_STREAM_CHANNEL: RTSP_URL_NORMAL, THERMAL_STREAM_CHANNEL: RTSP_URL_THERMAL} if RECORDING_ENABLED else {},
+    segment_seconds=RECORDING_SEGMENT_SECONDS, max_bytes=RECORDING_MAX_BYTES,
+)
+
+# PTZ konumu arka planda takip edilir; olay anında ayrıca sorgu yapmaya gerek kalmaz.
+ptz_tracker = PTZTracker(camera_handler.isapi, fast_interval=PTZ_FAST_INTERVAL, idle_interval=PTZ_IDLE_INTERVAL)
+
+# Akıştaki tüm kural ölçümleri zaman serisi olarak saklanır (1 dk / 15 dk / 1 saat özetleriyle).
+thermometry_store = ThermometryStore(THERMOMETRY_STORE_DIR)
+
+# Olay dosyaları klasörlerde kalır; sorgular bu indeksli katalog üzerinden yapılır.
+event_catalog = EventCatalog(EVENT_CATALOG_PATH)
+
+async def get_event_ptz_status(trigger_time: float) -> dict | None:
+    """
+    Tetikleyici anındaki PTZ konumunu takip geçmişinden alır. Kamera o sırada hareket
+    ediyorsa ve yakın bir örnek yoksa canlı sorguya döner.
+    """
+    state = ptz_tracker.state_at(trigger_time)
+    if state is not None and (not state.moving or abs(state.timestamp - trigger_time) <= 2 * PTZ_FAST_INTERVAL):
+        return state.as_dict()
+    return await isapi.get_ptz_status()
+
+async def get_event_frame(name: str, trigger_time: float, stream_channel: int) -> bytes | None:
+    """Tetikleyici ana en yakın kareyi tampondan alır; tampon boşsa ISAPI anlık görüntüsüne döner."""
+    frame_time, jpeg = recorders[name].buffer.closest(trigger_time)
+    if jpeg is not None:
+        print(f"{name} karesi tampondan alındı (tetikleyiciden {abs(frame_time - trigger_time):.2f} sn uzakta).")
+        return jpeg
+    print(f"UYARI: {name} tamponu boş, ISAPI üzerinden anlık görüntü alınıyor...")
+    return await isapi.snapshot(stream_channel)
+
+def save_event_clips(event_folder: str, trigger_time: float):
+    """Olay sonrası süre dolduğunda olay öncesi/sonrası klipleri tampondan dışa aktarır."""
+    for name, recorder in recorders.items():
+        frames = recorder.buffer.between(trigger_time - PRE_EVENT_SECONDS, trigger_time + POST_EVENT_SECONDS)
+        clip_path = os.path.join(event_folder, f"{name}_clip.mp4")
+        if export_clip(frames, clip_path):
+            print(f"{name} klibi kaydedildi: {clip_path} ({len(frames)} kare)")
+        else:
+            print(f"UYARI: {name} klibi oluşturulamadı.")
+
+class PendingEvent:
+    """Olay hattında aşamadan aşamaya taşınan, her aşamada zenginleşen olay."""
+
+    def __init__(self, thermal_data: dict, trigger_time: float, incident):
+        self.thermal_data = thermal_data
+        self.trigger_time = trigger_time
+        self.incident = incident
+        self.ptz_status = None
+        self.thermal_image = None
+        self.normal_image = None
+        self.event_id = None
+        self.event_folder = None
+
+async def detect_event(event: PendingEvent) -> PendingEvent:
+    """Alarm motorunun açtığı olayı kabul eder; tekrarları motor zaten eler."""
+    global last_event_time
+    last_event_time = time.time()
+    incident = event.incident
     print("="*50)
-    print("!!! ANOMALİ TESPİT EDİLDİ! Olay oluşturuluyor... !!!")
+    print(f"!!! ANOMALİ TESPİT EDİLDİ! Kural {incident.rule_id}, {incident.peak_temperature:.1f} °C "
+          f"({incident.trigger}). Olay oluşturuluyor... !!!")
+    return event
+
+async def enrich_event(event: PendingEvent) -> PendingEvent:
+    """PTZ pozisyonu ve tetikleyici anındaki kareler (ağ çağrıları asenkron)."""
+    event.ptz_status, event.thermal_image, event.normal_image = await asyncio.gather(
+        get_event_ptz_status(event.trigger_time),
+        get_event_frame("thermal", event.trigger_time, THERMAL_STREAM_CHANNEL),
+        get_event_frame("normal", event.trigger_time, NORMAL_STREAM_CHANNEL),
+    )
+    return event
+
+async def persist_event(event: PendingEvent) -> PendingEvent:
+    """Dosya yazımı ve katalog kaydı thread havuzunda yapılır."""
+    event.event_id, event.event_folder = await asyncio.to_thread(
+        create_and_save_event, event.thermal_data, event.trigger_time,
+        event.ptz_status, event.thermal_image, event.normal_image, event.incident)
+    event.incident.event_id, event.incident.event_folder = event.event_id, event.event_folder
+    # Kayıt sürerken gelen güncellemeler (veya kapanış) olay ID'si bilinmediği için yazılamadı.
+    await asyncio.to_thread(save_incident_state, event.incident)
+    return event
+
+async def notify_event(event: PendingEvent) -> None:
+    for callback in list(event_listeners):
+        try:
+            callback(event)
+        except Exception as e:
+            print(f"Olay dinleyici hatası: {e}")
+
+# Her aşamanın kendi kuyruğu ve eşzamanlılığı var; aynı anda gelen anomaliler birbirini beklemez.
+event_pipeline = EventPipeline([
+    PipelineStage(name, handler, *EVENT_PIPELINE_STAGES[name])
+    for name, handler in (("detect", detect_event), ("enrich", enrich_event),
+                          ("persist", persist_event), ("notify", notify_event))
+])
+
+def create_and_save_event(thermal_data: dict, trigger_time: float, ptz_status: dict | None,
+                          thermal_image_bytes: bytes | None, normal_image_bytes: bytes | None, incident) -> tuple:
+    """Toplanan olay verilerini diske kaydeder ve kataloğa ekler; (olay ID, klasör) döndürür."""
+    event_id = str(uuid.uuid4())
+    timestamp = datetime.now()
+    event_folder = os.path.join(EVENTS_DIR, f"{timestamp.strftime('%Y-%m-%d_%H-%M-%S')}_{event_id[:8]}")
+    os.makedirs(event_folder, exist_ok=True)
     
-    try:
-        event_id = str(uuid.uuid4())
-        timestamp = datetime.now()
-        event_folder = os.path.join("events", f"{timestamp.strftime('%Y-%m-%d_%H-%M-%S')}_{event_id[:8]}")
-        os.makedirs(event_folder, exist_ok=True)
-        
-        print(f"Olay ID: {event_id}\nKayıt Klasörü: {event_folder}")
-        
-        print("PTZ pozisyonu alınıyor...")
-        ptz_status = camera_handler.get_ptz_status()
-        
-        print("Termal görüntü yakalanıyor...")
-        thermal_image_bytes = camera_handler.capture_snapshot(RTSP_URL_THERMAL)
-        print("Normal görüntü yakalanıyor...")
-        normal_image_bytes = camera_handler.capture_snapshot(RTSP_URL_NORMAL)
-        
-        print("Veriler dosyalanıyor...")
-        max_temp_info = thermal_data.get('ThermometryUploadList', {}).get('ThermometryUpload', [{}])[0]
-        event_data = {
-            "event_id": event_id, "timestamp_utc": timestamp.utcnow().isoformat() + "Z",
-            "triggering_thermal_data": max_temp_info, "ptz_position_at_event": ptz_status,
-            "alarm_config": {"set_temperature_celsius": ALARM_TEMPERATURE, "cooldown_seconds": EVENT_COOLDOWN_SECONDS},
-            "files": {
-                "thermal_image": "thermal_image.jpg" if thermal_image_bytes else None,
-                "normal_image": "normal_image.jpg" if normal_image_bytes else None,
-                "event_data": "data.json"
-            }
+    print(f"Olay ID: {event_id}\nKayıt Klasörü: {event_folder}")
+    
+    print("Veriler dosyalanıyor...")
+    # Olayı açan kuralın ölçümü (mesajda birden fazla kural olabilir).
+    max_temp_info = next((upload for upload in thermometry_uploads(thermal_data)
+                          if upload.get('ruleID') == incident.rule_id), {})
+    thumbnail_bytes = make_thumbnail(thermal_image_bytes) if thermal_image_bytes else None
+    event_data = {
+        "event_id": event_id, "timestamp_utc": timestamp.utcnow().isoformat() + "Z",
+        "camera": CAMERA_IP, "trigger_time": trigger_time,
+        "triggering_thermal_data": max_temp_info, "ptz_position_at_event": ptz_status,
+        "incident": incident.as_dict(),
+        "alarm_config": alarm_engine.settings.as_dict(),
+        "clip_window_seconds": {"pre": PRE_EVENT_SECONDS, "post": POST_EVENT_SECONDS},
+        # Tam çözünürlüklü kayıt: GET /recordings/<kanal>?start=...&end=...
+        "recording": {"channels": list(continuous_recorder.channels), "start": trigger_time - PRE_EVENT_SECONDS,
+                      "end": trigger_time + POST_EVENT_SECONDS},
+        "files": {
+            "thermal_image": "thermal_image.jpg" if thermal_image_bytes else None,
+            "normal_image": "normal_image.jpg" if normal_image_bytes else None,
+            "thermal_clip": "thermal_clip.mp4",
+            "normal_clip": "normal_clip.mp4",
+            "thumbnail": THUMBNAIL_NAME if thumbnail_bytes else None,
+            "event_data": "data.json"
         }
-        
-        with open(os.path.join(event_folder, "data.json"), "w", encoding="utf-8") as f:
+    }
+    
+    with open(os.path.join(event_folder, "data.json"), "w", encoding="utf-8") as f:
+        json.dump(event_data, f, indent=4, ensure_ascii=False)
+    if thermal_image_bytes:
+        with open(os.path.join(event_folder, "thermal_image.jpg"), "wb") as f: f.write(thermal_image_bytes)
+    if normal_image_bytes:
+        with open(os.path.join(event_folder, "normal_image.jpg"), "wb") as f: f.write(normal_image_bytes)
+    if thumbnail_bytes:
+        with open(os.path.join(event_folder, THUMBNAIL_NAME), "wb") as f: f.write(thumbnail_bytes)
+
+    ptz_status = ptz_status or {}
+    files = {name: os.path.join(event_folder, file) for name, file in event_data["files"].items() if file}
+    event_catalog.add(
+        event_id=event_id, camera=CAMERA_IP, rule_id=incident.rule_id, trigger_time=trigger_time,
+        created_at=time.time(), max_temperature=incident.peak_temperature,
+        pan=ptz_status.get('pan_degrees'), tilt=ptz_status.get('tilt_degrees'), folder=event_folder,
+        last_seen=incident.last_seen, closed_at=incident.closed_at,
+        **{name: files.get(name) for name in FILE_COLUMNS},
+    )
+            
+    # Olay sonrası kareler henüz gelmedi; klipler süre dolunca ayrı bir thread'de yazılır.
+    clip_delay = max(0.0, trigger_time + POST_EVENT_SECONDS - time.time())
+    threading.Timer(clip_delay, save_event_clips, args=(event_folder, trigger_time)).start()
+
+    print("Olay başarıyla kaydedildi!")
+    print("="*50)
+    return event_id, event_folder
+
+def save_incident_state(incident):
+    """Süregelen olayın son durumunu (tepe sıcaklık, son görülme, kapanış) data.json'a ve kataloğa yazar."""
+    if incident.event_id is None:
+        return
+    # Yazım anındaki en güncel durum yazılır; sıra dışı biten thread'ler eski durumu geri yazamaz.
+    with incident_save_lock:
+        state = incident.as_dict()
+        path = os.path.join(incident.event_folder, "data.json")
+        with open(path, encoding="utf-8") as f:
+            event_data = json.load(f)
+        event_data["incident"] = state
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
             json.dump(event_data, f, indent=4, ensure_ascii=False)
-        if thermal_image_bytes:
-            with open(os.path.join(event_folder, "thermal_image.jpg"), "wb") as f: f.write(thermal_image_bytes)
-        if normal_image_bytes:
-            with open(os.path.join(event_folder, "normal_image.jpg"), "wb") as f: f.write(normal_image_bytes)
-                
-        print("Olay başarıyla kaydedildi!")
-        print("="*50)
-        last_event_time = time.time()
-    except Exception as e:
-        print(f"HATA: Olay oluşturulurken kritik bir hata oluştu: {e}")
-    finally:
-        is_processing_event = False
+        os.replace(path + ".tmp", path)
+        event_catalog.update(incident.event_id, max_temperature=state["peak_temperature"],
+                             last_seen=state["last_seen"], closed_at=state["closed_at"])
+
+def handle_alarm_transition(transition):
+    """Yeni olay hatta gönderilir; süregelen olayın güncellemesi ve kapanışı mevcut kayda yazılır."""
+    incident = transition.incident
+    if transition.kind == OPENED:
+        event_pipeline.submit(PendingEvent(transition.data, incident.opened_at, incident))
+        return
+    if not incident.open:
+        print(f"Olay kapandı: kural {incident.rule_id}, tepe {incident.peak_temperature:.1f} °C, "
+              f"{incident.closed_at - incident.opened_at:.0f} sn sürdü.")
+    if incident.event_id is not None:
+        task = asyncio.create_task(asyncio.to_thread(save_incident_state, incident))
+        background_tasks.add(task)
+        task.add_done_callback(background_tasks.discard)
+
+async def sweep_incidents():
+    """Veri akışı kesilse de açık olayların zamanında kapanması için periyodik tarama."""
+    while True:
+        await asyncio.sleep(5)
+        for transition in alarm_engine.sweep(time.time()):
+            handle_alarm_transition(transition)
+
+async def prune_thermometry():
+    """Uzun süre çalışan serviste de saklama süresi uygulansın diye eski ölçüm bölümlerini periyodik siler."""
+    while True:
+        try:
+            removed = await asyncio.to_thread(thermometry_store.prune, THERMOMETRY_RETENTION)
+            if removed:
+                print(f"Termal ölçüm geçmişi: {removed} eski bölüm silindi.")
+        except Exception as e:
+            print(f"Termal ölçüm geçmişi temizlenemedi: {e}")
+        await asyncio.sleep(THERMOMETRY_PRUNE_INTERVAL)
 
 async def listen_for_thermal_anomalies():
-    """Kameranın termal veri akışını sürekli dinler ve anomali arar."""
+    """Kameranın termal veri akışını asenkron olarak sürekli dinler ve anomali arar."""
     print("Termal anomali dinleyicisi başlatılıyor...")
+    # Akışı bu görev okur; süreç içindeki diğer aboneler aynı mesajları hub üzerinden alır.
+    hub = ThermometryHub.for_camera(REALTIME_THERMOMETRY_URL, CAMERA_USER, CAMERA_PASS)
+    hub.use_external_upstream()
     while True:
         try:
-            with requests.get(REALTIME_THERMOMETRY_URL, auth=auth, stream=True, timeout=(10, 65)) as response:
-                response.raise_for_status()
-                print("Termal veri akışına başarıyla bağlandı. Anomali bekleniyor...")
-                buffer = b''
-                for chunk in response.iter_content(chunk_size=1024):
-                    if not chunk: continue
-                    buffer += chunk
-                    while b'--boundary' in buffer:
-                        parts = buffer.split(b'--boundary', 1)
-                        block, buffer = parts[0], parts[1]
-                        if b'Content-Type: application/json' in block:
-                            json_start = block.find(b'{'); json_end = block.rfind(b'}')
-                            if json_start != -1 and json_end != -1:
-                                try:
-                                    data = json.loads(block[json_start:json_end+1].decode('utf-8'))
-                                    max_temp = data.get('ThermometryUploadList', {}).get('ThermometryUpload', [{}])[0].get('LinePolygonThermCfg', {}).get('MaxTemperature')
-                                    if max_temp and max_temp >= ALARM_TEMPERATURE and not is_processing_event:
-                                        # <-- DEĞİŞİKLİK BURADA: 'await' eklendi.
-                                        await asyncio.to_thread(create_and_save_event, data)
-                                except (json.JSONDecodeError, KeyError, IndexError): pass
-        except requests.exceptions.RequestException as e:
+            hub.set_status("Termal Veri: Bağlanıyor")
+            async for received_at, data in isapi.stream_json(REALTIME_THERMOMETRY_PATH):
+                if hub.status != "Termal Veri: Bağlandı":
+                    print("Termal veri akışına başarıyla bağlandı. Anomali bekleniyor...")
+                    hub.set_status("Termal Veri: Bağlandı")
+                hub.publish(data)
+                thermometry_store.append_message(CAMERA_IP, data, received_at)
+                # Her kural ölçümü alarm motorunda O(1) işlenir; yeni olaylar hatta gönderilir (beklemez).
+                for upload in thermometry_uploads(data):
+                    transition = alarm_engine.update(CAMERA_IP, upload, received_at, data)
+                    if transition is not None:
+                        handle_alarm_transition(transition)
+        except httpx.HTTPError as e:
+            hub.set_status("Termal Veri: Bağlantı Hatası")
             print(f"Termal veri bağlantı hatası: {e}. 5 saniye sonra tekrar denenecek.")
             await asyncio.sleep(5)
         except Exception as e:
+            hub.set_status("Termal Veri: Bağlantı Hatası")
             print(f"Beklenmedik bir hata oluştu: {e}. 10 saniye sonra tekrar denenecek.")
             await asyncio.sleep(10)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Uygulama yaşam döngüsü yöneticisi."""
-    print("Uygulama başlatılıyor... Termal dinleyici görevi oluşturuluyor.")
+    print("Uygulama başlatılıyor... Görüntü tamponları ve termal dinleyici görevi oluşturuluyor.")
+    for recorder in recorders.values():
+        recorder.start()
+    continuous_recorder.start()
+    ptz_tracker.start()
+    thermometry_store.start()
+    prune_task = asyncio.create_task(prune_thermometry())
+    event_pipeline.start()
     asyncio.create_task(listen_for_thermal_anomalies())
+    asyncio.create_task(sweep_incidents())
     yield
+    prune_task.cancel()
+    # Kuyruktaki olaylar, tamponlar ve ISAPI istemcisi kapanmadan önce tamamlanır.
+    await event_pipeline.stop()
+    for recorder in recorders.values():
+        recorder.stop()
+    await asyncio.to_thread(continuous_recorder.stop)
+    ptz_tracker.stop()
+    await asyncio.to_thread(thermometry_store.close)
+    event_catalog.close()
+    await isapi.aclose()
     print("Uygulama kapatılıyor.")
 
 app = FastAPI(
@@ -137,6 +342,127 @@ def get_root():
     return {
         "service_status": "running",
         "last_event_timestamp": datetime.fromtimestamp(last_event_time).isoformat() if last_event_time > 0 else "No events yet.",
-        "is_currently_processing_event": is_processing_event,
+        "is_currently_processing_event": event_pipeline.busy,
+        "open_incidents": len(alarm_engine.incidents),
         "api_docs": "/docs"
-    }
\ No newline at end of file
+    }
+
+@app.get("/ptz", summary="PTZ Konumu", tags=["Genel"])
+def get_ptz_position():
+    """Takip edilen son PTZ konumunu zaman damgasıyla döndürür."""
+    state = ptz_tracker.state
+    return {
+        "position": state.as_dict() if state else None,
+        "fast_mode": ptz_tracker.fast_mode,
+        "polls": ptz_tracker.polls,
+        "errors": ptz_tracker.errors,
+    }
+
+@app.get("/incidents", summary="Açık Olaylar", tags=["Olaylar"])
+def get_open_incidents():
+    """Alarm motorunda şu an açık olan (süregelen) olaylar."""
+    return alarm_engine.open_incidents()
+
+@app.get("/pipeline", summary="Olay Hattı Durumu", tags=["Genel"])
+def get_pipeline_stats():
+    """Aşama başına kuyruk derinliği, işlenen/hatalı sayıları, kuyrukta bekleme ve işlem süresi histogramları."""
+    return event_pipeline.stats()
+
+@app.get("/frames", summary="Kare Veri Yolu Durumu", tags=["Genel"])
+def get_frame_buses():
+    """Akış başına tek çözücünün durumu, abone sayısı, grab/yayın sayıları ve akış gecikmesi."""
+    return {name: recorder.bus.stats() for name, recorder in recorders.items() if recorder.bus is not None}
+
+@app.get("/isapi/latency", summary="ISAPI Gecikme İstatistikleri", tags=["Genel"])
+def get_isapi_latency():
+    """Kameraya yapılan ISAPI isteklerinin uç nokta bazında gecikme histogramlarını döndürür."""
+    return {
+        "async_client": isapi.latency.snapshot(),
+        "sync_client": camera_handler.isapi.latency_stats(),
+    }
+
+@app.get("/thermometry/{rule_id}", summary="Termal Ölçüm Geçmişi", tags=["Genel"])
+def get_thermometry_history(rule_id: int, start: float | None = None, end: float | None = None,
+                            resolution: str = "auto", max_points: int = 2000, channel: int = 2):
+    """
+    Bir kuralın [start, end) aralığındaki Max/Min/Ortalama geçmişini döndürür (epoch saniye,
+    varsayılan son 1 saat). resolution: auto, raw, 1m, 15m veya 1h.
+    """
+    end = time.time() if end is None else end
+    start = end - 3600 if start is None else start
+    if resolution != "auto" and resolution not in LEVELS:
+        raise HTTPException(status_code=400, detail=f"resolution şunlardan biri olmalı: auto, {', '.join(LEVELS)}")
+    result = thermometry_store.query(CAMERA_IP, channel, rule_id, start, end, resolution, max_points)
+    return {"rule_id": rule_id, "start": start, "end": end, **result.as_dict()}
+
+@app.get("/recordings", summary="Sürekli Kayıt Durumu", tags=["Kayıt"])
+def get_recordings():
+    """Kanal başına segment sayısı, disk kullanımı, kayıtlı zaman aralığı ve kota durumu."""
+    return continuous_recorder.stats()
+
+@app.get("/recordings/{channel}", summary="Kayıttan Klip", tags=["Kayıt"])
+def get_recording(channel: int, start: float, end: float | None = None):
+    """
+    [start, end] aralığını (epoch saniye, varsayılan 30 sn) MPEG-TS olarak akıtır. Klip start'tan
+    önceki anahtar karede başlar; kayıt yeniden kodlanmaz.
+    """
+    if channel not in continuous_recorder.channels:
+        raise HTTPException(status_code=404, detail="Kanal kaydedilmiyor")
+    end = start + 30 if end is None else end
+    if not 0 < end - start <= 3600:
+        raise HTTPException(status_code=400, detail="Aralık 0 ile 3600 saniye arasında olmalı")
+    if continuous_recorder.locate(channel, start) is None:
+        raise HTTPException(status_code=404, detail="Bu kanal için kayıt yok")
+    return StreamingResponse(continuous_recorder.read(channel, start, end), media_type="video/mp2t")
+
+@app.get("/events", summary="Olay Listesi", tags=["Olaylar"])
+def list_events(camera: str | None = None, rule_id: int | None = None, start: float | None = None,
+                end: float | None = None, min_temperature: float | None = None, max_temperature: float | None = None,
+                open_only: bool = False, cursor: str | None = None, limit: int = 50, total: bool = False):
+    """
+    Olayları en yeniden eskiye, filtreleyerek döndürür (zamanlar epoch saniye).
+    Sonraki sayfa için yanıttaki next_cursor aynı filtrelerle cursor olarak gönderilir.
+    """
+    try:
+        return event_catalog.query(camera, rule_id, start, end, min_temperature, max_temperature,
+                                   open_only=open_only, cursor=cursor, limit=limit, with_total=total)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Geçersiz cursor")
+
+@app.get("/events/{event_id}", summary="Olay Detayı", tags=["Olaylar"])
+def get_event(event_id: str):
+    event = event_catalog.get(event_id)
+    if event is None:
+        raise HTTPException(status_code=404, detail="Olay bulunamadı")
+    return event
+
+@app.get("/events/{event_id}/thumbnail", summary="Olay Önizlemesi", tags=["Olaylar"])
+def get_event_thumbnail(event_id: str):
+    """Termal görüntünün küçük önizlemesi; katalog öncesi olaylar için ilk istekte üretilir."""
+    event = event_catalog.get(event_id)
+    if event is None:
+        raise HTTPException(status_code=404, detail="Olay bulunamadı")
+    if not (event["thumbnail"] and os.path.exists(event["thumbnail"])):
+        source = event["thermal_image"] or event["normal_image"]
+        if not (source and os.path.exists(source)):
+            raise HTTPException(status_code=404, detail="Olayın görüntüsü yok")
+        with open(source, "rb") as f:
+            thumbnail_bytes = make_thumbnail(f.read())
+        if thumbnail_bytes is None:
+            raise HTTPException(status_code=404, detail="Önizleme üretilemedi")
+        event["thumbnail"] = os.path.join(event["folder"], THUMBNAIL_NAME)
+        with open(event["thumbnail"], "wb") as f:
+            f.write(thumbnail_bytes)
+        event_catalog.set_thumbnail(event_id, event["thumbnail"])
+    return FileResponse(event["thumbnail"], media_type="image/jpeg")
+
+@app.get("/events/{event_id}/files/{name}", summary="Olay Dosyası", tags=["Olaylar"])
+def get_event_file(event_id: str, name: str):
+    """name: thermal_image, normal_image, thermal_clip veya normal_clip."""
+    event = event_catalog.get(event_id)
+    if event is None or name not in FILE_COLUMNS:
+        raise HTTPException(status_code=404, detail="Olay veya dosya bulunamadı")
+    path = event[name]
+    if not (path and os.path.exists(path)):
+        raise HTTPException(status_code=404, detail="Dosya henüz yazılmamış veya yok")
+    return FileResponse(path, media_type="video/mp4" if path.endswith(".mp4") else "image/jpeg")
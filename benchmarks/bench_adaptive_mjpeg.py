@@ -0,0 +1,118 @@
+# bench_adaptive_mjpeg.py
+#
+# Farklı bant genişliğindeki MJPEG izleyicileri: eski davranış (herkese tam çözünürlük, kalite 95) ile
+# uyarlamalı katman seçimi (ClientRate) karşılaştırılır. 720p kareler --fps hızında yayınlanır; her izleyici
+# parçayı aldıktan sonra bağlantısının hızına göre (bayt * 8 / kbps) bekler, bu da WSGI sunucusunun
+# sokete yazarken bloklanmasını taklit eder. İzleyici başına alınan fps, gecikme (kare yayınından
+# izleyiciye tamamen ulaşmasına kadar), son katman ve kodlayıcının toplam CPU'su yazılır.
+#
+# Kullanım:
+#   python bench_adaptive_mjpeg.py --istemci 100000 8000 2000 500 --sure 20
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from ortak.mjpeg_cache import SharedJPEGEncoder
+
+
+class TimedEncoder(SharedJPEGEncoder):
+    """Ölçüm için her parçanın hangi kareden kodlandığını hatırlar."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.part_seq = OrderedDict()
+
+    def _encode(self, frame, seq, tier):
+        part = super()._encode(frame, seq, tier)
+        if part is not None:
+            # Parça nesnesi de tutulur ki id() yeniden kullanılmasın.
+            self.part_seq[id(part)] = (seq, part)
+            while len(self.part_seq) > 500:
+                self.part_seq.popitem(last=False)
+        return part
+
+
+def publisher(encoder, fps, stop, published):
+    rng = np.random.default_rng(0)
+    base = cv2.GaussianBlur(rng.integers(0, 255, (720, 1280, 3), dtype=np.uint8), (0, 0), 2)
+    interval = 1.0 / fps
+    next_time = time.monotonic()
+    i = 0
+    while not stop.is_set():
+        frame = np.roll(base, i * 4, axis=1)
+        published[encoder._frame_seq + 1] = time.monotonic()
+        encoder.publish(frame)
+        i += 1
+        next_time += interval
+        time.sleep(max(0.0, next_time - time.monotonic()))
+
+
+def viewer(encoder, kbps, tier, stop, published, result):
+    latencies, received, settled_from = [], 0, time.monotonic() + 5.0
+    stream = encoder.stream(timeout=0.5, tier=tier)
+    for part in stream:
+        seq = encoder.part_seq.get(id(part), (None,))[0]
+        time.sleep(len(part) * 8 / (kbps * 1000.0))
+        now = time.monotonic()
+        if now >= settled_from and seq in published:
+            received += 1
+            latencies.append(now - published[seq])
+        if stop.is_set():
+            break
+    stream.close()
+    result.update(received=received, latencies=latencies)
+
+
+def run(tiers, kbps_list, fps, seconds, fixed):
+    encoder = TimedEncoder(tiers=tiers)
+    stop = threading.Event()
+    published, results = {}, [dict() for _ in kbps_list]
+    cpu = time.process_time()
+    pub = threading.Thread(target=publisher, args=(encoder, fps, stop, published), daemon=True)
+    pub.start()
+    threads = [threading.Thread(target=viewer, args=(encoder, kbps, fixed, stop, published, results[i]), daemon=True)
+               for i, kbps in enumerate(kbps_list)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    tier_clients = {name: data['clients'] for name, data in encoder.stats()['tiers'].items() if data['clients']}
+    stop.set()
+    for t in threads:
+        t.join(timeout=30)
+    pub.join()
+    used = time.process_time() - cpu
+    return used, results, tier_clients, encoder
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Uyarlamalı MJPEG katman seçimi")
+    ap.add_argument('--istemci', type=int, nargs='+', default=[100000, 8000, 2000, 500],
+                    help="İzleyici bağlantı hızları (kbps)")
+    ap.add_argument('--fps', type=float, default=25.0)
+    ap.add_argument('--sure', type=float, default=20.0)
+    args = ap.parse_args()
+
+    cv2.setNumThreads(1)
+    for label, fixed in (('eski (tam, kalite 95)', 'tam'), ('uyarlamalı', None)):
+        used, results, tier_clients, encoder = run(None, args.istemci, args.fps, args.sure, fixed)
+        measured = args.sure - 5.0
+        print(f"{label}: CPU %{used / args.sure * 100:.0f}, katman başına kodlanan "
+              f"{dict(zip((t.name for t in encoder.tiers), encoder.tier_encoded))}")
+        print(f"  son katmanlar: {tier_clients}")
+        for kbps, result in zip(args.istemci, results):
+            lat = result.get('latencies') or [0.0]
+            print(f"  {kbps:>7} kbps: {result.get('received', 0) / measured:5.1f} fps, gecikme ort "
+                  f"{statistics.mean(lat) * 1000:6.0f} ms, maks {max(lat) * 1000:6.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
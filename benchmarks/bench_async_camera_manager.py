@@ -0,0 +1,151 @@
+# bench_async_camera_manager.py
+#
+# N adet sahte kamerayı camera_simulator ile yerel bir sunucudan sunar ve
+# AsyncCameraManager'ı bunlara bağlar. Her N için ayrı bir süreçte
+# CPU kullanımı, RSS, thread sayısı ve uçtan uca alarm gecikmesi (sahte kameranın mesajı
+# gönderdiği an -> Alarm üretildiği an) ölçülür.
+#
+# Kullanım:
+#   python bench_async_camera_manager.py --kamera 10 50 100 200 --sure 20 --hiz 1
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+from camera_simulator import SimulatorOptions, start_cameras
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+MANAGER_DIR = os.path.join(ROOT, 'REST_API', 'yangın2')
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+# --- Ölçüm ---
+def rss_mb() -> float:
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+async def measure(cameras, port, seconds, warmup, parse_workers):
+    sys.path.append(MANAGER_DIR)
+    from async_camera_manager import AsyncCameraManager
+
+    config = {'cameras': [{
+        'id': i + 1, 'enabled': True, 'ip': '127.0.0.1', 'port': port, 'user': 'admin', 'password': 'admin',
+        'alarm_cooldown': 0.0,
+        'autonomous_scan': {'enabled': True, 'pan_start': 45.0, 'pan_end': 135.0, 'tilt': 0.0, 'speed': 0.1, 'dwell_time': 2.0},
+        'anomaly_detection': {'thermal_threshold': 80.0},
+        'manual_override_timeout': 120.0,
+    } for i in range(cameras)]}
+    manager = AsyncCameraManager(config=config, parse_workers=parse_workers)
+    latencies = []
+    manager.add_alarm_listener(lambda alarm: latencies.append((alarm.detected_at - alarm.data['simSentAt']) * 1000.0))
+    run_task = asyncio.create_task(manager.run())
+    await asyncio.sleep(warmup)
+
+    latencies.clear()
+    messages_start = sum(w.messages for w in manager.workers.values())
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    await asyncio.sleep(seconds)
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+    messages = sum(w.messages for w in manager.workers.values()) - messages_start
+    result = {
+        'kamera': cameras,
+        'cpu_yuzde': 100.0 * cpu / wall,
+        'rss_mb': rss_mb(),
+        'thread': threading.active_count(),
+        'mesaj_hizi': messages / wall,
+        'alarm': len(latencies),
+        'p50_ms': statistics.median(latencies) if latencies else None,
+        'p95_ms': statistics.quantiles(latencies, n=20)[-1] if len(latencies) >= 20 else None,
+        'max_ms': max(latencies) if latencies else None,
+    }
+    manager.stop_all()
+    await run_task
+    return result
+
+
+async def serve(port, options):
+    """Tüm sahte kameralar tek porttan sunulur (PTZ durumu paylaşılır; ölçüm için yeterli)."""
+    servers = await start_cameras(options, '127.0.0.1', port)
+    await servers[0].server.serve_forever()
+
+
+def wait_for_port(port, timeout=10.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.2):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Sahte kamera sunucusu {port} portunda açılmadı")
+
+
+def fmt(value):
+    return f"{value:8.1f}" if value is not None else "       -"
+
+
+def main():
+    ap = argparse.ArgumentParser(description="AsyncCameraManager ölçeklenme ölçümü")
+    ap.add_argument('--kamera', type=int, nargs='+', default=[10, 50, 100, 200])
+    ap.add_argument('--sure', type=float, default=20.0, help="Ölçüm süresi (saniye)")
+    ap.add_argument('--isinma', type=float, default=5.0, help="Ölçüm öncesi bekleme (saniye)")
+    ap.add_argument('--hiz', type=float, default=1.0, help="Kamera başına saniyedeki mesaj")
+    ap.add_argument('--sicak-her', type=int, default=5, help="Her kaçıncı mesajın eşik üstü olacağı")
+    ap.add_argument('--kural', type=int, default=10, help="Mesaj başına kural sayısı")
+    ap.add_argument('--isci', type=int, default=4, help="Ayrıştırma işçi havuzu boyutu")
+    # Alt süreç kipleri
+    ap.add_argument('--sunucu', type=int, help=argparse.SUPPRESS)
+    ap.add_argument('--olcum', type=int, help=argparse.SUPPRESS)
+    ap.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.sunucu:
+        asyncio.run(serve(args.sunucu, SimulatorOptions(rate=args.hiz, hot_every=args.sicak_her, rules=args.kural)))
+        return
+    if args.olcum:
+        result = asyncio.run(measure(args.olcum, args.port, args.sure, args.isinma, args.isci))
+        print(json.dumps(result))
+        return
+
+    print(f"{'kamera':>6} {'cpu %':>8} {'rss MB':>8} {'thread':>6} {'mesaj/s':>8} {'alarm':>6} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+    for cameras in args.kamera:
+        port = free_port()
+        server = subprocess.Popen([sys.executable, __file__, '--sunucu', str(port), '--hiz', str(args.hiz),
+                                   '--sicak-her', str(args.sicak_her), '--kural', str(args.kural)])
+        try:
+            wait_for_port(port)
+            output = subprocess.run([sys.executable, __file__, '--olcum', str(cameras), '--port', str(port),
+                                     '--sure', str(args.sure), '--isinma', str(args.isinma), '--isci', str(args.isci)],
+                                    capture_output=True, text=True, check=True).stdout
+            r = json.loads(output.strip().splitlines()[-1])
+            print(f"{r['kamera']:>6} {fmt(r['cpu_yuzde'])} {fmt(r['rss_mb'])} {r['thread']:>6} {fmt(r['mesaj_hizi'])} "
+                  f"{r['alarm']:>6} {fmt(r['p50_ms'])} {fmt(r['p95_ms'])} {fmt(r['max_ms'])}")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+# bench_display_scaling.py
+#
+# GUI'deki ekran hazırlama yolunu karşılaştırır:
+#   eski: tam çözünürlükte cvtColor -> QImage -> QImage.scaled(640, 360, KeepAspectRatio)
+#         (GUI'deki hali FastTransformation, yani en yakın komşu; Smooth da karşılaştırma için ölçülür)
+#   yeni: DisplayScaler (önce cv2.resize, sonra küçük karede cvtColor(dst=)); INTER_AREA ve INTER_LINEAR
+# Kare başına aşama süreleri (medyan) ve toplam süre yazılır. OpenCV resize'ı çok çekirdekte paralelleştirir;
+# sonuçlar çekirdek sayısına göre değişir.
+#
+# Kullanım:
+#   python bench_display_scaling.py --kare 300
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import cv2
+import numpy as np
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QImage
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from ortak.display_scaler import DisplayScaler
+
+SOURCES = {'1080p normal': (1080, 1920), '720p termal': (720, 1280), '384x288 termal': (288, 384)}
+
+
+def synthetic_frames(h, w, count=8):
+    rng = np.random.default_rng(0)
+    base = cv2.GaussianBlur(rng.integers(0, 255, (h, w, 3), dtype=np.uint8), (0, 0), 5)
+    return [np.roll(base, i * 7, axis=1) for i in range(count)]
+
+
+def legacy(frame, mode):
+    h, w = frame.shape[:2]
+    t0 = time.perf_counter()
+    rgb_image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    t1 = time.perf_counter()
+    qt_img = QImage(rgb_image.data, w, h, 3 * w, QImage.Format_RGB888)
+    qt_img.scaled(640, 360, Qt.KeepAspectRatio, mode)
+    t2 = time.perf_counter()
+    return (t1 - t0) * 1000.0, (t2 - t1) * 1000.0
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Ekran küçültme yolu karşılaştırması")
+    ap.add_argument('--kare', type=int, default=300)
+    args = ap.parse_args()
+
+    print(f"OpenCV thread sayısı: {cv2.getNumThreads()}")
+    print(f"{'kaynak':>16} {'yol':>20} {'renk ms':>8} {'ölçek ms':>9} {'toplam ms':>10}")
+    for name, (h, w) in SOURCES.items():
+        frames = synthetic_frames(h, w)
+        for label, mode in (('eski Qt Fast', Qt.FastTransformation), ('eski Qt Smooth', Qt.SmoothTransformation)):
+            color, scale = [], []
+            for i in range(args.kare):
+                c, s = legacy(frames[i % len(frames)], mode)
+                color.append(c)
+                scale.append(s)
+            c, s = statistics.median(color), statistics.median(scale)
+            print(f"{name:>16} {label:>20} {c:8.2f} {s:9.2f} {c + s:10.2f}")
+
+        for label, interpolation in (('yeni INTER_AREA', cv2.INTER_AREA), ('yeni INTER_LINEAR', cv2.INTER_LINEAR)):
+            scaler = DisplayScaler(640, 360, interpolation=interpolation)
+            resize, convert = [], []
+            for i in range(args.kare):
+                rgb = scaler.scale(frames[i % len(frames)])
+                QImage(rgb.data, rgb.shape[1], rgb.shape[0], rgb.strides[0], QImage.Format_RGB888)
+                stats = scaler.stats()
+                resize.append(stats['resize_ms'])
+                convert.append(stats['convert_ms'])
+            r, c = statistics.median(resize), statistics.median(convert)
+            print(f"{name:>16} {label:>20} {c:8.2f} {r:9.2f} {c + r:10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+# bench_event_catalog.py
+#
+# EventCatalog'a N sentetik olay yazar ve tipik filtreli sorguların (kamera + zaman +
+# sıcaklık, derin sayfalama) süresini ölçer. Karşılaştırma için aynı sorguyu klasör
+# taramasıyla yapmanın maliyeti küçük bir örnek üzerinden tahmin edilir.
+#
+# Kullanım:
+#   python bench_event_catalog.py --olay 1000000
+
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from ortak.event_catalog import EventCatalog, event_from_folder
+
+CAMERAS = [f"192.168.1.{60 + i}" for i in range(10)]
+
+
+def synthetic_events(count, now, rng):
+    for _ in range(count):
+        trigger_time = now - rng.uniform(0, 365 * 86400)
+        event_id = str(uuid.UUID(int=rng.getrandbits(128)))
+        yield {
+            'event_id': event_id, 'camera': rng.choice(CAMERAS), 'rule_id': rng.randint(1, 10),
+            'trigger_time': trigger_time, 'max_temperature': rng.uniform(75.0, 150.0),
+            'pan': rng.uniform(0, 360), 'tilt': rng.uniform(-10, 90), 'folder': f"events/{event_id[:8]}",
+            'thermal_image': f"events/{event_id[:8]}/thermal_image.jpg",
+        }
+
+
+def timed(fn, repeat=20):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return statistics.median(samples), result
+
+
+def folder_scan_cost(root, count=500):
+    """data.json okuyup ayrıştırmanın olay başına maliyeti (klasör taramalı eski yöntem)."""
+    for i in range(count):
+        folder = os.path.join(root, f"olay_{i}")
+        os.makedirs(folder)
+        with open(os.path.join(folder, 'data.json'), 'w', encoding='utf-8') as f:
+            json.dump({'event_id': str(i), 'timestamp_utc': '2024-01-01T00:00:00Z',
+                       'triggering_thermal_data': {'ruleID': 1, 'LinePolygonThermCfg': {'MaxTemperature': 90.0}}}, f)
+    start = time.perf_counter()
+    for i in range(count):
+        event_from_folder(os.path.join(root, f"olay_{i}"), 'kamera')
+    return (time.perf_counter() - start) / count
+
+
+def main():
+    ap = argparse.ArgumentParser(description="EventCatalog sorgu ölçümü")
+    ap.add_argument('--olay', type=int, default=1_000_000)
+    args = ap.parse_args()
+
+    root = tempfile.mkdtemp(prefix='event_catalog_bench_')
+    try:
+        catalog = EventCatalog(os.path.join(root, 'catalog.db'))
+        rng = random.Random(0)
+        now = time.time()
+        start = time.perf_counter()
+        events = synthetic_events(args.olay, now, rng)
+        while True:
+            batch = [e for _, e in zip(range(10000), events)]
+            if not batch:
+                break
+            catalog.add_many(batch)
+        print(f"{args.olay} olay yazıldı: {time.perf_counter() - start:.1f} sn, "
+              f"{os.path.getsize(catalog.path) / 1e6:.0f} MB")
+
+        week = now - 7 * 86400
+        queries = {
+            'son 50 olay': lambda: catalog.query(limit=50),
+            'kamera 3, son hafta, >90 °C': lambda: catalog.query(camera=CAMERAS[3], start=week, min_temperature=90.0),
+            'kamera 3, kural 5, son ay': lambda: catalog.query(camera=CAMERAS[3], rule_id=5, start=now - 30 * 86400),
+            'aynı + toplam sayı': lambda: catalog.query(camera=CAMERAS[3], start=week, min_temperature=90.0, with_total=True),
+        }
+        for label, fn in queries.items():
+            ms, result = timed(fn)
+            print(f"{label:>30}: {ms:7.2f} ms ({len(result['events'])} olay)")
+
+        cursor, pages = None, 0
+        start = time.perf_counter()
+        while pages < 200:
+            page = catalog.query(camera=CAMERAS[3], cursor=cursor, limit=50)
+            cursor, pages = page['next_cursor'], pages + 1
+            if cursor is None:
+                break
+        print(f"{'200 sayfa imleçle gezinme':>30}: {(time.perf_counter() - start) * 1000.0 / pages:7.2f} ms/sayfa")
+
+        per_event = folder_scan_cost(os.path.join(root, 'klasorler'))
+        print(f"Klasör taraması tahmini: {per_event * args.olay:.0f} sn / sorgu ({per_event * 1e6:.0f} µs/olay)")
+        catalog.close()
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+# bench_event_service_latency.py
+#
+# Sürekli akan sahte bir realTimethermometry akışı altında FastAPI olay servisinin
+# "/" uç noktasının gecikmesini ölçer. Dinleyici event loop'u bloklarsa gecikme
+# saniyeler mertebesine çıkar; asenkron istemciyle milisaniyelerde kalmalıdır.
+#
+# Kullanım:
+#   python bench_event_service_latency.py --istek 500 --mesaj-hizi 50
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+SERVICE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'REST_API', 'yangın_algılama_ve_olay yönetim sistemi')
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def make_stream_handler(rate: float, stats: dict):
+    interval = 1.0 / rate
+
+    class StreamHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            if 'realTimethermometry' not in self.path:
+                self.send_response(404)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', 'multipart/mixed; boundary=boundary')
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            try:
+                while True:
+                    body = json.dumps({"ThermometryUploadList": {"ThermometryUpload": [{
+                        "ruleID": 1,
+                        "LinePolygonThermCfg": {"MaxTemperature": 40.0, "MinTemperature": 20.0, "AverageTemperature": 30.0},
+                    }]}}).encode()
+                    self.wfile.write(b'--boundary\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n' % len(body) + body + b'\r\n')
+                    self.wfile.flush()
+                    stats['messages'] += 1
+                    time.sleep(interval)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def log_message(self, *args):
+            pass
+
+    return StreamHandler
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Olay servisi '/' gecikme yük testi")
+    ap.add_argument('--istek', type=int, default=300, help="Ölçülecek '/' istek sayısı")
+    ap.add_argument('--mesaj-hizi', type=float, default=50.0, help="Sahte kameranın saniyedeki mesaj sayısı")
+    ap.add_argument('--isinma', type=float, default=3.0, help="Ölçüm öncesi bekleme (saniye)")
+    args = ap.parse_args()
+
+    stats = {'messages': 0}
+    camera = ThreadingHTTPServer(('127.0.0.1', 0), make_stream_handler(args.mesaj_hizi, stats))
+    camera.daemon_threads = True
+    threading.Thread(target=camera.serve_forever, daemon=True).start()
+
+    api_port = free_port()
+    env = dict(os.environ, CAMERA_IP='127.0.0.1', CAMERA_PORT=str(camera.server_port), RTSP_PORT=str(free_port()))
+    service = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'main:app', '--port', str(api_port), '--log-level', 'warning'],
+        cwd=SERVICE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT,
+    )
+    try:
+        url = f'http://127.0.0.1:{api_port}/'
+        deadline = time.time() + 20
+        while True:
+            try:
+                httpx.get(url, timeout=1.0)
+                break
+            except httpx.HTTPError:
+                if time.time() > deadline or service.poll() is not None:
+                    print("HATA: Olay servisi başlatılamadı.")
+                    return
+                time.sleep(0.2)
+        time.sleep(args.isinma)
+
+        latencies = []
+        start_messages = stats['messages']
+        with httpx.Client(timeout=30.0) as client:
+            start = time.perf_counter()
+            for _ in range(args.istek):
+                t0 = time.perf_counter()
+                client.get(url).raise_for_status()
+                latencies.append((time.perf_counter() - t0) * 1000.0)
+            elapsed = time.perf_counter() - start
+        streamed = stats['messages'] - start_messages
+
+        print(f"Ölçüm: {args.istek} istek, {elapsed:.1f} sn, bu sürede akıtılan termal mesaj: {streamed}")
+        print(f"'/' gecikmesi (ms): p50={percentile(latencies, 50):.2f} p95={percentile(latencies, 95):.2f} "
+              f"p99={percentile(latencies, 99):.2f} maks={max(latencies):.2f} ort={statistics.mean(latencies):.2f}")
+    finally:
+        service.terminate()
+        service.wait(timeout=10)
+        camera.shutdown()
+
+
+if __name__ == '__main__':
+    main()
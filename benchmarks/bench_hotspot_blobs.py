@@ -0,0 +1,86 @@
+# bench_hotspot_blobs.py
+#
+# Sıcak bölge çıkarma maliyeti: extract_blobs (°C matrisinde eşik + bağlı bileşen + blob başına
+# alan/maks/ort/merkez/kutu) ile eski yol (sahte renkli görüntüde HSV inRange + findContours +
+# kontur başına maske ve kırmızı kanal ortalaması) karşılaştırılır. Sahne: gürültülü arka plan
+# üzerinde --bolge adet Gauss sıcak nokta; her karede hafifçe kayar. Tek çekirdekte kare süresi ve
+# --fps (sensörün doğal hızı) için çekirdek payı yazılır.
+#
+# Kullanım:
+#   python bench_hotspot_blobs.py --kare 300 --bolge 20 --fps 30
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from ortak.hotspot_blobs import BLOB_DTYPE, extract_blobs
+from ortak.pixel_data import KNOWN_RESOLUTIONS
+
+THRESHOLD = 60.0
+
+
+def scene(width, height, spots, rng):
+    matrix = rng.normal(25.0, 1.5, (height, width)).astype(np.float32)
+    yy, xx = np.mgrid[0:height, 0:width].astype(np.float32)
+    for x, y, r, t in zip(rng.uniform(0, width, spots), rng.uniform(0, height, spots),
+                          rng.uniform(2, max(3, width / 40), spots), rng.uniform(65, 120, spots)):
+        matrix += (t - 25.0) * np.exp(-((xx - x) ** 2 + (yy - y) ** 2) / (2 * r * r))
+    return matrix
+
+
+def legacy(matrix):
+    # ptz_gui_thermal_corrected_04_bax_ısı.py'deki yol; palet görüntüsü burada matristen üretilir.
+    gray = cv2.normalize(matrix, None, 0, 255, cv2.NORM_MINMAX).astype(np.uint8)
+    frame = cv2.applyColorMap(gray, cv2.COLORMAP_JET)
+    hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+    mask = cv2.inRange(hsv, (0, 100, 200), (10, 255, 255))
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    out = []
+    for cnt in contours:
+        area = cv2.contourArea(cnt)
+        if area > 50:
+            region = np.zeros(mask.shape, np.uint8)
+            cv2.drawContours(region, [cnt], -1, 255, -1)
+            out.append((area, cv2.mean(frame, mask=region)[2]))
+    return out
+
+
+def timed(fn, frames):
+    times = []
+    for matrix in frames:
+        t0 = time.perf_counter()
+        result = fn(matrix)
+        times.append((time.perf_counter() - t0) * 1000.0)
+    return statistics.median(times), max(times), result
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Radyometrik matriste sıcak bölge çıkarma maliyeti")
+    ap.add_argument('--kare', type=int, default=300)
+    ap.add_argument('--bolge', type=int, default=20, help="Sahnedeki sıcak nokta sayısı")
+    ap.add_argument('--fps', type=float, default=30.0, help="Sensörün doğal kare hızı")
+    args = ap.parse_args()
+
+    cv2.setNumThreads(1)
+    rng = np.random.default_rng(0)
+    print(f"blob kaydı {BLOB_DTYPE.itemsize} bayt, eşik {THRESHOLD} °C, tek iş parçacığı")
+    print(f"{'çözünürlük':>11} {'blob':>5} {'yeni ms':>8} {'en kötü':>8} {'eski ms':>8} {'kapasite fps':>13} "
+          f"{'çekirdek %':>11}")
+    for width, height in KNOWN_RESOLUTIONS:
+        base = scene(width, height, args.bolge, rng)
+        frames = [np.roll(base, (i % 20, i % 30), axis=(0, 1)) for i in range(min(args.kare, 60))]
+        frames = (frames * (args.kare // len(frames) + 1))[:args.kare]
+        new_ms, worst, blobs = timed(lambda m: extract_blobs(m, THRESHOLD, min_area=4), frames)
+        old_ms, _, _ = timed(legacy, frames[:max(1, args.kare // 5)])
+        print(f"{width}x{height:<6} {len(blobs):>5} {new_ms:8.3f} {worst:8.3f} {old_ms:8.3f} "
+              f"{1000.0 / new_ms:13.0f} {new_ms * args.fps / 10.0:11.2f}")
+
+
+if __name__ == '__main__':
+    main()
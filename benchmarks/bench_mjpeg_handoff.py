@@ -0,0 +1,122 @@
+# bench_mjpeg_handoff.py
+#
+# transfer.py'nin yakalama → MJPEG aktarımı:
+#   eski yol: cap.read() + global kilit altında frame.copy() + publish; izleyici olsun olmasın her kare
+#             renk dönüşümünden geçer ve tam çözünürlükte kopyalanır,
+#   yeni yol: FrameBus + relay_bus; çözülen dizi kopyalanmadan kodlayıcıya geçer, izleyici yokken
+#             veri yolu sadece grab() yapar.
+# 720p mp4v klip olabildiğince hızlı okunur; sonuçlar kaynak kare başınadır, --fps ile çekirdek payına ve
+# MB/s'ye çevrilir. Bellek trafiği kare başına yazılan/okunan bayttan hesaplanır: retrieve çıktısı bir
+# yazma, kopya bir okuma + bir yazmadır (JPEG kodlamanın okuması iki yolda da aynıdır, dahil edilmez).
+#
+# Kullanım:
+#   python bench_mjpeg_handoff.py --izleyici 0 2
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from ortak.frame_bus import FrameBus
+from ortak.mjpeg_cache import SharedJPEGEncoder, relay_bus
+
+
+def write_clip(path, seconds, fps):
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (1280, 720))
+    base = cv2.GaussianBlur(np.random.default_rng(0).integers(0, 255, (720, 1280, 3), dtype=np.uint8), (0, 0), 3)
+    for i in range(int(seconds * fps)):
+        writer.write(np.roll(base, i * 4, axis=1))
+    writer.release()
+
+
+def start_viewers(encoder, count, stop):
+    def view():
+        for _ in encoder.stream(timeout=0.2):
+            if stop.is_set():
+                break
+    threads = [threading.Thread(target=view, daemon=True) for _ in range(count)]
+    for t in threads:
+        t.start()
+    while encoder.clients < count:
+        time.sleep(0.01)
+    return threads
+
+
+def stop_viewers(encoder, threads, stop):
+    # stream() zaman aşımında bir şey üretmez; izleyiciler küçük bir kareyle uyandırılıp bırakılır.
+    stop.set()
+    while any(t.is_alive() for t in threads):
+        encoder.publish(np.zeros((8, 8, 3), np.uint8))
+        time.sleep(0.01)
+
+
+def legacy(path, viewers):
+    encoder = SharedJPEGEncoder()
+    lock = threading.Lock()
+    stop = threading.Event()
+    threads = start_viewers(encoder, viewers, stop)
+    cap = cv2.VideoCapture(path, cv2.CAP_FFMPEG)
+    frames = traffic = 0
+    cpu = time.process_time()
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        with lock:
+            latest = frame.copy()
+            encoder.publish(latest)
+        frames += 1
+        traffic += 3 * frame.nbytes
+    used = time.process_time() - cpu
+    stop_viewers(encoder, threads, stop)
+    cap.release()
+    return used, frames, traffic, encoder.encoded
+
+
+def bus(path, viewers, total):
+    encoder = SharedJPEGEncoder()
+    frame_bus = FrameBus(path, 'bench', reconnect_delay=0.1)
+    stop = threading.Event()
+    threads = start_viewers(encoder, viewers, stop)
+    threading.Thread(target=relay_bus, args=(frame_bus, encoder, 0.2), daemon=True).start()
+    cpu = time.process_time()
+    frame_bus.start()
+    while frame_bus.grabbed < total:
+        time.sleep(0.005)
+    frame_bus.stop()
+    used = time.process_time() - cpu
+    stop_viewers(encoder, threads, stop)
+    latest = frame_bus.latest()
+    traffic = frame_bus.published * (latest.image.nbytes if latest is not None else 0)
+    return used, frame_bus.grabbed, traffic, encoder.encoded
+
+
+def main():
+    ap = argparse.ArgumentParser(description="transfer.py yakalama aktarımı: kopya + kilit ile veri yolu")
+    ap.add_argument('--izleyici', type=int, nargs='+', default=[0, 2], help="Denenecek izleyici sayıları")
+    ap.add_argument('--fps', type=float, default=25.0)
+    args = ap.parse_args()
+
+    cv2.setNumThreads(1)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'klip.mp4')
+        write_clip(path, 8, args.fps)
+        total = int(cv2.VideoCapture(path).get(cv2.CAP_PROP_FRAME_COUNT))
+        print(f"720p klip, {total} kare; değerler kaynak kare başına, çekirdek ve MB/s {args.fps:g} fps için")
+        print(f"{'izleyici':>8} {'yol':>5} {'CPU ms':>7} {'çekirdek %':>10} {'bellek MB/s':>11} {'kodlanan':>9}")
+        for viewers in args.izleyici:
+            for name, run in (('eski', lambda: legacy(path, viewers)), ('yeni', lambda: bus(path, viewers, total))):
+                used, frames, traffic, encoded = run()
+                per_frame = used / max(1, frames)
+                print(f"{viewers:>8} {name:>5} {per_frame * 1000:7.2f} {per_frame * args.fps * 100:10.1f} "
+                      f"{traffic / max(1, frames) * args.fps / 1e6:11.0f} {encoded:>9}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+# bench_multipart_parser.py
+#
+# realTimethermometry akışını kaydedip 10x-100x hızda tekrar oynatarak eski
+# "buffer += chunk / split" döngüsü ile ortak.multipart_parser'ı karşılaştırır.
+#
+# Kullanım:
+#   python bench_multipart_parser.py                          # sentetik kayıt ile
+#   python bench_multipart_parser.py --kaydet akis.bin --sure 60   # kameradan kayıt al
+#   python bench_multipart_parser.py --kayit akis.bin --hiz 10 100
+
+import argparse
+import json
+import os
+import struct
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from ortak.multipart_parser import MultipartStreamParser, iter_json_payloads
+
+CHUNK_SIZE = 1024
+_RECORD_HEADER = struct.Struct('<dI')  # (zaman damgası, chunk uzunluğu)
+
+
+def record_stream(path, seconds, url, user, password):
+    """Kameranın ham multipart akışını zaman damgalı chunk'lar olarak dosyaya yazar."""
+    import requests
+    from requests.auth import HTTPDigestAuth
+
+    start = time.time()
+    with requests.get(url, auth=HTTPDigestAuth(user, password), stream=True, timeout=(5, 65)) as response, \
+            open(path, 'wb') as f:
+        response.raise_for_status()
+        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+            now = time.time() - start
+            f.write(_RECORD_HEADER.pack(now, len(chunk)))
+            f.write(chunk)
+            if now > seconds:
+                break
+
+
+def load_recording(path):
+    chunks = []
+    with open(path, 'rb') as f:
+        data = f.read()
+    offset = 0
+    while offset < len(data):
+        ts, length = _RECORD_HEADER.unpack_from(data, offset)
+        offset += _RECORD_HEADER.size
+        chunks.append((ts, data[offset:offset + length]))
+        offset += length
+    return chunks
+
+
+def synthetic_recording(messages, rules, content_length):
+    """Kamera yokken kullanılacak, saniyede bir mesaj gönderen sentetik bir kayıt üretir."""
+    chunks = []
+    for i in range(messages):
+        uploads = [{
+            "ruleID": r + 1,
+            "LinePolygonThermCfg": {"MaxTemperature": 40.0 + r, "MinTemperature": 20.0, "AverageTemperature": 30.0},
+            "HighestPoint": {"positionX": 0.5, "positionY": 0.5},
+            "LowestPoint": {"positionX": 0.1, "positionY": 0.1},
+        } for r in range(rules)]
+        body = json.dumps({"ThermometryUploadList": {"ThermometryUpload": uploads}}).encode()
+        header = b'--boundary\r\nContent-Type: application/json; charset="UTF-8"\r\n'
+        if content_length:
+            header += b'Content-Length: %d\r\n' % len(body)
+        message = header + b'\r\n' + body + b'\r\n'
+        for off in range(0, len(message), CHUNK_SIZE):
+            chunks.append((float(i), message[off:off + CHUNK_SIZE]))
+    return chunks
+
+
+def legacy_loop(chunks):
+    """ThermalDataThread.run içindeki eski döngünün birebir kopyası."""
+    buffer = b''
+    for chunk in chunks:
+        buffer += chunk
+        while b'--boundary' in buffer:
+            parts = buffer.split(b'--boundary', 1)
+            block, buffer = parts[0], parts[1]
+            if b'Content-Type: application/json' in block:
+                json_start = block.find(b'{')
+                json_end = block.rfind(b'}')
+                if json_start != -1 and json_end != -1:
+                    try:
+                        yield json.loads(block[json_start:json_end + 1].decode('utf-8'))
+                    except json.JSONDecodeError:
+                        pass
+
+
+def new_parser(chunks):
+    return iter_json_payloads(MultipartStreamParser(), chunks)
+
+
+def paced(recording, speed):
+    """Kaydı orijinal zamanlamanın 'speed' katı hızda chunk chunk verir."""
+    start = time.perf_counter()
+    for ts, chunk in recording:
+        delay = ts / speed - (time.perf_counter() - start)
+        if delay > 0:
+            time.sleep(delay)
+        yield chunk
+
+
+def run(name, consumer, recording, speed):
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    count = sum(1 for _ in consumer(paced(recording, speed) if speed else (c for _, c in recording)))
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    nominal = recording[-1][0] / speed if speed else 0.0
+    hiz = f"{speed:g}x" if speed else "sınırsız"
+    print(f"{name:<10} hız={hiz:<9} mesaj={count:<6} duvar={wall:7.3f}s (hedef {nominal:6.2f}s) "
+          f"cpu={cpu:7.3f}s  mesaj başı cpu={cpu / max(count, 1) * 1e6:8.1f}µs")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Multipart termal akış ayrıştırıcı karşılaştırması")
+    ap.add_argument('--kayit', help="Daha önce --kaydet ile alınmış kayıt dosyası")
+    ap.add_argument('--kaydet', help="Kameradan kayıt alıp bu dosyaya yaz")
+    ap.add_argument('--sure', type=float, default=60.0, help="Kayıt süresi (saniye)")
+    ap.add_argument('--url', default='http://192.168.1.64/ISAPI/Thermal/channels/2/thermometry/realTimethermometry/rules?format=json')
+    ap.add_argument('--user', default='admin')
+    ap.add_argument('--password', default='ErenEnerji')
+    ap.add_argument('--hiz', type=float, nargs='+', default=[10, 100, 0], help="Oynatma hızları (0 = beklemesiz)")
+    ap.add_argument('--mesaj', type=int, default=200, help="Sentetik kayıttaki mesaj sayısı")
+    ap.add_argument('--kural', type=int, default=200, help="Sentetik mesaj başına kural sayısı (mesaj boyutu)")
+    ap.add_argument('--content-length', action='store_true', help="Sentetik parçalara Content-Length ekle")
+    args = ap.parse_args()
+
+    if args.kaydet:
+        record_stream(args.kaydet, args.sure, args.url, args.user, args.password)
+        print(f"Kayıt tamamlandı: {args.kaydet}")
+        return
+
+    if args.kayit:
+        recording = load_recording(args.kayit)
+    else:
+        recording = synthetic_recording(args.mesaj, args.kural, args.content_length)
+    total = sum(len(c) for _, c in recording)
+    print(f"Kayıt: {len(recording)} chunk, {total / 1024:.0f} KiB, {recording[-1][0]:.0f}s gerçek süre")
+
+    for speed in args.hiz:
+        run("eski", legacy_loop, recording, speed)
+        run("yeni", new_parser, recording, speed)
+
+
+if __name__ == '__main__':
+    main()
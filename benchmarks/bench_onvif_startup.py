@@ -0,0 +1,69 @@
+# bench_onvif_startup.py
+#
+# Kameraların ONVIF başlangıç süresini ölçer: önce profil önbelleği boşken (soğuk),
+# sonra önbellek doluyken (sıcak); her turda kameralar sırayla ve paralel bağlanır.
+#
+# Kullanım:
+#   python bench_onvif_startup.py --ip 192.168.1.64 192.168.1.65
+#   python bench_onvif_startup.py --config "../REST_API/yangın2/config.json"
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from ortak.onvif_init import OnvifInitializer, ProfileCache, connect_ptz
+
+
+def load_cameras(args):
+    if args.config:
+        with open(args.config, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        return [(c['ip'], 80, c['user'], c['password']) for c in config['cameras'] if c.get('enabled', False)]
+    return [(ip, args.port, args.user, args.password) for ip in args.ip]
+
+
+def run_serial(cameras, cache):
+    start = time.perf_counter()
+    for host, port, user, password in cameras:
+        connect_ptz(host, port, user, password, cache=cache)
+    return time.perf_counter() - start
+
+
+def run_parallel(cameras, cache):
+    init = OnvifInitializer(max_workers=len(cameras), cache=cache)
+    start = time.perf_counter()
+    futures = [init.submit(host, host, port, user, password) for host, port, user, password in cameras]
+    for future in futures:
+        future.result()
+    elapsed = time.perf_counter() - start
+    init.shutdown()
+    return elapsed
+
+
+def main():
+    ap = argparse.ArgumentParser(description="ONVIF soğuk/sıcak başlangıç süreleri")
+    ap.add_argument('--ip', nargs='+', default=['192.168.1.64'])
+    ap.add_argument('--port', type=int, default=80)
+    ap.add_argument('--user', default='admin')
+    ap.add_argument('--password', default='ErenEnerji')
+    ap.add_argument('--config', help="CameraManager config.json dosyası (--ip yerine)")
+    args = ap.parse_args()
+
+    cameras = load_cameras(args)
+    print(f"{len(cameras)} kamera ölçülüyor")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'onvif_profiles.json')
+        for mode, runner in (("sıralı", run_serial), ("paralel", run_parallel)):
+            if os.path.exists(path):
+                os.remove(path)
+            cold = runner(cameras, ProfileCache(path))
+            warm = runner(cameras, ProfileCache(path))
+            print(f"{mode:<8} soğuk={cold:7.2f}s  sıcak={warm:7.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+# bench_overlay.py
+#
+# Bindirme maliyeti: eski yol (tam çözünürlüklü kareye her karede drawMarker/putText + ROI polylines,
+# ROI noktaları her karede np.array ile yeniden kurulur) ile OverlayCompositor (küçültülmüş karede önbellekli
+# ROI/ızgara katmanı + alfa karosu işaretler) karşılaştırılır. Sadece bindirme süresi ölçülür; küçültme
+# maliyeti için bench_display_scaling.py'ye bakın.
+#
+# Kullanım:
+#   python bench_overlay.py --kare 500
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from ortak.display_scaler import DisplayScaler
+from ortak.overlay import Marker, OverlayCompositor, grid_lines
+
+SOURCES = {'1080p': (1080, 1920), '720p': (720, 1280), '384x288': (288, 384)}
+ROI = [(120, 90), (880, 110), (860, 900), (140, 880)]   # kalibrasyon köşeleri, 0..1000 ölçeği
+
+
+def legacy(frame, i):
+    h, w = frame.shape[:2]
+    x, y = 0.3 + 0.4 * (i % 50) / 50, 0.5
+    px, py = int(x * w), int(y * h)
+    cv2.drawMarker(frame, (px, py), (0, 0, 255), cv2.MARKER_CROSS, 20, 2)
+    cv2.putText(frame, f"MAKS: {80 + i % 7 / 10:.1f} C", (px + 15, py - 15), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
+    cv2.drawMarker(frame, (w - px, py), (255, 0, 0), cv2.MARKER_CROSS, 20, 2)
+    cv2.putText(frame, "MIN: 21.4 C", (w - px + 15, py + 15), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 0, 0), 2)
+    pts = np.array([(px_ / 1000.0 * w, py_ / 1000.0 * h) for px_, py_ in ROI], np.int32).reshape((-1, 1, 2))
+    cv2.polylines(frame, [pts], isClosed=True, color=(0, 255, 0), thickness=2)
+    for line in grid_lines(4, 4):
+        p = np.array([(lx * w, ly * h) for lx, ly in line], np.int32).reshape((-1, 1, 2))
+        cv2.polylines(frame, [p], False, (255, 255, 255), 1)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Bindirme yolu karşılaştırması")
+    ap.add_argument('--kare', type=int, default=500)
+    args = ap.parse_args()
+
+    print(f"{'kaynak':>8} {'eski ms':>8} {'yeni ms':>8} {'yeniden çizim':>14}")
+    for name, (h, w) in SOURCES.items():
+        frame = np.full((h, w, 3), 80, np.uint8)
+        old = []
+        for i in range(args.kare):
+            t0 = time.perf_counter()
+            legacy(frame, i)
+            old.append((time.perf_counter() - t0) * 1000.0)
+
+        scaler = DisplayScaler(640, 360)
+        overlay = OverlayCompositor()
+        rgb = scaler.scale(frame)
+        new = []
+        for i in range(args.kare):
+            t0 = time.perf_counter()
+            overlay.set_layer('roi', [ROI], (0, 255, 0), scale=1000.0)
+            overlay.set_layer('grid', grid_lines(4, 4), (255, 255, 255), thickness=1, closed=False)
+            x = 0.3 + 0.4 * (i % 50) / 50
+            overlay.render(rgb, [Marker(x, 0.5, (255, 0, 0), f"MAKS: {80 + i % 7 / 10:.1f} C", (15, -15)),
+                                 Marker(1 - x, 0.5, (0, 0, 255), "MIN: 21.4 C", (15, 15))])
+            new.append((time.perf_counter() - t0) * 1000.0)
+        print(f"{name:>8} {statistics.median(old):8.3f} {statistics.median(new):8.3f} {overlay.rasterized:>14}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+# bench_stream_profiles.py
+#
+# Ekranda ana akış (101/201) yerine alt akış (102/202) çözmenin kamera başına CPU ve bant genişliği kazancı.
+# Her akış için GUI'nin yaptığı iş ölçülür: çözme + DisplayScaler ile 640x360'a küçültme.
+#
+#   Varsayılan (kamera gerekmez): aynı sahne ana ve alt akış çözünürlüklerinde mp4v ile kodlanır, dosyalar
+#   olabildiğince hızlı çözülür. CPU %'si kare başına CPU süresi x akış fps'i ile hesaplanır (tek çekirdeğe
+#   göre), bit hızı dosya boyutundan ölçülür. Kameralar H.264/H.265 kullanır; mutlak değerler farklıdır,
+#   ana/alt oranı ise çözülen piksel sayısıyla orantılı kalır.
+#   --kamera verilirse profiller ISAPI'den okunur (StreamProfileManager), ekran ve ana RTSP akışları --sure
+#   saniye canlı çözülür. CPU %'si süreç CPU süresi / geçen süredir; bant genişliği profildeki bit hızıdır
+#   (VBR'de üst sınır).
+#
+# Kullanım:
+#   python bench_stream_profiles.py --sure 10 --kamera-sayisi 16
+#   python bench_stream_profiles.py --kamera 127.0.0.1 --port 8080 --rtsp-port 8554 --sure 20
+#   (simülatörle: python camera_simulator.py --video ornek.mp4 --alt-akis; çok istemci için mediamtx gerekir)
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from ortak.display_scaler import DisplayScaler
+from ortak.isapi_client import ISAPIClient
+from ortak.stream_profiles import StreamProfileManager, THERMAL, VISIBLE
+
+# Yerel ölçüm için ana/alt akış çözünürlükleri (camera_simulator.STREAM_PROFILES ile aynı).
+LOCAL_STREAMS = {
+    'normal': {101: (1920, 1080), 102: (640, 360)},
+    'termal': {201: (1280, 720), 202: (640, 360)},
+}
+FPS = 25
+
+
+def write_clip(path, width, height, seconds):
+    """Hareketli, dokulu bir sahne yazar; her çözünürlük aynı sahneyi küçültülmüş olarak içerir."""
+    rng = np.random.default_rng(0)
+    base = cv2.GaussianBlur(rng.integers(0, 255, (1080, 1920, 3), dtype=np.uint8), (0, 0), 3)
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), FPS, (width, height))
+    frame = np.empty((height, width, 3), np.uint8)
+    for i in range(int(seconds * FPS)):
+        cv2.resize(np.roll(base, i * 9, axis=1), (width, height), dst=frame, interpolation=cv2.INTER_AREA)
+        cv2.circle(frame, (int(width * (0.2 + 0.6 * (i % FPS) / FPS)), height // 2), height // 10, (0, 0, 255), -1)
+        writer.write(frame)
+    writer.release()
+
+
+def decode(source, seconds=None):
+    """Kaynağı çözüp ekran boyutuna küçültür; kare sayısı, CPU ve duvar süresi döner."""
+    cap = cv2.VideoCapture(source)
+    if not cap.isOpened():
+        return None
+    scaler = DisplayScaler(640, 360)
+    frames = 0
+    size = None
+    cpu0, wall0 = time.process_time(), time.perf_counter()
+    while seconds is None or time.perf_counter() - wall0 < seconds:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        size = (frame.shape[1], frame.shape[0])
+        scaler.scale(frame)
+        frames += 1
+    cpu, wall = time.process_time() - cpu0, time.perf_counter() - wall0
+    cap.release()
+    return {'frames': frames, 'cpu_s': cpu, 'wall_s': wall, 'size': size}
+
+
+def print_row(sensor, channel, size, fps, kbps, cpu_ms, cpu_pct):
+    print(f"{sensor:>7} {channel:>6} {f'{size[0]}x{size[1]}' if size else '-':>10} {fps:6.1f} {kbps:8.0f} "
+          f"{cpu_ms:9.2f} {cpu_pct:8.1f}")
+
+
+def run_local(args):
+    totals = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for sensor, streams in LOCAL_STREAMS.items():
+            for channel, (width, height) in streams.items():
+                path = os.path.join(tmp, f'{channel}.mp4')
+                write_clip(path, width, height, args.sure)
+                result = decode(path)
+                kbps = os.path.getsize(path) * 8 / 1000.0 / args.sure
+                cpu_ms = result['cpu_s'] * 1000.0 / max(result['frames'], 1)
+                cpu_pct = cpu_ms * FPS / 10.0
+                print_row(sensor, channel, result['size'], FPS, kbps, cpu_ms, cpu_pct)
+                totals[channel] = (kbps, cpu_pct)
+    return {'main': [totals[101], totals[201]], 'display': [totals[102], totals[202]]}
+
+
+def run_camera(args):
+    isapi = ISAPIClient.for_camera(args.kamera, args.user, args.password, args.port)
+    manager = StreamProfileManager(isapi, args.kamera, args.user, args.password, args.rtsp_port)
+    if not manager.refresh():
+        print("UYARI: Akış profilleri okunamadı; ekran da ana akışa düşer, kazanç olmaz.")
+    for profile in sorted(manager.profiles().values()):
+        print(f"  profil {profile.channel}: {profile.width}x{profile.height} {profile.fps:g} fps "
+              f"{profile.bitrate_kbps} kbps {profile.codec}{'' if profile.enabled else ' (kapalı)'}")
+    profiles = manager.profiles()
+    totals = {'main': [], 'display': []}
+    for sensor, name in ((VISIBLE, 'normal'), (THERMAL, 'termal')):
+        for kind, channel in (('main', manager.main_channel(sensor)), ('display', manager.display_channel(sensor))):
+            result = decode(manager.rtsp_url(channel), args.sure)
+            if result is None or not result['frames']:
+                print(f"HATA: {channel} akışı açılamadı.")
+                return None
+            profile = profiles.get(channel)
+            kbps = profile.bitrate_kbps if profile else float('nan')
+            fps = result['frames'] / result['wall_s']
+            cpu_pct = result['cpu_s'] / result['wall_s'] * 100.0
+            print_row(name, channel, result['size'], fps, kbps, result['cpu_s'] * 1000.0 / result['frames'], cpu_pct)
+            totals[kind].append((kbps, cpu_pct))
+    return totals
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Ekranda alt akış kullanmanın CPU ve bant genişliği kazancı")
+    ap.add_argument('--kamera', help="Kamera/simülatör adresi (verilmezse yerel dosyalarla ölçülür)")
+    ap.add_argument('--port', type=int, default=80)
+    ap.add_argument('--rtsp-port', type=int, default=554)
+    ap.add_argument('--user', default='admin')
+    ap.add_argument('--password', default='admin')
+    ap.add_argument('--sure', type=float, default=10.0, help="Akış başına ölçüm süresi (sn)")
+    ap.add_argument('--kamera-sayisi', type=int, default=1, help="Toplamları bu kadar kameraya ölçekle")
+    args = ap.parse_args()
+
+    print(f"OpenCV thread sayısı: {cv2.getNumThreads()}")
+    print(f"{'sensör':>7} {'kanal':>6} {'boyut':>10} {'fps':>6} {'kbps':>8} {'CPU ms/k':>9} {'CPU %':>8}")
+    totals = run_camera(args) if args.kamera else run_local(args)
+    if not totals:
+        return
+    main_kbps, main_cpu = (sum(v) for v in zip(*totals['main']))
+    disp_kbps, disp_cpu = (sum(v) for v in zip(*totals['display']))
+    n = args.kamera_sayisi
+    print(f"\nKamera başına (normal + termal):")
+    print(f"  ana akış : {main_kbps:8.0f} kbps, CPU %{main_cpu:.1f}")
+    print(f"  ekran    : {disp_kbps:8.0f} kbps, CPU %{disp_cpu:.1f}")
+    print(f"  kazanç   : {main_kbps - disp_kbps:8.0f} kbps (%{(1 - disp_kbps / main_kbps) * 100:.0f}), "
+          f"CPU %{main_cpu - disp_cpu:.1f} (%{(1 - disp_cpu / main_cpu) * 100:.0f})")
+    if n > 1:
+        print(f"{n} kamera: {(main_kbps - disp_kbps) * n / 1000:.1f} Mbit/s ve {(main_cpu - disp_cpu) * n / 100:.1f} "
+              f"çekirdek tasarruf")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+# bench_thermometry_store.py
+#
+# ThermometryStore'a 1 Hz örnekleme ile N kural x G gün sentetik veri yazar; kayıt
+# başına disk kullanımını, yazma hızını ve farklı aralıklar için sorgu süresini ölçer.
+#
+# Kullanım:
+#   python bench_thermometry_store.py --kural 10 --gun 30
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from ortak.thermometry_store import ThermometryStore
+
+
+def dir_size(path) -> int:
+    return sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="ThermometryStore yazma/sorgu ölçümü")
+    ap.add_argument('--kural', type=int, default=10)
+    ap.add_argument('--gun', type=float, default=30.0)
+    ap.add_argument('--klasor', help="Veri klasörü (varsayılan: geçici klasör, sonunda silinir)")
+    args = ap.parse_args()
+
+    root = args.klasor or tempfile.mkdtemp(prefix='thermometry_bench_')
+    store = ThermometryStore(root)
+    seconds = int(args.gun * 86400)
+    end = time.time() // 3600 * 3600
+    start = end - seconds
+    rng = np.random.default_rng(0)
+
+    t = time.perf_counter()
+    for hour in range(0, seconds, 3600):
+        base = 40.0 + 10.0 * np.sin(2 * np.pi * hour / 86400)
+        noise = rng.normal(0.0, 1.0, 3600)
+        for rule in range(1, args.kural + 1):
+            for i in range(3600):
+                ts = start + hour + i
+                store.append('bench', 2, rule, ts, base + noise[i] + 5, base - 5, base)
+        store.flush()
+    write_time = time.perf_counter() - t
+    store.close()
+
+    samples = seconds * args.kural
+    size = dir_size(root)
+    print(f"{samples} kayıt, {write_time:.1f} sn ({samples / write_time:,.0f} kayıt/sn)")
+    print(f"disk: {size / 1e6:.1f} MB ({size / samples:.1f} byte/kayıt, özetler dahil)")
+
+    for label, span in (('1 saat', 3600), ('1 gün', 86400), ('7 gün', 7 * 86400), ('tümü', seconds)):
+        t = time.perf_counter()
+        result = store.query('bench', 2, 1, end - span, end)
+        ms = (time.perf_counter() - t) * 1000.0
+        print(f"{label:>7}: {result.resolution:>4} çözünürlük, {len(result):6d} nokta, {ms:7.2f} ms")
+
+    if not args.klasor:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
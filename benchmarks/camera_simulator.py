@@ -0,0 +1,721 @@
+# camera_simulator.py
+#
+# Fiziksel kamera olmadan döngüleri çalıştırabilmek ve ölçebilmek için yerel bir
+# Hikvision termal PTZ kamera taklidi. Tek süreçte bir veya daha fazla kamera sunar:
+#
+#   ISAPI (HTTP, isteğe bağlı Digest auth)
+#     GET  /ISAPI/Thermal/channels/2/thermometry/realTimethermometry/rules   multipart JSON akışı
+#     GET  /ISAPI/Thermal/channels/2/thermometry/pixelToPixelData            multipart JSON + float32 matris
+#     GET  /ISAPI/PTZCtrl/channels/1/status                                  PTZ konumu (XML)
+#     PUT  /ISAPI/PTZCtrl/channels/1/absolute | continuous                   PTZ komutları
+#     POST /ISAPI/System/Video/inputs/channels/2/calibPointRelation          termal -> görünür nokta
+#     GET/PUT /ISAPI/Thermal/channels/2/thermometry/1/alarmRules             alarm kuralları
+#     GET  /ISAPI/Streaming/channels                                         akış profilleri (101/102, 201/202)
+#     GET  /ISAPI/Streaming/channels/<no>/picture                            anlık JPEG (OpenCV varsa)
+#   ONVIF (SOAP, aynı port)
+#     /onvif/device_service, /onvif/media_service, /onvif/ptz_service        PTZ için gereken asgari işlemler
+#   RTSP
+#     --video verilirse dosya ffmpeg ile döngüde yayınlanır (mediamtx varsa çok istemcili);
+#     --alt-akis ile 102/202 alt akışları 640x360'a küçültülüp ayrıca yayınlanır.
+#
+# Kullanım:
+#   python camera_simulator.py --port 8080 --hiz 5 --senaryo periyodik --sicak-her 10
+#   python camera_simulator.py --kamera-sayisi 50 --port 9000 --kopma-sonrasi 30 --titreme 0.2
+#   python camera_simulator.py --video ornek.mp4 --rtsp-port 8554 --alt-akis
+#
+# İstemcileri simülatöre yönlendirmek için:
+#   CAMERA_IP=127.0.0.1 CAMERA_PORT=8080 RTSP_PORT=8554 python ssss/ss15_ubuntu.py
+
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import shutil
+import subprocess
+import time
+import xml.etree.ElementTree as ET
+
+THERMOMETRY_PATH = '/ISAPI/Thermal/channels/2/thermometry/realTimethermometry/rules'
+PIXEL_DATA_PATH = '/ISAPI/Thermal/channels/2/thermometry/pixelToPixelData'
+PTZ_PREFIX = '/ISAPI/PTZCtrl/channels/1/'
+CALIB_PATH = '/ISAPI/System/Video/inputs/channels/2/calibPointRelation'
+ALARM_RULES_PATH = '/ISAPI/Thermal/channels/2/thermometry/1/alarmRules'
+PICTURE_RE = re.compile(r'^/ISAPI/Streaming/channels/(\d+)/picture')
+STREAMING_CHANNELS_PATH = '/ISAPI/Streaming/channels'
+
+# Bildirilen akış profilleri: kanal -> (genişlik, yükseklik, maxFrameRate (1/100 fps), bit hızı kbps).
+STREAM_PROFILES = {
+    101: (1920, 1080, 2500, 4096),
+    102: (640, 360, 2500, 512),
+    201: (1280, 720, 2500, 2048),
+    202: (640, 360, 2500, 512),
+}
+
+ISAPI_XMLNS = 'http://www.isapi.org/ver20/XMLSchema'
+ISAPI_NS = {'isapi': ISAPI_XMLNS}
+BOUNDARY = b'boundary'
+REALM = 'IP Camera(simulator)'
+
+SCENARIOS = ('yok', 'periyodik', 'rampa', 'gezgin')
+
+
+class SimulatorOptions:
+    """Komut satırı seçenekleri; testlerden doğrudan da oluşturulabilir."""
+
+    def __init__(self, rate=1.0, jitter=0.0, disconnect_after=0.0, drop_prob=0.0, scenario='periyodik',
+                 hot_every=10, base_temp=30.0, peak_temp=95.0, ramp_period=60.0, rules=3,
+                 pixel_rate=5.0, pixel_width=256, pixel_height=192, user='admin', password='admin',
+                 digest=False, ptz_speed=60.0):
+        self.rate = rate
+        self.jitter = jitter
+        self.disconnect_after = disconnect_after
+        self.drop_prob = drop_prob
+        self.scenario = scenario
+        self.hot_every = hot_every
+        self.base_temp = base_temp
+        self.peak_temp = peak_temp
+        self.ramp_period = ramp_period
+        self.rules = rules
+        self.pixel_rate = pixel_rate
+        self.pixel_width = pixel_width
+        self.pixel_height = pixel_height
+        self.user = user
+        self.password = password
+        self.digest = digest
+        self.ptz_speed = ptz_speed
+
+    def interval(self, rate: float) -> float:
+        """Bir sonraki mesaja kadar beklenecek süre; titreme (jitter) oran olarak uygulanır."""
+        base = 1.0 / rate
+        if self.jitter:
+            base *= max(0.0, 1.0 + random.uniform(-self.jitter, self.jitter))
+        return base
+
+
+# --- Kamera durumu ---
+class SimulatedPTZ:
+    """Derece cinsinden pan/tilt/zoom; mutlak hedefe veya sürekli hıza göre zamanla ilerler."""
+
+    def __init__(self, speed: float, pan_limits=(0.0, 360.0), tilt_limits=(-90.0, 90.0)):
+        self.speed = speed
+        self.pan_limits = pan_limits
+        self.tilt_limits = tilt_limits
+        self.pan, self.tilt, self.zoom = 90.0, 0.0, 1.0
+        self.target = None
+        self.velocity = (0.0, 0.0)
+        self._last = time.time()
+
+    def _advance(self):
+        now = time.time()
+        dt, self._last = now - self._last, now
+        if self.target is not None:
+            step = self.speed * dt
+            tp, tt = self.target
+            self.pan = tp if abs(tp - self.pan) <= step else self.pan + math.copysign(step, tp - self.pan)
+            self.tilt = tt if abs(tt - self.tilt) <= step else self.tilt + math.copysign(step, tt - self.tilt)
+            if (self.pan, self.tilt) == self.target:
+                self.target = None
+        else:
+            vp, vt = self.velocity
+            self.pan = (self.pan + vp * self.speed * dt) % 360.0
+            self.tilt = max(self.tilt_limits[0], min(self.tilt_limits[1], self.tilt + vt * self.speed * dt))
+
+    @property
+    def moving(self) -> bool:
+        return self.target is not None or self.velocity != (0.0, 0.0)
+
+    def position(self):
+        self._advance()
+        return self.pan, self.tilt, self.zoom
+
+    def move_to(self, pan, tilt, zoom=None):
+        self._advance()
+        self.target = (max(self.pan_limits[0], min(self.pan_limits[1], pan)),
+                       max(self.tilt_limits[0], min(self.tilt_limits[1], tilt)))
+        if zoom:
+            self.zoom = zoom
+        self.velocity = (0.0, 0.0)
+
+    def move_normalized(self, x, y):
+        """ONVIF AbsoluteMove: -1..1 aralığını limitlere eşler."""
+        pan = self.pan_limits[0] + (x + 1.0) / 2.0 * (self.pan_limits[1] - self.pan_limits[0])
+        tilt = self.tilt_limits[0] + (y + 1.0) / 2.0 * (self.tilt_limits[1] - self.tilt_limits[0])
+        self.move_to(pan, tilt)
+
+    def set_velocity(self, vx, vy):
+        """Sürekli hareket; vx/vy -1..1 (ONVIF) veya ISAPI'nin -100..100 değerinin 100'e bölümü."""
+        self._advance()
+        self.target = None
+        self.velocity = (vx, vy)
+
+
+class SimulatedCamera:
+    def __init__(self, index: int, options: SimulatorOptions):
+        self.index = index
+        self.options = options
+        self.ptz = SimulatedPTZ(options.ptz_speed)
+        self.alarm_threshold = 75.0
+        self.started = time.time()
+        self.messages = 0
+        self.connections = 0
+        # Termal -> görünür eşlemesi (0..1000 ölçeği): görünür görüntüde termalin ortada %80'lik alanı.
+        self.calib_scale, self.calib_offset = 0.8, 100
+
+    def hotspot(self, i: int):
+        """Senaryoya göre (en yüksek sıcaklık, x, y) döndürür; x/y 0..1 normalize."""
+        o = self.options
+        t = time.time() - self.started
+        noise = random.uniform(-0.5, 0.5)
+        x, y = 0.5, 0.5
+        if o.scenario == 'periyodik':
+            hot = o.hot_every and i % o.hot_every == o.hot_every - 1
+            temp = o.peak_temp if hot else o.base_temp + 10.0 + noise
+        elif o.scenario == 'rampa':
+            temp = o.base_temp + (o.peak_temp - o.base_temp) * ((t % o.ramp_period) / o.ramp_period)
+        elif o.scenario == 'gezgin':
+            temp = o.peak_temp + noise
+            x, y = 0.5 + 0.35 * math.cos(t / 5.0), 0.5 + 0.35 * math.sin(t / 5.0)
+        else:
+            temp = o.base_temp + 10.0 + noise
+        return temp, x, y
+
+    def thermometry_message(self, i: int) -> dict:
+        temp, x, y = self.hotspot(i)
+        base = self.options.base_temp
+        uploads = []
+        for r in range(self.options.rules):
+            max_temp = temp if r == 0 else base + 5.0 + r * 0.1
+            uploads.append({
+                "ruleID": r + 1,
+                "ruleName": f"kural{r + 1}",
+                "ruleCalibType": 1,
+                "LinePolygonThermCfg": {"MaxTemperature": round(max_temp, 1), "MinTemperature": round(base - 5.0, 1),
+                                        "AverageTemperature": round((max_temp + base) / 2.0, 1)},
+                "HighestPoint": {"positionX": round(x, 3), "positionY": round(y, 3)},
+                "LowestPoint": {"positionX": 0.05, "positionY": 0.95},
+            })
+        return {"simSentAt": time.time(), "simCamera": self.index,
+                "ThermometryUploadList": {"ThermometryUpload": uploads}}
+
+    def temperature_matrix(self, i: int):
+        import numpy as np
+        o = self.options
+        temp, x, y = self.hotspot(i)
+        yy, xx = np.mgrid[0:o.pixel_height, 0:o.pixel_width].astype(np.float32)
+        cx, cy = x * (o.pixel_width - 1), y * (o.pixel_height - 1)
+        sigma = max(o.pixel_width, o.pixel_height) / 30.0
+        blob = np.exp(-((xx - cx) ** 2 + (yy - cy) ** 2) / (2.0 * sigma * sigma))
+        return (o.base_temp + (temp - o.base_temp) * blob).astype('<f4')
+
+    def ptz_status_xml(self) -> bytes:
+        pan, tilt, zoom = self.ptz.position()
+        return (f'<?xml version="1.0" encoding="UTF-8"?><PTZStatus version="2.0" xmlns="{ISAPI_XMLNS}">'
+                f'<AbsoluteHigh><elevation>{int(round(tilt * 10))}</elevation><azimuth>{int(round(pan * 10))}</azimuth>'
+                f'<absoluteZoom>{int(round(zoom * 10))}</absoluteZoom></AbsoluteHigh></PTZStatus>').encode()
+
+    def alarm_rules_xml(self) -> bytes:
+        return (f'<?xml version="1.0" encoding="UTF-8"?><ThermometryAlarmRule version="2.0" xmlns="{ISAPI_XMLNS}">'
+                f'<ThermometryAlarmModeList><ThermometryAlarmMode><rule>highestGreater</rule>'
+                f'<alarm>{self.alarm_threshold:g}</alarm></ThermometryAlarmMode></ThermometryAlarmModeList>'
+                f'</ThermometryAlarmRule>').encode()
+
+    def streaming_channels_xml(self) -> bytes:
+        channels = ''.join(
+            f'<StreamingChannel><id>{ch}</id><channelName>Camera {self.index}</channelName><enabled>true</enabled>'
+            f'<Video><enabled>true</enabled><videoInputChannelID>{ch // 100}</videoInputChannelID>'
+            f'<videoCodecType>H.264</videoCodecType><videoResolutionWidth>{w}</videoResolutionWidth>'
+            f'<videoResolutionHeight>{h}</videoResolutionHeight><videoQualityControlType>VBR</videoQualityControlType>'
+            f'<constantBitRate>{kbps}</constantBitRate><vbrUpperCap>{kbps}</vbrUpperCap>'
+            f'<maxFrameRate>{fps}</maxFrameRate></Video></StreamingChannel>'
+            for ch, (w, h, fps, kbps) in STREAM_PROFILES.items())
+        return (f'<?xml version="1.0" encoding="UTF-8"?><StreamingChannelList version="2.0" xmlns="{ISAPI_XMLNS}">'
+                f'{channels}</StreamingChannelList>').encode()
+
+    def calib_point_xml(self, body: bytes) -> bytes:
+        root = ET.fromstring(body)
+        src = [n for n in root.iter() if n.tag.endswith('srcPoint')][0]
+        values = {child.tag.rsplit('}', 1)[-1]: int(float(child.text)) for child in src}
+        dx = int(values['positionX'] * self.calib_scale + self.calib_offset)
+        dy = int(values['positionY'] * self.calib_scale + self.calib_offset)
+        return (f'<?xml version="1.0" encoding="UTF-8"?><PointRelation version="2.0" xmlns="{ISAPI_XMLNS}">'
+                f'<destPoint><positionX>{dx}</positionX><positionY>{dy}</positionY></destPoint>'
+                f'</PointRelation>').encode()
+
+
+# --- ONVIF ---
+SOAP_ENVELOPE = ('<?xml version="1.0" encoding="UTF-8"?>'
+                 '<s:Envelope xmlns:s="http://www.w3.org/2003/05/soap-envelope" '
+                 'xmlns:tt="http://www.onvif.org/ver10/schema" xmlns:tds="http://www.onvif.org/ver10/device/wsdl" '
+                 'xmlns:trt="http://www.onvif.org/ver10/media/wsdl" xmlns:tptz="http://www.onvif.org/ver20/ptz/wsdl">'
+                 '<s:Body>{}</s:Body></s:Envelope>')
+
+
+def _soap_operation(body: bytes):
+    root = ET.fromstring(body)
+    for element in root.iter():
+        if element.tag.endswith('}Body'):
+            operation = next(iter(element), None)
+            if operation is not None:
+                return operation.tag.rsplit('}', 1)[-1], operation
+    return None, None
+
+
+def _pan_tilt(operation, tag: str):
+    for element in operation.iter():
+        if element.tag.endswith('}' + tag):
+            for child in element.iter():
+                if child.tag.endswith('}PanTilt'):
+                    return float(child.get('x', 0)), float(child.get('y', 0))
+    return None
+
+
+def onvif_response(camera: SimulatedCamera, host: str, body: bytes):
+    """ONVIF SOAP isteğine (durum_kodu, gövde) döndürür; desteklenmeyen işlemler SOAP hatasıdır."""
+    name, operation = _soap_operation(body)
+    ptz = camera.ptz
+    base = f'http://{host}'
+    if name == 'GetCapabilities':
+        xml = ('<tds:GetCapabilitiesResponse><tds:Capabilities>'
+               f'<tt:Device><tt:XAddr>{base}/onvif/device_service</tt:XAddr></tt:Device>'
+               f'<tt:Media><tt:XAddr>{base}/onvif/media_service</tt:XAddr><tt:StreamingCapabilities>'
+               '<tt:RTPMulticast>false</tt:RTPMulticast><tt:RTP_TCP>true</tt:RTP_TCP>'
+               '<tt:RTP_RTSP_TCP>true</tt:RTP_RTSP_TCP></tt:StreamingCapabilities></tt:Media>'
+               f'<tt:PTZ><tt:XAddr>{base}/onvif/ptz_service</tt:XAddr></tt:PTZ>'
+               '</tds:Capabilities></tds:GetCapabilitiesResponse>')
+    elif name == 'GetSystemDateAndTime':
+        now = time.gmtime()
+        xml = ('<tds:GetSystemDateAndTimeResponse><tds:SystemDateAndTime>'
+               '<tt:DateTimeType>NTP</tt:DateTimeType><tt:DaylightSavings>false</tt:DaylightSavings><tt:UTCDateTime>'
+               f'<tt:Time><tt:Hour>{now.tm_hour}</tt:Hour><tt:Minute>{now.tm_min}</tt:Minute><tt:Second>{now.tm_sec}</tt:Second></tt:Time>'
+               f'<tt:Date><tt:Year>{now.tm_year}</tt:Year><tt:Month>{now.tm_mon}</tt:Month><tt:Day>{now.tm_mday}</tt:Day></tt:Date>'
+               '</tt:UTCDateTime></tds:SystemDateAndTime></tds:GetSystemDateAndTimeResponse>')
+    elif name == 'GetProfiles':
+        xml = ('<trt:GetProfilesResponse><trt:Profiles token="Profile_1" fixed="true"><tt:Name>mainStream</tt:Name>'
+               '<tt:PTZConfiguration token="PTZConfig_1"><tt:Name>PTZ</tt:Name><tt:UseCount>1</tt:UseCount>'
+               '<tt:NodeToken>PTZNode_1</tt:NodeToken></tt:PTZConfiguration></trt:Profiles></trt:GetProfilesResponse>')
+    elif name == 'GetConfigurationOptions':
+        (pmin, pmax), (tmin, tmax) = ptz.pan_limits, ptz.tilt_limits
+        xml = ('<tptz:GetConfigurationOptionsResponse><tptz:PTZConfigurationOptions><tt:Spaces>'
+               '<tt:AbsolutePanTiltPositionSpace><tt:URI>http://www.onvif.org/ver10/tptz/PanTiltSpaces/PositionGenericSpace</tt:URI>'
+               f'<tt:XRange><tt:Min>{pmin}</tt:Min><tt:Max>{pmax}</tt:Max></tt:XRange>'
+               f'<tt:YRange><tt:Min>{tmin}</tt:Min><tt:Max>{tmax}</tt:Max></tt:YRange>'
+               '</tt:AbsolutePanTiltPositionSpace></tt:Spaces>'
+               '<tt:PTZTimeout><tt:Min>PT1S</tt:Min><tt:Max>PT1M</tt:Max></tt:PTZTimeout>'
+               '</tptz:PTZConfigurationOptions></tptz:GetConfigurationOptionsResponse>')
+    elif name == 'ContinuousMove':
+        velocity = _pan_tilt(operation, 'Velocity') or (0.0, 0.0)
+        ptz.set_velocity(*velocity)
+        xml = '<tptz:ContinuousMoveResponse/>'
+    elif name == 'AbsoluteMove':
+        position = _pan_tilt(operation, 'Position')
+        if position is not None:
+            ptz.move_normalized(*position)
+        xml = '<tptz:AbsoluteMoveResponse/>'
+    elif name == 'Stop':
+        ptz.set_velocity(0.0, 0.0)
+        xml = '<tptz:StopResponse/>'
+    elif name == 'GetStatus':
+        pan, tilt, _ = ptz.position()
+        (pmin, pmax), (tmin, tmax) = ptz.pan_limits, ptz.tilt_limits
+        x = (pan - pmin) / (pmax - pmin) * 2.0 - 1.0
+        y = (tilt - tmin) / (tmax - tmin) * 2.0 - 1.0
+        state = 'MOVING' if ptz.moving else 'IDLE'
+        xml = ('<tptz:GetStatusResponse><tptz:PTZStatus>'
+               f'<tt:Position><tt:PanTilt x="{x:.4f}" y="{y:.4f}"/></tt:Position>'
+               f'<tt:MoveStatus><tt:PanTilt>{state}</tt:PanTilt></tt:MoveStatus>'
+               f'<tt:UtcTime>{time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())}</tt:UtcTime>'
+               '</tptz:PTZStatus></tptz:GetStatusResponse>')
+    else:
+        xml = ('<s:Fault><s:Code><s:Value>s:Receiver</s:Value></s:Code>'
+               f'<s:Reason><s:Text xml:lang="en">{name} desteklenmiyor</s:Text></s:Reason></s:Fault>')
+        return 500, SOAP_ENVELOPE.format(xml).encode()
+    return 200, SOAP_ENVELOPE.format(xml).encode()
+
+
+# --- HTTP ---
+class Request:
+    def __init__(self, method, target, headers, body):
+        self.method = method
+        self.target = target
+        self.path = target.split('?', 1)[0]
+        self.headers = headers
+        self.body = body
+
+
+async def read_request(reader) -> Request | None:
+    try:
+        head = await reader.readuntil(b'\r\n\r\n')
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+        return None
+    request_line, *header_lines = head.decode('latin-1').split('\r\n')
+    method, target, _ = request_line.split(' ', 2)
+    headers = {}
+    for line in header_lines:
+        name, sep, value = line.partition(':')
+        if sep:
+            headers[name.strip().lower()] = value.strip()
+    length = int(headers.get('content-length', 0) or 0)
+    body = await reader.readexactly(length) if length else b''
+    return Request(method, target, headers, body)
+
+
+def response_bytes(status: int, body: bytes = b'', content_type: str = 'application/xml', extra_headers=None) -> bytes:
+    reason = {200: 'OK', 401: 'Unauthorized', 404: 'Not Found', 500: 'Internal Server Error',
+              501: 'Not Implemented'}.get(status, 'OK')
+    lines = [f'HTTP/1.1 {status} {reason}', f'Content-Type: {content_type}', f'Content-Length: {len(body)}']
+    for name, value in (extra_headers or {}).items():
+        lines.append(f'{name}: {value}')
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body
+
+
+class DigestAuthenticator:
+    """RFC 2617 (qop=auth, MD5) Digest doğrulaması; nonce'lar yeniden kullanılabilir."""
+
+    def __init__(self, user, password):
+        self.user = user
+        self.password = password
+        self.nonces = set()
+        self.challenges = 0
+
+    def challenge(self) -> dict:
+        nonce = os.urandom(16).hex()
+        self.nonces.add(nonce)
+        self.challenges += 1
+        return {'WWW-Authenticate': f'Digest realm="{REALM}", qop="auth", nonce="{nonce}", algorithm=MD5'}
+
+    def check(self, request: Request) -> bool:
+        header = request.headers.get('authorization', '')
+        if not header.lower().startswith('digest '):
+            return False
+        fields = dict((k, v.strip('"')) for k, v in re.findall(r'(\w+)=("[^"]*"|[^,\s]+)', header[7:]))
+        if fields.get('username') != self.user or fields.get('nonce') not in self.nonces:
+            return False
+
+        def md5(text):
+            return hashlib.md5(text.encode()).hexdigest()
+        ha1 = md5(f"{self.user}:{REALM}:{self.password}")
+        ha2 = md5(f"{request.method}:{fields.get('uri', '')}")
+        if 'qop' in fields:
+            expected = md5(f"{ha1}:{fields['nonce']}:{fields.get('nc', '')}:{fields.get('cnonce', '')}:{fields['qop']}:{ha2}")
+        else:
+            expected = md5(f"{ha1}:{fields['nonce']}:{ha2}")
+        return fields.get('response') == expected
+
+
+class CameraServer:
+    """Bir SimulatedCamera'yı tek bir TCP portunda HTTP (ISAPI + ONVIF) olarak sunar."""
+
+    def __init__(self, camera: SimulatedCamera, host: str, port: int):
+        self.camera = camera
+        self.options = camera.options
+        self.host = host
+        self.port = port
+        self.auth = DigestAuthenticator(self.options.user, self.options.password) if self.options.digest else None
+        self.server = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle_client, self.host, self.port, backlog=4096)
+        return self
+
+    async def handle_client(self, reader, writer):
+        self.camera.connections += 1
+        try:
+            while True:
+                request = await read_request(reader)
+                if request is None:
+                    break
+                if not await self.dispatch(request, writer):
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, request: Request, writer) -> bool:
+        """İsteği yanıtlar; bağlantı açık kalacaksa True döner (akışlar bağlantıyı kapatır)."""
+        camera = self.camera
+        path = request.path
+        # ONVIF, istekleri WS-Security ile doğrular; simülatör ONVIF tarafında HTTP auth istemez.
+        if self.auth is not None and not path.startswith('/onvif/') and not self.auth.check(request):
+            writer.write(response_bytes(401, b'', 'text/plain', self.auth.challenge()))
+            await writer.drain()
+            return True
+
+        if path == THERMOMETRY_PATH and request.method == 'GET':
+            await self.stream_thermometry(writer)
+            return False
+        if path == PIXEL_DATA_PATH and request.method == 'GET':
+            await self.stream_pixel_data(writer)
+            return False
+
+        status, body, content_type = 200, b'', 'application/xml'
+        if path.startswith(PTZ_PREFIX):
+            status, body = self.handle_ptz(request)
+        elif path == CALIB_PATH and request.method == 'POST':
+            try:
+                body = camera.calib_point_xml(request.body)
+            except (ET.ParseError, IndexError, KeyError, ValueError):
+                status = 500
+        elif path == ALARM_RULES_PATH:
+            if request.method == 'PUT':
+                try:
+                    node = ET.fromstring(request.body).find('.//isapi:ThermometryAlarmMode[isapi:rule="highestGreater"]/isapi:alarm', ISAPI_NS)
+                    if node is not None:
+                        camera.alarm_threshold = float(node.text)
+                    body = b'<ResponseStatus><statusCode>1</statusCode><statusString>OK</statusString></ResponseStatus>'
+                except (ET.ParseError, ValueError):
+                    status = 500
+            else:
+                body = camera.alarm_rules_xml()
+        elif path == STREAMING_CHANNELS_PATH and request.method == 'GET':
+            body = camera.streaming_channels_xml()
+        elif PICTURE_RE.match(path):
+            body = snapshot_jpeg(camera, int(PICTURE_RE.match(path).group(1)))
+            status, content_type = (200, 'image/jpeg') if body else (501, 'text/plain')
+        elif path.startswith('/onvif/'):
+            status, body = onvif_response(camera, request.headers.get('host', f'{self.host}:{self.port}'), request.body)
+            content_type = 'application/soap+xml; charset=utf-8'
+        else:
+            status = 404
+        writer.write(response_bytes(status, body, content_type))
+        await writer.drain()
+        return True
+
+    def handle_ptz(self, request: Request):
+        ptz = self.camera.ptz
+        action = request.path[len(PTZ_PREFIX):]
+        if action == 'status' and request.method == 'GET':
+            return 200, self.camera.ptz_status_xml()
+        if request.method != 'PUT':
+            return 404, b''
+        try:
+            root = ET.fromstring(request.body)
+        except ET.ParseError:
+            return 500, b''
+
+        def value(tag, default=0.0):
+            node = next((n for n in root.iter() if n.tag.rsplit('}', 1)[-1] == tag), None)
+            return float(node.text) if node is not None and node.text else default
+        if action == 'absolute':
+            zoom = value('absoluteZoom', 0.0) / 10.0
+            ptz.move_to(value('azimuth') / 10.0, value('elevation') / 10.0, zoom or None)
+        elif action == 'continuous':
+            ptz.set_velocity(value('pan') / 100.0, value('tilt') / 100.0)
+        else:
+            return 404, b''
+        return 200, b'<ResponseStatus><statusCode>1</statusCode><statusString>OK</statusString></ResponseStatus>'
+
+    async def _stream(self, writer, rate, make_parts):
+        """Kopma/düşme senaryolarını uygulayarak multipart akışı yazar."""
+        options = self.options
+        writer.write(b'HTTP/1.1 200 OK\r\nContent-Type: multipart/mixed; boundary=' + BOUNDARY
+                     + b'\r\nConnection: close\r\n\r\n')
+        # Kameralar aynı anda mesaj göndermesin diye başlangıç rastgele kaydırılır.
+        await asyncio.sleep(random.random() / rate)
+        deadline = None
+        if options.disconnect_after:
+            deadline = time.time() + options.disconnect_after * random.uniform(0.5, 1.5)
+        i = 0
+        while deadline is None or time.time() < deadline:
+            if options.drop_prob and random.random() < options.drop_prob:
+                return
+            for headers, body in make_parts(i):
+                writer.write(b'--' + BOUNDARY + b'\r\n' + headers + b'Content-Length: %d\r\n\r\n' % len(body)
+                             + body + b'\r\n')
+            await writer.drain()
+            i += 1
+            await asyncio.sleep(options.interval(rate))
+
+    async def stream_thermometry(self, writer):
+        camera = self.camera
+
+        def parts(i):
+            camera.messages += 1
+            body = json.dumps(camera.thermometry_message(i)).encode()
+            return [(b'Content-Type: application/json; charset="UTF-8"\r\n', body)]
+        await self._stream(writer, self.options.rate, parts)
+
+    async def stream_pixel_data(self, writer):
+        try:
+            import numpy  # noqa: F401  (matris üretimi için gerekli)
+        except ImportError:
+            writer.write(response_bytes(501, b'numpy gerekli', 'text/plain'))
+            await writer.drain()
+            return
+        camera, options = self.camera, self.options
+
+        def parts(i):
+            matrix = camera.temperature_matrix(i)
+            meta = {"PixelToPixelData": {"width": options.pixel_width, "height": options.pixel_height,
+                                         "temperatureDataLength": 4, "simSentAt": time.time()}}
+            return [(b'Content-Type: application/json\r\n', json.dumps(meta).encode()),
+                    (b'Content-Type: application/octet-stream\r\n', matrix.tobytes())]
+        await self._stream(writer, options.pixel_rate, parts)
+
+
+def snapshot_jpeg(camera: SimulatedCamera, channel: int) -> bytes | None:
+    try:
+        import cv2
+        import numpy as np
+    except ImportError:
+        return None
+    if channel // 100 == 2:
+        matrix = camera.temperature_matrix(camera.messages)
+        gray = np.clip((matrix - matrix.min()) / max(float(np.ptp(matrix)), 1e-3) * 255.0, 0, 255).astype(np.uint8)
+        image = cv2.applyColorMap(gray, cv2.COLORMAP_INFERNO)
+    else:
+        image = np.full((360, 640, 3), 64, np.uint8)
+        cv2.putText(image, time.strftime('%H:%M:%S'), (20, 60), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 255, 255), 2)
+    ok, jpeg = cv2.imencode('.jpg', image)
+    return jpeg.tobytes() if ok else None
+
+
+# --- RTSP ---
+class RtspLoop:
+    """
+    Video dosyasını ffmpeg ile döngüde RTSP olarak yayınlar (Streaming/Channels/101 ve 201).
+
+    PATH'te mediamtx varsa o sunucu olarak başlatılır ve ffmpeg yayını ona gönderir (çok istemci).
+    Yoksa ffmpeg'in kendi dinleme kipi kullanılır: kanal başına tek istemci, sonraki kanallar
+    birer sonraki porttan sunulur ve istemci ayrılınca ffmpeg yeniden başlatılır.
+    sub_streams ile 102/202 de yayınlanır: aynı dosya STREAM_PROFILES boyut ve bit hızına
+    yeniden kodlanır (ana akışlar kopyalanır).
+    """
+
+    def __init__(self, video, thermal_video=None, port: int = 8554, sub_streams: bool = False):
+        self.videos = {101: video, 201: thermal_video or video}
+        if sub_streams:
+            self.videos.update({102: video, 202: thermal_video or video})
+        self.port = port
+        self.processes = []
+        self._running = False
+
+    def urls(self, host='127.0.0.1'):
+        if shutil.which('mediamtx'):
+            return {ch: f'rtsp://{host}:{self.port}/Streaming/Channels/{ch}' for ch in self.videos}
+        return {ch: f'rtsp://{host}:{self.port + i}/Streaming/Channels/{ch}' for i, ch in enumerate(self.videos)}
+
+    def _ffmpeg(self, channel, url, listen):
+        cmd = ['ffmpeg', '-loglevel', 'error', '-re', '-stream_loop', '-1', '-i', self.videos[channel]]
+        if channel % 100 == 1:
+            cmd += ['-c', 'copy']
+        else:
+            width, height, _, kbps = STREAM_PROFILES[channel]
+            cmd += ['-an', '-vf', f'scale={width}:{height}', '-c:v', 'libx264', '-preset', 'ultrafast',
+                    '-tune', 'zerolatency', '-b:v', f'{kbps}k', '-maxrate', f'{kbps}k', '-bufsize', f'{kbps}k']
+        cmd += ['-f', 'rtsp', '-rtsp_transport', 'tcp']
+        if listen:
+            cmd += ['-rtsp_flags', 'listen']
+        return cmd + [url]
+
+    async def run(self):
+        if not shutil.which('ffmpeg'):
+            print("UYARI: ffmpeg bulunamadı, RTSP yayını yapılmayacak.")
+            return
+        self._running = True
+        urls = self.urls('0.0.0.0')
+        if shutil.which('mediamtx'):
+            env = dict(os.environ, MTX_RTSPADDRESS=f':{self.port}')
+            self.processes.append(subprocess.Popen(['mediamtx'], env=env, stdout=subprocess.DEVNULL))
+            await asyncio.sleep(1.0)
+            await asyncio.gather(*(self._keep_alive(self._ffmpeg(ch, urls[ch].replace('0.0.0.0', '127.0.0.1'), False))
+                                   for ch in self.videos))
+        else:
+            await asyncio.gather(*(self._keep_alive(self._ffmpeg(ch, urls[ch], True)) for ch in self.videos))
+
+    async def _keep_alive(self, cmd):
+        while self._running:
+            process = await asyncio.create_subprocess_exec(*cmd)
+            self.processes.append(process)
+            await process.wait()
+            await asyncio.sleep(0.5)
+
+    def stop(self):
+        self._running = False
+        for process in self.processes:
+            try:
+                process.terminate()
+            except ProcessLookupError:
+                pass
+
+
+# --- Başlatma ---
+async def start_cameras(options: SimulatorOptions, host: str, port: int, count: int = 1):
+    """count adet bağımsız kamerayı port, port+1, ... üzerinde başlatır; CameraServer listesi döner."""
+    servers = []
+    for i in range(count):
+        servers.append(await CameraServer(SimulatedCamera(i + 1, options), host, port + i).start())
+    return servers
+
+
+def build_parser():
+    ap = argparse.ArgumentParser(description="Yerel ISAPI/ONVIF/RTSP termal kamera simülatörü")
+    ap.add_argument('--host', default='127.0.0.1')
+    ap.add_argument('--port', type=int, default=8080, help="İlk kameranın HTTP portu")
+    ap.add_argument('--kamera-sayisi', type=int, default=1, help="Ardışık portlarda sunulacak kamera sayısı")
+    ap.add_argument('--hiz', type=float, default=1.0, help="Termal akışta saniyedeki mesaj")
+    ap.add_argument('--titreme', type=float, default=0.0, help="Mesaj aralığına uygulanacak rastgele oran (0.2 = ±%%20)")
+    ap.add_argument('--kopma-sonrasi', type=float, default=0.0, help="Akışların ortalama kaç saniye sonra kapanacağı (0 = hiç)")
+    ap.add_argument('--dusme-olasiligi', type=float, default=0.0, help="Her mesajda bağlantının aniden kopma olasılığı")
+    ap.add_argument('--senaryo', choices=SCENARIOS, default='periyodik')
+    ap.add_argument('--sicak-her', type=int, default=10, help="periyodik: her kaçıncı mesajın sıcak olacağı")
+    ap.add_argument('--taban', type=float, default=30.0, help="Ortam sıcaklığı (°C)")
+    ap.add_argument('--tepe', type=float, default=95.0, help="Sıcak nokta sıcaklığı (°C)")
+    ap.add_argument('--rampa-suresi', type=float, default=60.0, help="rampa: tabandan tepeye çıkış süresi (s)")
+    ap.add_argument('--kural', type=int, default=3, help="Mesaj başına kural sayısı")
+    ap.add_argument('--pixel-hiz', type=float, default=5.0, help="pixelToPixelData saniyedeki kare")
+    ap.add_argument('--pixel-boyut', default='256x192', help="pixelToPixelData çözünürlüğü (GxY)")
+    ap.add_argument('--user', default='admin')
+    ap.add_argument('--password', default='admin')
+    ap.add_argument('--digest', action='store_true', help="ISAPI isteklerinde Digest auth iste")
+    ap.add_argument('--video', help="RTSP olarak döngüde yayınlanacak video dosyası (101)")
+    ap.add_argument('--termal-video', help="201 kanalı için ayrı video (yoksa --video)")
+    ap.add_argument('--rtsp-port', type=int, default=8554)
+    ap.add_argument('--alt-akis', action='store_true', help="102/202 alt akışlarını da yayınla (ffmpeg ile yeniden kodlar)")
+    return ap
+
+
+def options_from_args(args) -> SimulatorOptions:
+    width, height = (int(v) for v in args.pixel_boyut.lower().split('x'))
+    return SimulatorOptions(
+        rate=args.hiz, jitter=args.titreme, disconnect_after=args.kopma_sonrasi, drop_prob=args.dusme_olasiligi,
+        scenario=args.senaryo, hot_every=args.sicak_her, base_temp=args.taban, peak_temp=args.tepe,
+        ramp_period=args.rampa_suresi, rules=args.kural, pixel_rate=args.pixel_hiz, pixel_width=width,
+        pixel_height=height, user=args.user, password=args.password, digest=args.digest)
+
+
+async def main_async(args):
+    options = options_from_args(args)
+    servers = await start_cameras(options, args.host, args.port, args.kamera_sayisi)
+    last_port = args.port + args.kamera_sayisi - 1
+    print(f"{len(servers)} kamera sunuluyor: http://{args.host}:{args.port}"
+          + (f" .. {last_port}" if last_port != args.port else "")
+          + f" (senaryo={options.scenario}, hız={options.rate}/s, digest={'açık' if options.digest else 'kapalı'})")
+    rtsp = None
+    tasks = [asyncio.create_task(s.server.serve_forever()) for s in servers]
+    if args.video:
+        rtsp = RtspLoop(args.video, args.termal_video, args.rtsp_port, args.alt_akis)
+        for channel, url in rtsp.urls(args.host).items():
+            print(f"RTSP {channel}: {url}")
+        tasks.append(asyncio.create_task(rtsp.run()))
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        if rtsp is not None:
+            rtsp.stop()
+
+
+def main():
+    args = build_parser().parse_args()
+    try:
+        asyncio.run(main_async(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
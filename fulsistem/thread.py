@@ -1,21 +1,23 @@
 # thread.py
 
-import cv2
+import sys
 import time
-import requests
-import json
 from PyQt5.QtCore import QThread, pyqtSignal
 from PyQt5.QtGui import QImage
-import numpy as np
-from requests.auth import HTTPDigestAuth
-import xml.etree.ElementTree as ET
 import os
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from ortak.frame_bus import FrameBus
+from ortak.display_scaler import DisplayScaler
+from ortak.overlay import Marker, OverlayCompositor
+from ortak.thermometry_hub import ThermometryHub
+
 os.environ["OPENCV_FFMPEG_CAPTURE_OPTIONS"] = "rtsp_transport;tcp"
 
 class RTSPVideoThread(QThread):
     change_pixmap_signal = pyqtSignal(QImage)
     connection_status_signal = pyqtSignal(str)
+    stream_stats_signal = pyqtSignal(dict)
 
     def __init__(self, rtsp_url, is_thermal=False, parent=None):
         super().__init__()
@@ -24,61 +26,64 @@ class RTSPVideoThread(QThread):
         self.is_thermal = is_thermal
         self.parent_ui = parent
         self.stream_name = "Termal" if is_thermal else "Normal"
+        # Küçültme + renk dönüşümü önceden ayrılmış tamponlarda yapılır (QImage.scaled yerine).
+        self.scaler = DisplayScaler(640, 360)
+        self.overlay = OverlayCompositor()
+
+    def update_overlay_layers(self):
+        """Normal akışta termal görüş alanı (ROI); köşeler 0..1000 ölçeğinde gelir."""
+        if not self.is_thermal:
+            roi = self.parent_ui.thermal_roi_on_visible
+            self.overlay.set_layer('roi', [roi] if roi else [], (0, 255, 0), thickness=2, scale=1000.0)
+
+    def overlay_markers(self) -> list:
+        """Termal akışta sıcak/soğuk nokta işaretleri (renkler RGB)."""
+        markers = []
+        if self.is_thermal:
+            if self.parent_ui.thermal_hotspot_coords:
+                x, y = self.parent_ui.thermal_hotspot_coords
+                markers.append(Marker(x, y, (255, 0, 0), f"MAKS: {self.parent_ui.last_max_temp:.1f} C", (15, -15)))
+            if self.parent_ui.thermal_coldspot_coords:
+                x, y = self.parent_ui.thermal_coldspot_coords
+                markers.append(Marker(x, y, (0, 0, 255), f"MIN: {self.parent_ui.last_min_temp:.1f} C", (15, 15)))
+        return markers
 
     def run(self):
-        while self._run_flag:
-            cap = None
-            try:
-                cap = cv2.VideoCapture(self.rtsp_url, cv2.CAP_FFMPEG)
-                if not cap.isOpened():
-                    self.connection_status_signal.emit(f"{self.stream_name}: Bağlantı Hatası")
-                    time.sleep(5)
-                    continue
-                self.connection_status_signal.emit(f"{self.stream_name}: Bağlandı")
-                
-                while self._run_flag:
-                    ret, frame = cap.read()
-                    if not ret:
-                        self.connection_status_signal.emit(f"{self.stream_name}: Veri Alınamıyor...")
-                        break
-                    
-                    if frame is None or len(frame.shape) < 3:
-                        continue
-                    
-                    h_frame, w_frame, _ = frame.shape
-                    
-                    if self.is_thermal:
-                        if self.parent_ui.thermal_hotspot_coords:
-                            x, y = self.parent_ui.thermal_hotspot_coords
-                            px, py = int(x * w_frame), int(y * h_frame)
-                            cv2.drawMarker(frame, (px, py), (0, 0, 255), cv2.MARKER_CROSS, 20, 2)
-                            temp_text = f"MAKS: {self.parent_ui.last_max_temp:.1f} C"
-                            cv2.putText(frame, temp_text, (px + 15, py - 15), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
-                        
-                        if self.parent_ui.thermal_coldspot_coords:
-                            x, y = self.parent_ui.thermal_coldspot_coords
-                            px, py = int(x * w_frame), int(y * h_frame)
-                            cv2.drawMarker(frame, (px, py), (255, 0, 0), cv2.MARKER_CROSS, 20, 2)
-                            temp_text = f"MIN: {self.parent_ui.last_min_temp:.1f} C"
-                            cv2.putText(frame, temp_text, (px + 15, py + 15), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 0, 0), 2)
-                    else:
-                        if self.parent_ui.thermal_roi_on_visible:
-                            pts = np.array(self.parent_ui.thermal_roi_on_visible, np.int32)
-                            pts[:, :, 0] = (pts[:, :, 0] / 1000.0) * w_frame
-                            pts[:, :, 1] = (pts[:, :, 1] / 1000.0) * h_frame
-                            pts = pts.reshape((-1, 1, 2))
-                            cv2.polylines(frame, [pts.astype(np.int32)], isClosed=True, color=(0, 255, 0), thickness=2)
+        # Akış süreç içindeki diğer tüketicilerle tek çözücüden paylaşılır; URL (fonksiyon) her
+        # bağlanışta çözülür, profil yöneticisi o an uygun akışı (ör. 102) seçer.
+        bus = FrameBus.shared(self.rtsp_url, self.stream_name)
+        report = lambda status: self.connection_status_signal.emit(f"{self.stream_name}: {status}")
+        bus.add_status_listener(report)
+        try:
+            while self._run_flag:
+                try:
+                    with bus.subscribe("ekran") as sub:
+                        last_stats_time = time.time()
+                        while self._run_flag:
+                            # Sadece en yeni kare işlenir; ekran yetişemezse aradaki kareler atlanır.
+                            frame = sub.next(timeout=1.0)
+                            if frame is None or frame.image.ndim < 3:
+                                continue
+
+                            # Bindirme küçültülmüş karede yapılır; ROI katmanı sadece köşeler değişince yeniden çizilir.
+                            self.update_overlay_layers()
+                            rgb_image = self.overlay.render(self.scaler.scale(frame.image), self.overlay_markers())
+                            # Halka tamponu sonraki karelerde yeniden yazılır; GUI thread'ine kuyrukla giden
+                            # QImage ekran boyutunda kopyalanır ki yavaş GUI yırtık kare göstermesin.
+                            h_disp, w_disp = rgb_image.shape[:2]
+                            qt_img = QImage(rgb_image.data, w_disp, h_disp, rgb_image.strides[0], QImage.Format_RGB888).copy()
+                            self.change_pixmap_signal.emit(qt_img)
+                            sub.mark_displayed(frame.timestamp)
 
-                    rgb_image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                    qt_img = QImage(rgb_image.data, w_frame, h_frame, 3 * w_frame, QImage.Format_RGB888)
-                    scaled_img = qt_img.scaled(640, 360, Qt.KeepAspectRatio)
-                    self.change_pixmap_signal.emit(scaled_img)
-            except Exception as e:
-                print(f"HATA ({self.stream_name} Thread): {e}")
-                self.connection_status_signal.emit(f"{self.stream_name}: Thread Çöktü")
-                time.sleep(5)
-            finally:
-                if cap: cap.release()
+                            if time.time() - last_stats_time >= 1.0:
+                                last_stats_time = time.time()
+                                self.stream_stats_signal.emit({**sub.stats(), **self.scaler.stats(), **self.overlay.stats()})
+                except Exception as e:
+                    print(f"HATA ({self.stream_name} Thread): {e}")
+                    self.connection_status_signal.emit(f"{self.stream_name}: Thread Çöktü")
+                    time.sleep(5)
+        finally:
+            bus.remove_status_listener(report)
         print(f"{self.stream_name} video thread durdu.")
 
     def stop(self):
@@ -93,34 +98,18 @@ class ThermalDataThread(QThread):
         super().__init__()
         self._run_flag = True
         self.url = url
-        self.auth = HTTPDigestAuth(user, password)
+        # Aynı kameraya tek bağlantı: GUI, kameranın ortak termal hub'ına abone olur.
+        self.hub = ThermometryHub.for_camera(url, user, password)
+        self._status_callback = self.connection_status.emit
 
     def run(self):
-        while self._run_flag:
-            try:
-                with requests.get(self.url, auth=self.auth, stream=True, timeout=(5, 65)) as response:
-                    if response.status_code == 200:
-                        self.connection_status.emit("Termal Veri: Bağlandı")
-                        buffer = b''
-                        for chunk in response.iter_content(chunk_size=1024):
-                            if not self._run_flag: break
-                            buffer += chunk
-                            while b'--boundary' in buffer:
-                                parts = buffer.split(b'--boundary', 1)
-                                block, buffer = parts[0], parts[1]
-                                if b'Content-Type: application/json' in block:
-                                    json_start = block.find(b'{')
-                                    json_end = block.rfind(b'}')
-                                    if json_start != -1 and json_end != -1:
-                                        json_str = block[json_start:json_end+1].decode('utf-8')
-                                        try: self.thermal_data_updated.emit(json.loads(json_str))
-                                        except: pass
-                    else:
-                        self.connection_status.emit(f"Termal Veri: Hata {response.status_code}")
-                        time.sleep(5)
-            except requests.exceptions.RequestException:
-                self.connection_status.emit("Termal Veri: Bağlantı Hatası")
-                time.sleep(5)
+        self.hub.add_status_listener(self._status_callback)
+        with self.hub.subscribe() as sub:
+            while self._run_flag:
+                data = sub.get(timeout=0.5)
+                if data is not None:
+                    self.thermal_data_updated.emit(data)
+        self.hub.remove_status_listener(self._status_callback)
         print("Termal Veri Thread durdu.")
 
     def stop(self):
@@ -0,0 +1,222 @@
+# alarm_engine.py
+
+import math
+import uuid
+from typing import NamedTuple
+
+OPENED = 'opened'
+UPDATED = 'updated'
+CLOSED = 'closed'
+
+
+class AlarmSettings(NamedTuple):
+    """Alarm motoru eşikleri. Süreler saniye, sıcaklıklar °C, koordinatlar 0..1 normalize."""
+    threshold: float = 75.0          # olay açma eşiği
+    hysteresis: float = 5.0          # kapanma eşiği = threshold - hysteresis
+    min_duration: float = 3.0        # açmadan önce eşik üstünde kesintisiz kalma süresi
+    rise_rate: float | None = None   # °C/sn; aşılırsa eşik altında bile hemen açılır (None: kapalı);
+                                     # böyle açılan olay açılış sıcaklığının hysteresis altına inince kapanır
+    rise_window: float = 10.0        # yükselme hızının ölçüldüğü pencere
+    clear_duration: float = 10.0     # kapanma eşiği altında bu kadar kalınca olay kapanır
+    stale_after: float = 30.0        # bu süre veri gelmeyen olay kapanır
+    cell_size: float = 0.25          # sıcak nokta hücresi (0.25 -> 4x4 ızgara)
+    update_interval: float = 10.0    # açık olay için en sık periyodik "updated" bildirimi
+    peak_step: float = 1.0           # tepe sıcaklık bu kadar artınca aralık beklenmeden bildirilir
+
+    def as_dict(self) -> dict:
+        return self._asdict()
+
+
+class Incident:
+    """Süregelen bir sıcak bölge. Aynı kural üzerinde başka hücrelere kayan veya sıçrayan sıcak nokta aynı olayda kalır."""
+
+    def __init__(self, camera, rule_id, cell, ts: float, temperature: float, trigger: str, data=None):
+        self.incident_id = str(uuid.uuid4())
+        self.camera = camera
+        self.rule_id = rule_id
+        self.cells = {cell}
+        self.trigger = trigger
+        self.opened_at = ts
+        self.opened_temperature = temperature
+        self.last_seen = ts
+        self.closed_at = None
+        self.samples = 0
+        self.last_temperature = temperature
+        self.peak_temperature = temperature
+        self.peak_at = ts
+        self.peak_data = data
+        self.reported_at = ts
+        self.reported_peak = temperature
+        self.event_id = None
+        self.event_folder = None
+
+    @property
+    def open(self) -> bool:
+        return self.closed_at is None
+
+    def observe(self, ts: float, temperature: float, data=None):
+        self.samples += 1
+        self.last_seen = ts
+        self.last_temperature = temperature
+        if temperature > self.peak_temperature:
+            self.peak_temperature, self.peak_at, self.peak_data = temperature, ts, data
+
+    def as_dict(self) -> dict:
+        return {
+            'incident_id': self.incident_id, 'camera': self.camera, 'rule_id': self.rule_id,
+            'cells': sorted(self.cells, key=str), 'trigger': self.trigger, 'open': self.open,
+            'opened_at': self.opened_at, 'opened_temperature': self.opened_temperature, 'last_seen': self.last_seen, 'closed_at': self.closed_at,
+            'samples': self.samples, 'last_temperature': self.last_temperature,
+            'peak_temperature': self.peak_temperature, 'peak_at': self.peak_at,
+        }
+
+
+class AlarmTransition(NamedTuple):
+    kind: str                 # OPENED, UPDATED veya CLOSED
+    incident: Incident
+    data: dict | None         # tetikleyen realTimethermometry mesajı (varsa)
+
+
+class _Track:
+    """(kamera, kural, hücre) başına durum; her örnekte sabit sayıda alan güncellenir."""
+    __slots__ = ('above_since', 'below_since', 'ref_ts', 'ref_temp', 'last_ts', 'last_temp', 'incident')
+
+    def __init__(self, ts, temperature):
+        self.above_since = None
+        self.below_since = None
+        self.ref_ts = self.last_ts = ts
+        self.ref_temp = self.last_temp = temperature
+        self.incident = None
+
+
+class AlarmEngine:
+    """
+    Kural ve bölge bazında durumlu alarm motoru.
+
+    Her ThermometryUpload (kamera, kural, sıcak nokta hücresi) anahtarlı bir izleyiciyi
+    günceller; işlem O(1)'dir. Eşik üstünde min_duration kadar kalan (veya rise_rate'i
+    aşan) bölge bir Incident açar; olay açıkken gelen örnekler aynı olayı günceller,
+    sıcaklık threshold - hysteresis altına (rise_rate ile açılan olayda gerekirse açılış
+    sıcaklığının hysteresis altına) inip clear_duration kadar kalınca olay kapanır.
+    Böylece bir kuraldaki yangın diğer kuralı bastırmaz, süregelen sıcak bölge de
+    dakikada bir yeni olay üretmez.
+
+        engine = AlarmEngine(AlarmSettings(threshold=75.0))
+        for upload in thermometry_uploads(data):
+            transition = engine.update(camera, upload, received_at, data)
+            if transition and transition.kind == OPENED: ...
+        engine.sweep(time.time())   # periyodik: veri kesilen olayları kapatır
+    """
+
+    def __init__(self, settings: AlarmSettings = AlarmSettings()):
+        self.settings = settings
+        self.incidents = {}
+        self._tracks = {}
+
+    def cell_of(self, upload: dict):
+        point = upload.get('HighestPoint') or {}
+        x, y = point.get('positionX'), point.get('positionY')
+        if x is None or y is None:
+            return None
+        size = self.settings.cell_size
+        return (min(int(x / size), math.ceil(1 / size) - 1), min(int(y / size), math.ceil(1 / size) - 1))
+
+    def _neighbor_incident(self, camera, rule_id, cell):
+        if cell is None:
+            return None
+        cx, cy = cell
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                track = self._tracks.get((camera, rule_id, (cx + dx, cy + dy)))
+                if track is not None and track.incident is not None and track.incident.open:
+                    return track.incident
+        # Birden fazla hücre sıçrayan sıcak nokta da aynı kuralın açık olayında kalır.
+        for incident in self.incidents.values():
+            if incident.camera == camera and incident.rule_id == rule_id:
+                return incident
+        return None
+
+    def update(self, camera, upload: dict, ts: float, data: dict | None = None) -> AlarmTransition | None:
+        """Tek bir kural ölçümünü işler; durum değiştiyse AlarmTransition döndürür."""
+        temperature = (upload.get('LinePolygonThermCfg') or {}).get('MaxTemperature')
+        rule_id = upload.get('ruleID')
+        if temperature is None:
+            return None
+        s = self.settings
+        cell = self.cell_of(upload)
+        key = (camera, rule_id, cell)
+        track = self._tracks.get(key)
+        if track is None:
+            track = self._tracks[key] = _Track(ts, temperature)
+
+        # Yükselme hızı: referans örnek pencereden eskiyse bir önceki örneğe kaydırılır.
+        if ts - track.ref_ts > s.rise_window:
+            track.ref_ts, track.ref_temp = track.last_ts, track.last_temp
+        span = ts - track.ref_ts
+        rate = (temperature - track.ref_temp) / span if span >= s.rise_window / 2 else 0.0
+        track.last_ts, track.last_temp = ts, temperature
+
+        incident = track.incident
+        if incident is not None and not incident.open:
+            incident = track.incident = None
+        if incident is None:
+            rising = s.rise_rate is not None and rate >= s.rise_rate
+            if temperature < s.threshold and not rising:
+                track.above_since = None
+                return None
+            if track.above_since is None:
+                track.above_since = ts
+            # Aynı kuralın açık olayına katılmak için süre beklenmez (kayan sıcak nokta).
+            incident = self._neighbor_incident(camera, rule_id, cell)
+            if incident is None and not rising and ts - track.above_since < s.min_duration:
+                return None
+            track.below_since = None
+            if incident is None:
+                incident = Incident(camera, rule_id, cell, ts, temperature, 'rise_rate' if rising else 'threshold', data)
+                incident.samples = 1
+                self.incidents[incident.incident_id] = incident
+                track.incident = incident
+                return AlarmTransition(OPENED, incident, data)
+            incident.cells.add(cell)
+            track.incident = incident
+
+        incident.observe(ts, temperature, data)
+        clear_below = s.threshold - s.hysteresis
+        if incident.trigger == 'rise_rate':
+            # Eşiğin altında yükselme hızıyla açılan olay, kapanma eşiğinin altında açılmıştır;
+            # sıcaklık hâlâ tırmanırken kapanıp hemen yeniden açılmasın diye açılış sıcaklığına göre kapanır.
+            clear_below = min(clear_below, incident.opened_temperature - s.hysteresis)
+        if temperature < clear_below:
+            if track.below_since is None:
+                track.below_since = ts
+            if ts - track.below_since >= s.clear_duration:
+                return self._close(incident, ts, data)
+        else:
+            track.below_since = None
+        if incident.peak_temperature - incident.reported_peak >= s.peak_step \
+                or ts - incident.reported_at >= s.update_interval:
+            incident.reported_at, incident.reported_peak = ts, incident.peak_temperature
+            return AlarmTransition(UPDATED, incident, data)
+        return None
+
+    def _close(self, incident: Incident, ts: float, data=None) -> AlarmTransition:
+        incident.closed_at = ts
+        self.incidents.pop(incident.incident_id, None)
+        for cell in incident.cells:
+            track = self._tracks.get((incident.camera, incident.rule_id, cell))
+            if track is not None and track.incident is incident:
+                track.incident = None
+                track.above_since = track.below_since = None
+        return AlarmTransition(CLOSED, incident, data)
+
+    def sweep(self, now: float) -> list:
+        """Veri gelmeyen açık olayları kapatır ve eski izleyicileri siler (periyodik çağrılır)."""
+        closed = [self._close(incident, now) for incident in list(self.incidents.values())
+                  if now - incident.last_seen > self.settings.stale_after]
+        for key in [key for key, track in self._tracks.items()
+                    if track.incident is None and now - track.last_ts > self.settings.stale_after]:
+            del self._tracks[key]
+        return closed
+
+    def open_incidents(self) -> list:
+        return [incident.as_dict() for incident in self.incidents.values()]
@@ -0,0 +1,121 @@
+# async_isapi.py
+
+import asyncio
+import time
+import xml.etree.ElementTree as ET
+
+import httpx
+
+from ortak.isapi_client import EndpointLatencies
+from ortak.multipart_parser import MultipartStreamParser, iter_json_payloads
+
+ISAPI_NS = {'isapi': 'http://www.isapi.org/ver20/XMLSchema'}
+
+
+def _decode_chunk(parser: MultipartStreamParser, chunk: bytes) -> list:
+    return list(iter_json_payloads(parser, (chunk,)))
+
+
+class AsyncISAPIClient:
+    """
+    asyncio tabanlı ISAPI istemcisi.
+
+    Tek bir httpx.AsyncClient üzerinden kalıcı (keep-alive) bağlantılar kullanılır;
+    httpx.DigestAuth son nonce'u sakladığı için sonraki isteklerde 401 turu tekrar
+    yaşanmaz. FastAPI'nin event loop'u içinde bloklamadan kullanılabilir. Gecikmeler
+    senkron ISAPIClient ile aynı biçimde uç nokta bazında histograma yazılır.
+    """
+
+    def __init__(self, host, user, password, port: int = 80, scheme: str = 'http',
+                 timeout: float = 5.0, max_connections: int = 4):
+        self.base_url = f"{scheme}://{host}:{port}"
+        self.auth = httpx.DigestAuth(user, password)
+        self.timeout = timeout
+        self.latency = EndpointLatencies()
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            auth=self.auth,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+
+    async def aclose(self):
+        await self._client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    async def request(self, method, path, **kwargs) -> httpx.Response:
+        start = time.perf_counter()
+        try:
+            response = await self._client.request(method, path, **kwargs)
+        except httpx.HTTPError:
+            self.latency.record(method, path, (time.perf_counter() - start) * 1000.0, error=True)
+            raise
+        self.latency.record(method, path, (time.perf_counter() - start) * 1000.0, error=response.status_code >= 400)
+        return response
+
+    async def get(self, path, **kwargs) -> httpx.Response:
+        return await self.request('GET', path, **kwargs)
+
+    async def post(self, path, **kwargs) -> httpx.Response:
+        return await self.request('POST', path, **kwargs)
+
+    async def put(self, path, **kwargs) -> httpx.Response:
+        return await self.request('PUT', path, **kwargs)
+
+    async def stream_json(self, path, read_timeout: float = 65.0, chunk_size: int = 4096, executor=None):
+        """
+        Multipart JSON akışından (ör. realTimethermometry) (alınma_zamanı, mesaj) üretir.
+        Bağlantı koparsa httpx istisnası yukarı fırlatılır; yeniden bağlanma çağıranın işidir.
+
+        executor verilirse ayrıştırma ve JSON çözme o havuzda yapılır; çok sayıda kamera
+        tek event loop'ta çalışırken CPU işi loop'u bekletmez. Alınma zamanı chunk'ın
+        geldiği andır.
+        """
+        timeout = httpx.Timeout(self.timeout, read=read_timeout)
+        loop = asyncio.get_running_loop()
+        async with self._client.stream('GET', path, timeout=timeout) as response:
+            response.raise_for_status()
+            parser = MultipartStreamParser.from_response(response)
+            async for chunk in response.aiter_bytes(chunk_size):
+                received_at = time.time()
+                if executor is None:
+                    payloads = iter_json_payloads(parser, (chunk,))
+                else:
+                    # Aynı ayrıştırıcıya bir seferde tek çağrı gider; sıra korunur.
+                    payloads = await loop.run_in_executor(executor, _decode_chunk, parser, chunk)
+                for data in payloads:
+                    yield received_at, data
+
+    async def get_ptz_status(self, channel: int = 1) -> dict | None:
+        """Pan/Tilt pozisyonunu derece cinsinden döndürür; camera_handler.get_ptz_status ile aynı biçimde."""
+        try:
+            response = await self.get(f'/ISAPI/PTZCtrl/channels/{channel}/status', timeout=2.0)
+            response.raise_for_status()
+            root = ET.fromstring(response.content)
+            azimuth_node = root.find('.//isapi:azimuth', ISAPI_NS)
+            elevation_node = root.find('.//isapi:elevation', ISAPI_NS)
+            if azimuth_node is None or elevation_node is None:
+                print("HATA: PTZ XML yanıtında 'azimuth' veya 'elevation' bulunamadı.")
+                return None
+            return {'pan_degrees': float(azimuth_node.text) / 10.0, 'tilt_degrees': float(elevation_node.text) / 10.0}
+        except httpx.HTTPError as e:
+            print(f"HATA: PTZ durumu alınırken ağ hatası oluştu: {e}")
+            return None
+        except Exception as e:
+            print(f"HATA: PTZ durumu işlenirken genel bir hata oluştu: {e}")
+            return None
+
+    async def snapshot(self, stream_channel: int) -> bytes | None:
+        """ISAPI'nin anlık görüntü ucundan JPEG alır (ör. 101 normal, 201 termal); RTSP açmaz."""
+        try:
+            response = await self.get(f'/ISAPI/Streaming/channels/{stream_channel}/picture', timeout=5.0)
+            response.raise_for_status()
+            return response.content
+        except httpx.HTTPError as e:
+            print(f"HATA: {stream_channel} kanalından anlık görüntü alınamadı: {e}")
+            return None
@@ -0,0 +1,128 @@
+# calibration.py
+
+import threading
+import time
+
+import numpy as np
+
+
+def fit_homography(src, dst):
+    """
+    src -> dst noktaları için 3x3 homografi matrisini DLT (SVD) ile hesaplar.
+    En az 4 nokta gerekir; fazlası en küçük kareler anlamında kullanılır.
+    """
+    src = np.asarray(src, dtype=np.float64)
+    dst = np.asarray(dst, dtype=np.float64)
+    if len(src) < 4:
+        raise ValueError("Homografi için en az 4 nokta gerekli")
+    x, y = src[:, 0], src[:, 1]
+    u, v = dst[:, 0], dst[:, 1]
+    zeros, ones = np.zeros_like(x), np.ones_like(x)
+    rows_u = np.stack([x, y, ones, zeros, zeros, zeros, -u * x, -u * y, -u], axis=1)
+    rows_v = np.stack([zeros, zeros, zeros, x, y, ones, -v * x, -v * y, -v], axis=1)
+    A = np.concatenate([rows_u, rows_v])
+    _, _, vt = np.linalg.svd(A)
+    H = vt[-1].reshape(3, 3)
+    return H / H[2, 2]
+
+
+def apply_homography(H, points):
+    """Nx2 noktaları (vektörel) homografi ile dönüştürür."""
+    pts = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    mapped = pts @ H[:, :2].T + H[:, 2]
+    return mapped[:, :2] / mapped[:, 2:3]
+
+
+class ThermalVisibleCalibration:
+    """
+    Termal görüntü koordinatlarını görünür kamera koordinatlarına eşleyen önbellekli kalibrasyon.
+
+    Kameranın calibPointRelation ucu bir ızgara üzerindeki noktalar için bir kez
+    sorgulanır, bu noktalardan homografi hesaplanır ve PTZ zoom/odak durumuna göre
+    saklanır. Sonraki tüm eşlemeler (sıcak/soğuk nokta, ROI köşeleri, kural
+    poligonları) ağ isteği olmadan NumPy ile yapılır. Yeniden sorgulama sadece
+    zoom değiştiğinde veya kayıt max_age saniyeden eskiyse yapılır.
+
+    query_point(tx, ty) -> (vx, vy) | None; giriş 0..1, çıkış kameranın 0..1000 ölçeğidir.
+    """
+
+    def __init__(self, query_point, grid: int = 3, max_age: float = 600.0, max_entries: int = 32,
+                 retry_delay: float = 30.0):
+        self.query_point = query_point
+        self.grid = grid
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self.retry_delay = retry_delay
+        self._next_retry = 0.0
+        self._cache = {}           # durum anahtarı -> (H, hesaplanma zamanı)
+        self._current_key = None
+        self._lock = threading.Lock()
+        self.refresh_count = 0
+
+    @staticmethod
+    def state_key(zoom=None, focus=None):
+        """PTZ durumundan önbellek anahtarı üretir (küçük titreşimleri yok saymak için yuvarlanır)."""
+        return (None if zoom is None else round(float(zoom), 1),
+                None if focus is None else round(float(focus), 1))
+
+    @property
+    def ready(self) -> bool:
+        return self._current_key in self._cache
+
+    def _grid_points(self):
+        steps = np.linspace(0.0, 1.0, self.grid)
+        return [(float(x), float(y)) for y in steps for x in steps]
+
+    def refresh(self, key) -> bool:
+        """Izgara noktalarını kameradan sorgular ve bu durum için homografiyi yeniden hesaplar."""
+        src, dst = [], []
+        for tx, ty in self._grid_points():
+            result = self.query_point(tx, ty)
+            if result is not None:
+                src.append((tx, ty))
+                dst.append((result[0] / 1000.0, result[1] / 1000.0))
+        if len(src) < 4:
+            print(f"Kalibrasyon: yeterli nokta alınamadı ({len(src)}/{self.grid ** 2}).")
+            return False
+        H = fit_homography(src, dst)
+        with self._lock:
+            if len(self._cache) >= self.max_entries and key not in self._cache:
+                oldest = min(self._cache, key=lambda k: self._cache[k][1])
+                del self._cache[oldest]
+            self._cache[key] = (H, time.time())
+        self.refresh_count += 1
+        print(f"Kalibrasyon güncellendi: durum={key}, {len(src)} nokta.")
+        return True
+
+    def update(self, zoom=None, focus=None) -> bool:
+        """
+        Geçerli PTZ durumunu bildirir. Bu durum için önbellekte güncel bir kayıt yoksa
+        kameradan yeniden sorgular. Kalibrasyon kullanılabilir durumdaysa True döner.
+        """
+        key = self.state_key(zoom, focus)
+        self._current_key = key
+        entry = self._cache.get(key)
+        if entry is not None and time.time() - entry[1] <= self.max_age:
+            return True
+        if time.time() < self._next_retry:
+            # Kamera yanıt vermiyorsa her çağrıda ızgarayı yeniden sorgulama.
+            return entry is not None
+        if self.refresh(key):
+            return True
+        self._next_retry = time.time() + self.retry_delay
+        return entry is not None
+
+    def invalidate(self):
+        with self._lock:
+            self._cache.clear()
+
+    def map_points(self, points):
+        """Termal (0..1) noktaları görünür (0..1) koordinatlara eşler; kalibrasyon yoksa None."""
+        entry = self._cache.get(self._current_key)
+        if entry is None:
+            return None
+        return apply_homography(entry[0], points)
+
+    def map_point(self, x, y):
+        mapped = self.map_points([(x, y)])
+        return None if mapped is None else (float(mapped[0, 0]), float(mapped[0, 1]))
@@ -0,0 +1,87 @@
+# display_scaler.py
+
+import time
+
+import cv2
+import numpy as np
+
+
+def fit_size(width: int, height: int, max_width: int, max_height: int) -> tuple:
+    """Qt.KeepAspectRatio ile aynı kural: oranı koruyarak max_width x max_height içine sığdırır."""
+    scale = min(max_width / width, max_height / height)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+class DisplayScaler:
+    """
+    Ekran için kare hazırlama: önce küçült, sonra sadece küçük karede renk dönüştür.
+
+    Eski yol (tam çözünürlükte cvtColor + QImage.scaled) her karede tam boy bir RGB dizisi
+    ayırıp Qt'nin yazılım ölçeklemesini çalıştırıyordu. Burada cv2.resize(INTER_AREA)
+    önceden ayrılmış BGR tampona yazar, cvtColor(dst=) da önceden ayrılmış RGB tampona;
+    kare başına bellek ayrılmaz. RGB tamponları küçük bir halkada döner: dönen dizi sonraki
+    ring - 1 scale() çağrısı boyunca geçerlidir, sonra aynı tampon tekrar yazılır. GUI'nin
+    ne zaman QPixmap'e çevireceği bilinmediğinden başka thread'e giden QImage kopyalanmalıdır
+    (ekran boyutunda tek kopya; tam çözünürlük dönüşümünün yanında ucuzdur).
+
+        scaler = DisplayScaler(640, 360)
+        rgb = scaler.scale(frame)
+        qt_img = QImage(rgb.data, rgb.shape[1], rgb.shape[0], rgb.strides[0], QImage.Format_RGB888).copy()
+    """
+
+    def __init__(self, max_width: int = 640, max_height: int = 360, ring: int = 4,
+                 interpolation: int = cv2.INTER_AREA):
+        self.max_width = max_width
+        self.max_height = max_height
+        self.ring = ring
+        # Küçültmede kullanılır. INTER_AREA en temiz (Qt SmoothTransformation kalitesi);
+        # tek çekirdekli cihazlarda INTER_LINEAR daha ucuzdur.
+        self.interpolation = interpolation
+        self._source_shape = None
+        self._small = None
+        self._rgb = []
+        self._index = 0
+        self._interpolation = interpolation
+        # Aşama süreleri (toplam ms, kare sayısı); stats() ortalamaları verir.
+        self._timings = {'resize': 0.0, 'convert': 0.0}
+        self.frames = 0
+
+    def _allocate(self, frame: np.ndarray):
+        h, w = frame.shape[:2]
+        out_w, out_h = fit_size(w, h, self.max_width, self.max_height)
+        self._source_shape = frame.shape
+        self._small = np.empty((out_h, out_w) + frame.shape[2:], dtype=frame.dtype)
+        self._rgb = [np.empty((out_h, out_w, 3), dtype=np.uint8) for _ in range(self.ring)]
+        # Büyütmede (ör. düşük çözünürlüklü termal) INTER_AREA en yakın komşuya döner; doğrusal kullanılır.
+        self._interpolation = self.interpolation if out_w <= w else cv2.INTER_LINEAR
+
+    @property
+    def output_size(self) -> tuple | None:
+        return (self._small.shape[1], self._small.shape[0]) if self._small is not None else None
+
+    def scale(self, frame: np.ndarray) -> np.ndarray:
+        """BGR kareyi ekran boyutunda RGB'ye çevirir; dönen dizi halkadaki bir tampondur."""
+        if frame.shape != self._source_shape:
+            self._allocate(frame)
+        start = time.perf_counter()
+        cv2.resize(frame, self.output_size, dst=self._small, interpolation=self._interpolation)
+        resized = time.perf_counter()
+        rgb = self._rgb[self._index]
+        cv2.cvtColor(self._small, cv2.COLOR_GRAY2RGB if frame.ndim == 2 else cv2.COLOR_BGR2RGB, dst=rgb)
+        done = time.perf_counter()
+        self._index = (self._index + 1) % self.ring
+        self._timings['resize'] += (resized - start) * 1000.0
+        self._timings['convert'] += (done - resized) * 1000.0
+        self.frames += 1
+        return rgb
+
+    def stats(self, reset: bool = True) -> dict:
+        """Aşama başına ortalama süre (ms); reset ile bir sonraki pencere sıfırdan başlar."""
+        n = self.frames or 1
+        stats = {f'{name}_ms': total / n for name, total in self._timings.items()}
+        stats['display_ms'] = sum(stats.values())
+        stats['display_size'] = self.output_size
+        if reset:
+            self._timings = dict.fromkeys(self._timings, 0.0)
+            self.frames = 0
+        return stats
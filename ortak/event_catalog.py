@@ -0,0 +1,244 @@
+# event_catalog.py
+
+import glob
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+import cv2
+import numpy as np
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    event_id        TEXT PRIMARY KEY,
+    camera          TEXT NOT NULL,
+    rule_id         INTEGER,
+    trigger_time    REAL NOT NULL,
+    created_at      REAL NOT NULL,
+    max_temperature REAL,
+    pan             REAL,
+    tilt            REAL,
+    folder          TEXT NOT NULL,
+    thermal_image   TEXT,
+    normal_image    TEXT,
+    thermal_clip    TEXT,
+    normal_clip     TEXT,
+    thumbnail       TEXT,
+    last_seen       REAL,
+    closed_at       REAL
+);
+CREATE INDEX IF NOT EXISTS events_time ON events (trigger_time, event_id);
+CREATE INDEX IF NOT EXISTS events_camera_time ON events (camera, trigger_time, event_id);
+CREATE INDEX IF NOT EXISTS events_camera_rule_time ON events (camera, rule_id, trigger_time, event_id);
+CREATE INDEX IF NOT EXISTS events_temperature ON events (max_temperature);
+"""
+
+COLUMNS = ('event_id', 'camera', 'rule_id', 'trigger_time', 'created_at', 'max_temperature', 'pan', 'tilt',
+           'folder', 'thermal_image', 'normal_image', 'thermal_clip', 'normal_clip', 'thumbnail',
+           'last_seen', 'closed_at')
+# Sonradan eklenen sütunlar; eski katalog dosyalarına açılışta eklenir.
+ADDED_COLUMNS = {'last_seen': 'REAL', 'closed_at': 'REAL'}
+FILE_COLUMNS = ('thermal_image', 'normal_image', 'thermal_clip', 'normal_clip', 'thumbnail')
+
+THUMBNAIL_NAME = 'thumbnail.jpg'
+
+
+def make_thumbnail(jpeg: bytes, width: int = 320, quality: int = 80) -> bytes | None:
+    """Olay görüntüsünden küçük bir önizleme JPEG'i üretir; liste ekranları tam boy kareyi indirmez."""
+    image = cv2.imdecode(np.frombuffer(jpeg, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        return None
+    h, w = image.shape[:2]
+    if w > width:
+        image = cv2.resize(image, (width, max(1, round(h * width / w))), interpolation=cv2.INTER_AREA)
+    ok, buffer = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    return buffer.tobytes() if ok else None
+
+
+def encode_cursor(trigger_time: float, event_id: str) -> str:
+    return f"{trigger_time!r}:{event_id}"
+
+
+def decode_cursor(cursor: str):
+    trigger_time, _, event_id = cursor.partition(':')
+    return float(trigger_time), event_id
+
+
+class EventCatalog:
+    """
+    Olayların SQLite tabanlı dizini.
+
+    Dosyalar (JSON, JPEG, klip) olay klasörlerinde kalmaya devam eder; katalog her olayın
+    kamera, kural, zaman, en yüksek sıcaklık, PTZ konumu ve dosya yollarını indeksli
+    tutar. Böylece "kamera 3'te geçen hafta 90 °C üstü olaylar" gibi sorgular klasör
+    taramadan yanıtlanır. Sayfalama imleç (trigger_time, event_id) ile yapılır; derin
+    sayfalarda OFFSET taraması olmaz.
+
+        catalog = EventCatalog('events/catalog.db')
+        catalog.add(event_id=..., camera='192.168.1.64', trigger_time=..., folder=...)
+        page = catalog.query(camera='192.168.1.64', min_temperature=90, limit=50)
+        catalog.query(..., cursor=page['next_cursor'])
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.executescript(SCHEMA)
+        existing = {row['name'] for row in self._db.execute('PRAGMA table_info(events)')}
+        for name, sql_type in ADDED_COLUMNS.items():
+            if name not in existing:
+                self._db.execute(f'ALTER TABLE events ADD COLUMN {name} {sql_type}')
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    # --- Yazma ---
+    def add(self, **event) -> bool:
+        """Bir olay ekler; aynı event_id zaten varsa dokunmaz. Eklendiyse True döner."""
+        return self.add_many([event]) == 1
+
+    def add_many(self, events) -> int:
+        rows = [self._row(event) for event in events]
+        with self._lock, self._db:
+            before = self._db.total_changes
+            self._db.executemany(
+                f"INSERT OR IGNORE INTO events ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})", rows)
+            return self._db.total_changes - before
+
+    @staticmethod
+    def _row(event: dict) -> tuple:
+        event = dict(event)
+        event.setdefault('created_at', event['trigger_time'])
+        return tuple(event.get(name) for name in COLUMNS)
+
+    def set_thumbnail(self, event_id: str, thumbnail: str):
+        self.update(event_id, thumbnail=thumbnail)
+
+    def update(self, event_id: str, **fields):
+        """Kayıtlı bir olayın alanlarını günceller (ör. süregelen olayın tepe sıcaklığı, kapanış zamanı)."""
+        unknown = set(fields) - set(COLUMNS[1:])
+        if unknown:
+            raise ValueError(f"Bilinmeyen olay alanları: {', '.join(sorted(unknown))}")
+        if not fields:
+            return
+        with self._lock, self._db:
+            self._db.execute(f"UPDATE events SET {', '.join(f'{name} = ?' for name in fields)} WHERE event_id = ?",
+                             (*fields.values(), event_id))
+
+    # --- Okuma ---
+    def get(self, event_id: str) -> dict | None:
+        with self._lock:
+            row = self._db.execute('SELECT * FROM events WHERE event_id = ?', (event_id,)).fetchone()
+        return dict(row) if row else None
+
+    def query(self, camera: str | None = None, rule_id: int | None = None, start: float | None = None,
+              end: float | None = None, min_temperature: float | None = None, max_temperature: float | None = None,
+              open_only: bool = False, cursor: str | None = None, limit: int = 50, with_total: bool = False) -> dict:
+        """
+        Filtrelenmiş olayları en yeniden eskiye döndürür. Sonraki sayfa için dönen
+        next_cursor aynı filtrelerle tekrar verilir. with_total toplam eşleşme sayısını
+        da hesaplar (büyük kataloglarda ek bir sayım sorgusu demektir).
+        """
+        where, params = [], []
+        for clause, value in (('camera = ?', camera), ('rule_id = ?', rule_id), ('trigger_time >= ?', start),
+                              ('trigger_time < ?', end), ('max_temperature >= ?', min_temperature),
+                              ('max_temperature <= ?', max_temperature)):
+            if value is not None:
+                where.append(clause)
+                params.append(value)
+        if open_only:
+            where.append('closed_at IS NULL')
+        filters = ' AND '.join(where) or '1'
+        page_filters, page_params = filters, list(params)
+        if cursor:
+            page_filters += ' AND (trigger_time, event_id) < (?, ?)'
+            page_params.extend(decode_cursor(cursor))
+        limit = max(1, min(limit, 1000))
+        with self._lock:
+            rows = self._db.execute(
+                f'SELECT * FROM events WHERE {page_filters} ORDER BY trigger_time DESC, event_id DESC LIMIT ?',
+                page_params + [limit + 1]).fetchall()
+            total = self._db.execute(f'SELECT COUNT(*) FROM events WHERE {filters}', params).fetchone()[0] \
+                if with_total else None
+        events = [dict(row) for row in rows[:limit]]
+        next_cursor = encode_cursor(events[-1]['trigger_time'], events[-1]['event_id']) if len(rows) > limit else None
+        return {'events': events, 'next_cursor': next_cursor, 'total': total}
+
+    def count(self) -> int:
+        with self._lock:
+            return self._db.execute('SELECT COUNT(*) FROM events').fetchone()[0]
+
+
+def event_from_folder(folder: str, camera: str) -> dict | None:
+    """
+    Katalog öncesi yazılmış bir olay klasörünü (data.json + dosyalar) katalog kaydına çevirir.
+    Dosya yolları klasöre göre tam yol olarak kaydedilir; var olmayan dosyalar None olur.
+    """
+    try:
+        with open(os.path.join(folder, 'data.json'), encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    event_id = data.get('event_id')
+    timestamp = data.get('timestamp_utc')
+    if not event_id or not timestamp:
+        return None
+    trigger_time = data.get('trigger_time')
+    if trigger_time is None:
+        trigger_time = datetime.fromisoformat(timestamp.rstrip('Z')).replace(tzinfo=timezone.utc).timestamp()
+    thermal = data.get('triggering_thermal_data') or {}
+    ptz = data.get('ptz_position_at_event') or {}
+    # Olay kaydı olmayan eski klasörler tek anlık olaydır: açıldığı anda kapanmış sayılır.
+    incident = data.get('incident') or {'last_seen': trigger_time, 'closed_at': trigger_time}
+    files = data.get('files') or {}
+    paths = {}
+    for column in FILE_COLUMNS:
+        name = files.get(column, THUMBNAIL_NAME if column == 'thumbnail' else None)
+        path = os.path.join(folder, name) if name else None
+        paths[column] = path if path and os.path.exists(path) else None
+    return {
+        'event_id': event_id,
+        'camera': data.get('camera', camera),
+        'rule_id': thermal.get('ruleID'),
+        'trigger_time': trigger_time,
+        'created_at': trigger_time,
+        'max_temperature': incident.get('peak_temperature',
+                                        (thermal.get('LinePolygonThermCfg') or {}).get('MaxTemperature')),
+        'pan': ptz.get('pan_degrees'),
+        'tilt': ptz.get('tilt_degrees'),
+        'folder': folder,
+        'last_seen': incident.get('last_seen'),
+        'closed_at': incident.get('closed_at'),
+        **paths,
+    }
+
+
+def import_event_folders(catalog: EventCatalog, root: str, camera: str, batch: int = 1000) -> tuple:
+    """
+    root altındaki tüm olay klasörlerini kataloğa ekler (tek seferlik geçiş için).
+    Zaten kayıtlı olaylar atlanır, bu yüzden tekrar çalıştırmak güvenlidir.
+    (eklenen, okunamayan) sayılarını döndürür.
+    """
+    added = failed = 0
+    pending = []
+    for path in sorted(glob.glob(os.path.join(root, '*', 'data.json'))):
+        event = event_from_folder(os.path.dirname(path), camera)
+        if event is None:
+            failed += 1
+            continue
+        pending.append(event)
+        if len(pending) >= batch:
+            added += catalog.add_many(pending)
+            pending = []
+    if pending:
+        added += catalog.add_many(pending)
+    return added, failed
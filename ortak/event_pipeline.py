@@ -0,0 +1,144 @@
+# event_pipeline.py
+
+import asyncio
+import time
+
+from ortak.isapi_client import LatencyHistogram
+
+
+class PipelineStage:
+    """
+    Olay hattının bir aşaması: sınırlı bir kuyruk ve sabit sayıda işçi görevi.
+
+    handler(item) bir coroutine'dir; döndürdüğü değer sonraki aşamaya verilir, None
+    dönerse öğe hattan çıkar. Sonraki aşamanın kuyruğu doluysa işçi bekler; böylece
+    yavaş bir aşama (ör. disk) önceki aşamaları da yavaşlatır ama bellek büyümez.
+    """
+
+    def __init__(self, name: str, handler, workers: int = 1, queue_size: int = 32):
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.next = None
+        self.processed = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.wait = LatencyHistogram()
+        self.service = LatencyHistogram()
+        self._tasks = []
+
+    async def put(self, item):
+        await self.queue.put((time.perf_counter(), item))
+
+    def start(self):
+        self._tasks = [asyncio.create_task(self._worker(), name=f"{self.name}-{i}") for i in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _worker(self):
+        while True:
+            enqueued_at, item = await self.queue.get()
+            started = time.perf_counter()
+            self.wait.record((started - enqueued_at) * 1000.0)
+            self.in_flight += 1
+            result = None
+            try:
+                result = await self.handler(item)
+                self.processed += 1
+                self.service.record((time.perf_counter() - started) * 1000.0)
+            except Exception as e:
+                self.errors += 1
+                self.service.record((time.perf_counter() - started) * 1000.0, error=True)
+                print(f"HATA: Olay hattı '{self.name}' aşamasında hata: {e}")
+            finally:
+                self.in_flight -= 1
+            try:
+                if result is not None and self.next is not None:
+                    await self.next.put(result)
+            finally:
+                # Öğe bir sonraki kuyruğa geçtikten sonra bitmiş sayılır; drain() sırayla çalışır.
+                self.queue.task_done()
+
+    def stats(self) -> dict:
+        return {
+            'workers': self.workers,
+            'queue_depth': self.queue.qsize(),
+            'queue_size': self.queue.maxsize,
+            'in_flight': self.in_flight,
+            'processed': self.processed,
+            'errors': self.errors,
+            'wait': self.wait.snapshot(),
+            'service': self.service.snapshot(),
+        }
+
+
+class EventPipeline:
+    """
+    Aşamaları sırayla bağlar (ör. algıla -> zenginleştir -> kaydet -> bildir).
+
+    submit() akış okuyucusundan çağrılır ve asla beklemez: giriş kuyruğu doluysa öğe
+    düşülür ve sayılır, termal akış okunmaya devam eder. Aşamalar arasında ise
+    geri basınç vardır; her aşamanın kendi kuyruğu ve eşzamanlılığı olduğu için aynı
+    anda gelen farklı kural/kamera anomalileri birbirini beklemeden işlenir.
+
+        pipeline = EventPipeline([
+            PipelineStage('detect', detect, workers=1),
+            PipelineStage('enrich', enrich, workers=4),
+            PipelineStage('persist', persist, workers=2),
+        ])
+        pipeline.start()          # event loop içinde
+        pipeline.submit(item)
+    """
+
+    def __init__(self, stages: list):
+        self.stages = stages
+        for stage, following in zip(stages, stages[1:]):
+            stage.next = following
+        self.submitted = 0
+        self.dropped = 0
+
+    def submit(self, item) -> bool:
+        try:
+            self.stages[0].queue.put_nowait((time.perf_counter(), item))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            print(f"UYARI: Olay hattı dolu, anomali düşürüldü (toplam {self.dropped}).")
+            return False
+        self.submitted += 1
+        return True
+
+    @property
+    def busy(self) -> bool:
+        return any(stage.in_flight or stage.queue.qsize() for stage in self.stages)
+
+    def start(self):
+        for stage in self.stages:
+            stage.start()
+
+    async def _join(self):
+        for stage in self.stages:
+            await stage.queue.join()
+
+    async def drain(self, timeout: float = 30.0):
+        """Kuyruktaki öğeleri aşama sırasıyla bitirir; süre dolarsa kalanlar bırakılır."""
+        try:
+            await asyncio.wait_for(self._join(), timeout)
+        except asyncio.TimeoutError:
+            print("UYARI: Olay hattı zamanında boşalmadı; kuyrukta kalan olaylar kaydedilmedi.")
+
+    async def stop(self, timeout: float = 30.0):
+        await self.drain(timeout)
+        for stage in self.stages:
+            await stage.stop()
+
+    def stats(self) -> dict:
+        return {
+            'submitted': self.submitted,
+            'dropped': self.dropped,
+            'stages': {stage.name: stage.stats() for stage in self.stages},
+        }
@@ -0,0 +1,286 @@
+# frame_bus.py
+
+import os
+import threading
+import time
+from typing import NamedTuple
+
+import cv2
+import numpy as np
+
+os.environ.setdefault("OPENCV_FFMPEG_CAPTURE_OPTIONS", "rtsp_transport;tcp")
+
+
+class BusFrame(NamedTuple):
+    """Veri yolunda yayınlanan kare. image salt okunurdur; üzerine çizmek isteyen kopyalamalıdır."""
+    image: np.ndarray
+    seq: int
+    timestamp: float        # grab anı (time.time())
+
+
+class FrameSubscription:
+    """
+    Bir FrameBus'a bağlı tek bir tüketici. Kendi okuduğu son sıra numarasını tutar;
+    yavaş tüketici ara kareleri atlar (dropped), hiçbir zaman kuyruk biriktirmez ve
+    veri yolunu bekletmez. Kareler kopyalanmaz: tüm aboneler aynı diziyi görür, dizi
+    son referans bırakılınca serbest kalır.
+    """
+
+    def __init__(self, bus, name: str = ''):
+        self.bus = bus
+        self.name = name
+        self.closed = False
+        # Abonelikten önce yayınlanmış kare yeni sayılmaz; ilk next() bir sonraki kareyi bekler.
+        self._seq = bus._seq
+        self._grabbed_at_start = bus.grabbed
+        self.received = 0
+        self._latency_sum = 0.0
+        self._latency_count = 0
+        self._latency_max = 0.0
+
+    def _take(self, frame):
+        if frame is None or frame.seq <= self._seq:
+            return None
+        self._seq = frame.seq
+        self.received += 1
+        return frame
+
+    def latest(self) -> BusFrame | None:
+        """Bu abonenin henüz görmediği en yeni kareyi döndürür; yoksa None. Beklemez."""
+        return self._take(self.bus.latest())
+
+    def next(self, timeout: float = 2.0) -> BusFrame | None:
+        """Bu abonenin görmediği bir kare gelene kadar en fazla timeout bekler; gelmezse None."""
+        return self._take(self.bus.wait_newer(self._seq, timeout))
+
+    @property
+    def dropped(self) -> int:
+        """Abonelikten beri kameradan gelip bu abonenin hiç görmediği kare sayısı."""
+        return max(0, self.bus.grabbed - self._grabbed_at_start - self.received)
+
+    def mark_displayed(self, timestamp: float):
+        """Kare ekrana verildiğinde çağrılır; grab→ekran gecikmesini kaydeder."""
+        if not timestamp:
+            return
+        latency = time.time() - timestamp
+        self._latency_sum += latency
+        self._latency_count += 1
+        self._latency_max = max(self._latency_max, latency)
+
+    def stats(self, reset: bool = True) -> dict:
+        """
+        Ekran istatistikleri: 'dropped' bu abonenin atladığı karelerdir, 'latency_ms' grab→ekran
+        gecikmesidir, 'stream_lag_ms' veri yolunun kameranın zaman damgasının ne kadar gerisinde kaldığıdır.
+        """
+        count = self._latency_count
+        result = {
+            'grabbed': self.bus.grabbed,
+            'retrieved': self.received,
+            'dropped': self.dropped,
+            'latency_ms': (self._latency_sum / count * 1000.0) if count else 0.0,
+            'latency_max_ms': self._latency_max * 1000.0,
+            'stream_lag_ms': self.bus.stream_lag * 1000.0,
+            'subscribers': self.bus.subscribers,
+        }
+        if reset:
+            self._latency_sum, self._latency_count, self._latency_max = 0.0, 0, 0.0
+        return result
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.bus.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class FrameBus:
+    """
+    Akış başına tek çözücü: bir RTSP akışını bir kez açar, kareleri zaman damgasıyla
+    salt okunur olarak yayınlar; ekran, MJPEG aktarıcı, olay görüntüleri ve analiz
+    aynı süreç içinde abone olarak aynı kareleri kullanır. Her tüketicinin kendi
+    VideoCapture'ı olduğunda akış birkaç kez çözülüyor ve kameranın RTSP oturum
+    sınırına çabuk ulaşılıyordu.
+
+    Tampon birikmesin diye her pakette grab() yapılır ama retrieve() (renk dönüşümü ve
+    yeni dizi) sadece en az bir abone next() ile kare beklerken çağrılır: 5 fps'lik halka tampon
+    25 fps'lik akışın her karesini dönüştürtmez, abone yokken hiç kare üretilmez. latest()
+    beklemez; son yayınlanan kareyi (timestamp ile) verir. Kopma durumunda yeniden bağlanılır,
+    rtsp_url bir fonksiyonsa her bağlanışta çağrılır.
+
+        bus = FrameBus.shared(rtsp_url, "Termal")
+        with bus.subscribe("ekran") as sub:
+            frame = sub.next()          # BusFrame(image, seq, timestamp) veya None
+    """
+
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, rtsp_url, name: str = '', backend=cv2.CAP_FFMPEG, reconnect_delay: float = 5.0):
+        self.rtsp_url = rtsp_url
+        self.name = name or str(rtsp_url)
+        self.backend = backend
+        self.reconnect_delay = reconnect_delay
+        self.status = "Bağlanmadı"
+        self._cond = threading.Condition()
+        self._latest = None
+        self._seq = 0
+        self._subscribers = []
+        self._waiting = 0
+        self._status_listeners = []
+        self._alive = False
+        self._running = False
+        self._thread = None
+        self.grabbed = 0
+        self.published = 0
+        self.reconnects = 0
+        self.stream_lag = 0.0
+
+    @classmethod
+    def shared(cls, rtsp_url, name: str = '', **kwargs) -> 'FrameBus':
+        """
+        Süreç içinde aynı akış için tek veri yolunu döndürür (gerekirse oluşturup başlatır).
+        Anahtar, rtsp_url bir metinse adresin kendisi, fonksiyonsa name'dir.
+        """
+        key = rtsp_url if isinstance(rtsp_url, str) else name
+        with cls._shared_lock:
+            bus = cls._shared.get(key)
+            if bus is None:
+                bus = cls._shared[key] = cls(rtsp_url, name, **kwargs)
+        bus.start()
+        return bus
+
+    # --- Abonelik ---
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self, name: str = '') -> FrameSubscription:
+        with self._cond:
+            subscription = FrameSubscription(self, name)
+            self._subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: FrameSubscription):
+        with self._cond:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+            self._cond.notify_all()
+
+    def latest(self) -> BusFrame | None:
+        return self._latest
+
+    def wait_newer(self, seq: int, timeout: float = 2.0) -> BusFrame | None:
+        """seq'ten yeni bir kare yayınlanana kadar bekler; zaman aşımında None."""
+        with self._cond:
+            if self._seq <= seq:
+                self._waiting += 1
+                try:
+                    self._cond.wait_for(lambda: self._seq > seq or not self._running, timeout)
+                finally:
+                    self._waiting -= 1
+            return self._latest if self._seq > seq else None
+
+    # --- Durum ---
+    def add_status_listener(self, callback):
+        self._status_listeners.append(callback)
+        callback(self.status)
+
+    def remove_status_listener(self, callback):
+        if callback in self._status_listeners:
+            self._status_listeners.remove(callback)
+
+    def set_status(self, status: str):
+        if status == self.status:
+            return
+        self.status = status
+        for callback in list(self._status_listeners):
+            try:
+                callback(status)
+            except Exception as e:
+                print(f"Veri yolu durum dinleyici hatası: {e}")
+
+    def is_alive(self) -> bool:
+        return self._alive
+
+    # --- Çözücü thread ---
+    def start(self):
+        with self._cond:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name=f"FrameBus-{self.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2.0)
+
+    def _publish(self, image: np.ndarray, timestamp: float):
+        # VideoCapture her retrieve() için yeni dizi döndürür; sahiplik doğrudan veri yoluna geçer.
+        image.setflags(write=False)
+        with self._cond:
+            self._seq += 1
+            self._latest = BusFrame(image, self._seq, timestamp)
+            self.published += 1
+            self._cond.notify_all()
+
+    def _run(self):
+        while self._running:
+            rtsp_url = self.rtsp_url() if callable(self.rtsp_url) else self.rtsp_url
+            cap = cv2.VideoCapture(rtsp_url, self.backend)
+            try:
+                if not cap.isOpened():
+                    self.set_status("Bağlantı Hatası")
+                    time.sleep(self.reconnect_delay)
+                    continue
+                cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+                self._alive = True
+                self.set_status("Bağlandı")
+                first_wall = first_pts = None
+                while self._running:
+                    if not cap.grab():
+                        break
+                    now = time.time()
+                    self.grabbed += 1
+                    pts = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+                    if first_wall is None:
+                        first_wall, first_pts = now, pts
+                    elif pts > 0:
+                        self.stream_lag = (now - first_wall) - (pts - first_pts)
+                    if not self._waiting:
+                        continue
+                    ok, image = cap.retrieve()
+                    if ok and image is not None:
+                        self._publish(image, now)
+            except Exception as e:
+                print(f"HATA ({self.name} veri yolu): {e}")
+            finally:
+                cap.release()
+            if self._alive:
+                self._alive = False
+                self.reconnects += 1
+                self.set_status("Veri Alınamıyor")
+                with self._cond:
+                    self._cond.notify_all()
+            if self._running:
+                time.sleep(min(1.0, self.reconnect_delay))
+
+    def stats(self) -> dict:
+        return {
+            'name': self.name,
+            'status': self.status,
+            'subscribers': self.subscribers,
+            'waiting': self._waiting,
+            'grabbed': self.grabbed,
+            'published': self.published,
+            'reconnects': self.reconnects,
+            'stream_lag_ms': self.stream_lag * 1000.0,
+        }
@@ -0,0 +1,152 @@
+# frame_ring_buffer.py
+
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from ortak.frame_bus import FrameBus
+
+
+class FrameRingBuffer:
+    """
+    Son N saniyenin JPEG karelerini zaman damgalarıyla tutan sabit kapasiteli halka tampon.
+
+    Kareler zaman sırasıyla eklendiği için belirli bir ana en yakın kare ikili
+    arama ile O(log n)'de bulunur. Kapasite dolduğunda en eski kare üzerine yazılır.
+    """
+
+    def __init__(self, seconds: float = 15.0, fps: float = 5.0):
+        self.seconds = seconds
+        self.capacity = max(1, int(seconds * fps) + 1)
+        self._ts = [0.0] * self.capacity
+        self._data = [None] * self.capacity
+        self._start = 0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._count
+
+    def append(self, timestamp: float, jpeg: bytes):
+        with self._lock:
+            if self._count < self.capacity:
+                idx = (self._start + self._count) % self.capacity
+                self._count += 1
+            else:
+                idx = self._start
+                self._start = (self._start + 1) % self.capacity
+            self._ts[idx] = timestamp
+            self._data[idx] = jpeg
+
+    def _phys(self, i):
+        return (self._start + i) % self.capacity
+
+    def _bisect(self, timestamp):
+        """timestamp'ten büyük veya eşit ilk mantıksal indeks."""
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._ts[self._phys(mid)] < timestamp:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def closest(self, timestamp: float):
+        """timestamp'e en yakın kareyi (zaman, jpeg) olarak döndürür; tampon boşsa (None, None)."""
+        with self._lock:
+            if not self._count:
+                return None, None
+            i = self._bisect(timestamp)
+            candidates = [j for j in (i - 1, i) if 0 <= j < self._count]
+            best = min(candidates, key=lambda j: abs(self._ts[self._phys(j)] - timestamp))
+            p = self._phys(best)
+            return self._ts[p], self._data[p]
+
+    def between(self, start: float, end: float) -> list:
+        """[start, end] aralığındaki kareleri (zaman, jpeg) listesi olarak döndürür."""
+        with self._lock:
+            first = self._bisect(start)
+            last = self._bisect(end + 1e-9)
+            return [(self._ts[self._phys(i)], self._data[self._phys(i)]) for i in range(first, last)]
+
+    def latest_time(self) -> float:
+        with self._lock:
+            return self._ts[self._phys(self._count - 1)] if self._count else 0.0
+
+
+def export_clip(frames: list, path: str, fps: float | None = None) -> bool:
+    """(zaman, jpeg) listesini bir video dosyasına yazar. fps verilmezse zaman damgalarından hesaplanır."""
+    if not frames:
+        return False
+    first = cv2.imdecode(np.frombuffer(frames[0][1], np.uint8), cv2.IMREAD_COLOR)
+    if first is None:
+        return False
+    if fps is None:
+        duration = frames[-1][0] - frames[0][0]
+        fps = (len(frames) - 1) / duration if duration > 0 else 1.0
+    h, w = first.shape[:2]
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (w, h))
+    if not writer.isOpened():
+        return False
+    try:
+        writer.write(first)
+        for _, jpeg in frames[1:]:
+            frame = cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR)
+            if frame is not None and frame.shape[:2] == (h, w):
+                writer.write(frame)
+    finally:
+        writer.release()
+    return True
+
+
+class RingBufferRecorder:
+    """
+    Bir RTSP akışının veri yoluna (FrameBus) abone olur ve saniyede 'fps' kareyi JPEG
+    olarak halka tampona yazar. Böylece olay anında yeni bir RTSP bağlantısı kurmaya
+    gerek kalmaz; aynı süreçteki diğer tüketiciler de aynı çözücüyü kullanır.
+    """
+
+    def __init__(self, rtsp_url, name: str, seconds: float = 15.0, fps: float = 5.0, jpeg_quality: int = 90):
+        self.rtsp_url = rtsp_url
+        self.name = name
+        self.fps = fps
+        self.jpeg_quality = jpeg_quality
+        self.buffer = FrameRingBuffer(seconds, fps)
+        self.bus = None
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        self._running = True
+        self.bus = FrameBus.shared(self.rtsp_url, self.name)
+        self._thread = threading.Thread(target=self._run, name=f"RingBuffer-{self.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+
+    def _run(self):
+        interval = 1.0 / self.fps
+        params = [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality]
+        print(f"{self.name} halka tamponu besleniyor ({self.buffer.seconds:.0f} sn, {self.fps:g} fps).")
+        with self.bus.subscribe("halka tampon") as sub:
+            next_time = 0.0
+            while self._running:
+                # Sadece tampona yazılacak kareler kodlanır; aradakiler abonelikte atlanır.
+                wait = next_time - time.time()
+                if wait > 0:
+                    time.sleep(wait)
+                frame = sub.next()
+                if frame is None:
+                    continue
+                next_time = frame.timestamp + interval
+                try:
+                    ok, encoded = cv2.imencode('.jpg', frame.image, params)
+                except cv2.error as e:
+                    print(f"HATA ({self.name} halka tampon): {e}")
+                    continue
+                if ok:
+                    self.buffer.append(frame.timestamp, encoded.tobytes())
@@ -0,0 +1,138 @@
+# hotspot_blobs.py
+
+import time
+
+import cv2
+import numpy as np
+
+# Kare başına blob kaydı; 34 bayt, hizalamasız (packed). Koordinatlar sensör pikseli, sıcaklıklar °C.
+BLOB_DTYPE = np.dtype([
+    ('label', '<u2'),      # bileşen etiketi (sadece bu karede anlamlı)
+    ('area', '<u4'),       # piksel sayısı
+    ('max', '<f4'),
+    ('mean', '<f4'),
+    ('cx', '<f4'),         # ağırlık merkezi
+    ('cy', '<f4'),
+    ('x0', '<u2'),         # sınır kutusu, x1/y1 dahil değil
+    ('y0', '<u2'),
+    ('x1', '<u2'),
+    ('y1', '<u2'),
+    ('px', '<u2'),         # en sıcak pikselin konumu
+    ('py', '<u2'),
+])
+
+EMPTY_BLOBS = np.zeros(0, BLOB_DTYPE)
+
+
+def extract_blobs(matrix: np.ndarray, threshold: float, min_area: int = 1, connectivity: int = 8,
+                  max_blobs: int | None = None) -> np.ndarray:
+    """
+    °C matrisinde threshold ve üzerindeki bağlı bölgeleri bulur; BLOB_DTYPE dizisi döndürür,
+    en sıcaktan soğuğa sıralı.
+
+    Tam kare üzerinde sadece eşikleme ve etiketleme (cv2.connectedComponents) yapılır.
+    İstatistikler yalnızca eşik üstü pikseller üzerinden çıkarılır: pikseller etikete göre
+    sıralanır ve her istatistik tek bir reduceat ile hesaplanır. Etiket başına Python döngüsü
+    yoktur. connectedComponentsWithStats'ın tam kare istatistik geçişi burada gereksizdir;
+    sıcak pikseller karenin küçük bir kısmı olduğundan yavaş kalır.
+    """
+    hot = np.greater_equal(matrix, threshold)
+    flat = np.flatnonzero(hot)
+    if flat.size == 0:
+        return EMPTY_BLOBS
+    count, labels = cv2.connectedComponentsWithAlgorithm(hot.view(np.uint8), connectivity, cv2.CV_32S,
+                                                         cv2.CCL_GRANA)
+    lab = labels.ravel()[flat]
+    # Kararlı sıralama etiket içinde satır sırasını korur; böylece y0/y1 segmentin ilk/son pikselidir.
+    order = np.argsort(lab, kind='stable')
+    flat, lab = flat[order], lab[order]
+    values = matrix.ravel()[flat]
+    ys, xs = np.divmod(flat, matrix.shape[1])
+
+    areas = np.bincount(lab, minlength=count)[1:]
+    starts = np.zeros(count - 1, np.intp)
+    np.cumsum(areas[:-1], out=starts[1:])
+    maxima = np.maximum.reduceat(values, starts)
+    # Her etiketin maksimumuna eşit ilk piksel en sıcak nokta olarak alınır.
+    hits = np.flatnonzero(values == np.repeat(maxima, areas))
+    _, first = np.unique(lab[hits], return_index=True)
+    peaks = hits[first]
+
+    keep = np.flatnonzero(areas >= min_area) if min_area > 1 else np.arange(count - 1)
+    keep = keep[np.argsort(-maxima[keep], kind='stable')]
+    if max_blobs is not None:
+        keep = keep[:max_blobs]
+    seg, area = starts[keep], areas[keep]
+
+    blobs = np.empty(len(keep), BLOB_DTYPE)
+    blobs['label'] = keep + 1
+    blobs['area'] = area
+    blobs['max'] = maxima[keep]
+    blobs['mean'] = np.add.reduceat(values, starts, dtype=np.float64)[keep] / area
+    blobs['cx'] = np.add.reduceat(xs, starts)[keep] / area
+    blobs['cy'] = np.add.reduceat(ys, starts)[keep] / area
+    blobs['x0'] = np.minimum.reduceat(xs, starts)[keep]
+    blobs['y0'] = ys[seg]
+    blobs['x1'] = np.maximum.reduceat(xs, starts)[keep] + 1
+    blobs['y1'] = ys[seg + area - 1] + 1
+    blobs['px'] = xs[peaks[keep]]
+    blobs['py'] = ys[peaks[keep]]
+    return blobs
+
+
+class HotspotDetector:
+    """
+    Radyometrik karelerden (TemperatureFrame) sıcak bölge çıkarır. PixelDataStream'e
+    dinleyici olarak bağlanır; her kare için BLOB_DTYPE dizisi üretip kendi dinleyicilerine
+    (callback(frame, blobs)) iletir. Eşik çalışırken set_threshold ile değiştirilebilir.
+
+    Eski yol (ptz_gui_thermal_corrected_04_bax_ısı.py) sahte renkli görüntüde HSV maskesi
+    kurup kırmızı kanal ortalamasını "°C" diye gösteriyordu; burada ölçülen sıcaklık kullanılır.
+
+        detector = HotspotDetector(threshold=60.0, min_area=4)
+        detector.add_listener(lambda frame, blobs: print(blobs[['max', 'cx', 'cy']]))
+        stream.add_listener(detector.process)
+    """
+
+    def __init__(self, threshold: float, min_area: int = 1, connectivity: int = 8, max_blobs: int | None = 64):
+        self.threshold = float(threshold)
+        self.min_area = min_area
+        self.connectivity = connectivity
+        self.max_blobs = max_blobs
+        self._listeners = []
+        self.latest = EMPTY_BLOBS
+        self.frames = 0
+        self._total_ms = 0.0
+
+    def set_threshold(self, threshold: float):
+        self.threshold = float(threshold)
+
+    def add_listener(self, callback):
+        """Her karede callback(frame: TemperatureFrame, blobs: np.ndarray) akış thread'inden çağrılır."""
+        self._listeners.append(callback)
+
+    def detect(self, matrix: np.ndarray) -> np.ndarray:
+        start = time.perf_counter()
+        blobs = extract_blobs(matrix, self.threshold, self.min_area, self.connectivity, self.max_blobs)
+        self._total_ms += (time.perf_counter() - start) * 1000.0
+        self.frames += 1
+        self.latest = blobs
+        return blobs
+
+    def process(self, frame):
+        """PixelDataStream dinleyicisi: kareyi işler ve sonucu dinleyicilere iletir."""
+        blobs = self.detect(frame.matrix)
+        for callback in list(self._listeners):
+            try:
+                callback(frame, blobs)
+            except Exception as e:
+                print(f"Sıcak bölge dinleyici hatası: {e}")
+        return blobs
+
+    def stats(self, reset: bool = True) -> dict:
+        stats = {'blob_ms': self._total_ms / (self.frames or 1), 'blob_frames': self.frames,
+                 'blobs': len(self.latest)}
+        if reset:
+            self._total_ms = 0.0
+            self.frames = 0
+        return stats
@@ -0,0 +1,166 @@
+# isapi_client.py
+
+import bisect
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.auth import HTTPDigestAuth
+
+# Gecikme histogramı kova üst sınırları (ms); son kova sınırsızdır.
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+class LatencyHistogram:
+    """Sabit kovalı gecikme histogramı. Kayıt O(log k), bellek sabittir."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, ms: float, error: bool = False):
+        self.counts[bisect.bisect_left(self.buckets, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        if error:
+            self.errors += 1
+
+    def percentile(self, p: float) -> float:
+        """p. yüzdelik için kova üst sınırını döndürür (son kovada gözlenen maksimum)."""
+        if not self.count:
+            return 0.0
+        target = self.count * p / 100.0
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target and n:
+                return float(self.buckets[i]) if i < len(self.buckets) else self.max_ms
+        return self.max_ms
+
+    def snapshot(self) -> dict:
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'avg_ms': round(self.total_ms / self.count, 2) if self.count else 0.0,
+            'p50_ms': self.percentile(50),
+            'p95_ms': self.percentile(95),
+            'max_ms': round(self.max_ms, 2),
+            'buckets_ms': dict(zip([*map(str, self.buckets), 'inf'], self.counts)),
+        }
+
+
+class EndpointLatencies:
+    """Uç nokta (yöntem + yol) başına gecikme histogramları; thread-safe."""
+
+    def __init__(self):
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def endpoint_key(method: str, url: str) -> str:
+        return f"{method.upper()} {urlsplit(url).path or url}"
+
+    def record(self, method: str, url: str, ms: float, error: bool = False):
+        key = self.endpoint_key(method, url)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = LatencyHistogram()
+            histogram.record(ms, error)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {key: h.snapshot() for key, h in sorted(self._histograms.items())}
+
+    def summary(self) -> str:
+        lines = []
+        for key, s in self.snapshot().items():
+            lines.append(f"  {key}: {s['count']} istek, {s['errors']} hata, ort={s['avg_ms']:.1f} ms, "
+                         f"p50<={s['p50_ms']:.0f} ms, p95<={s['p95_ms']:.0f} ms, maks={s['max_ms']:.1f} ms")
+        return "\n".join(lines)
+
+
+class ISAPIClient:
+    """
+    Kamera başına kalıcı ISAPI istemcisi.
+
+    Tek bir requests.Session üzerinden keep-alive bağlantı havuzu kullanılır, böylece
+    her istekte yeni TCP bağlantısı açılmaz. Oturuma bağlı tek HTTPDigestAuth nesnesi
+    son nonce'u saklar; ilk 401 turundan sonra aynı thread'deki istekler Authorization
+    başlığını doğrudan gönderir. Her istek uç nokta bazında gecikme histogramına yazılır.
+
+        isapi = ISAPIClient.for_camera('192.168.1.64', 'admin', 'parola')
+        response = isapi.get('/ISAPI/PTZCtrl/channels/1/status', timeout=1)
+    """
+
+    _clients = {}
+    _clients_lock = threading.Lock()
+
+    def __init__(self, host, user, password, port: int = 80, scheme: str = 'http',
+                 timeout: float = 3.0, pool_size: int = 4):
+        self.base_url = f"{scheme}://{host}:{port}"
+        self.timeout = timeout
+        self.latency = EndpointLatencies()
+        self.session = requests.Session()
+        self.session.auth = HTTPDigestAuth(user, password)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    @classmethod
+    def for_camera(cls, host, user, password, port: int = 80, scheme: str = 'http', **kwargs):
+        """Aynı kamera için süreç genelinde tek bir istemci (ve bağlantı havuzu) döndürür."""
+        key = (scheme, host, int(port), user)
+        with cls._clients_lock:
+            client = cls._clients.get(key)
+            if client is None:
+                client = cls._clients[key] = cls(host, user, password, port, scheme, **kwargs)
+            return client
+
+    @classmethod
+    def for_url(cls, url, user, password, **kwargs):
+        """Tam bir ISAPI URL'sinden kamera istemcisini bulur (ör. http://192.168.1.64/ISAPI/...)."""
+        parts = urlsplit(url)
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+        return cls.for_camera(parts.hostname, user, password, port, parts.scheme or 'http', **kwargs)
+
+    def url(self, path: str) -> str:
+        return path if path.startswith(('http://', 'https://')) else self.base_url + path
+
+    def request(self, method: str, path: str, **kwargs) -> requests.Response:
+        """
+        ISAPI isteği gönderir; path göreli (/ISAPI/...) veya tam URL olabilir.
+        Ağ hataları requests istisnası olarak yukarı fırlatılır.
+        """
+        url = self.url(path)
+        kwargs.setdefault('timeout', self.timeout)
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except requests.exceptions.RequestException:
+            self.latency.record(method, url, (time.perf_counter() - start) * 1000.0, error=True)
+            raise
+        self.latency.record(method, url, (time.perf_counter() - start) * 1000.0, error=response.status_code >= 400)
+        return response
+
+    def get(self, path, **kwargs) -> requests.Response:
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path, **kwargs) -> requests.Response:
+        return self.request('POST', path, **kwargs)
+
+    def put(self, path, **kwargs) -> requests.Response:
+        return self.request('PUT', path, **kwargs)
+
+    def latency_stats(self) -> dict:
+        return self.latency.snapshot()
+
+    def close(self):
+        self.session.close()
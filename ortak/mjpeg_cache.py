@@ -0,0 +1,295 @@
+# mjpeg_cache.py
+
+import threading
+import time
+from collections import deque
+from typing import NamedTuple
+
+import cv2
+
+MJPEG_BOUNDARY = b'frame'
+
+
+class Tier(NamedTuple):
+    """Önceden kodlanan bir MJPEG çeşidi. width/height None ise kaynak çözünürlüğü kullanılır."""
+    name: str
+    width: int | None
+    height: int | None
+    quality: int
+
+
+def default_tiers(quality: int = 95) -> tuple:
+    """En iyiden en düşüğe: tam çözünürlük, 640x360 ve 320x180, ikişer kalite seviyesiyle."""
+    return (
+        Tier('tam', None, None, quality),
+        Tier('640x360', 640, 360, 80),
+        Tier('640x360-dusuk', 640, 360, 55),
+        Tier('320x180', 320, 180, 70),
+        Tier('320x180-dusuk', 320, 180, 40),
+    )
+
+
+class ClientRate:
+    """
+    Bir izleyicinin gönderim hızını ölçer ve katman seçer.
+
+    Üretecin yield ettiği parça, WSGI sunucusu onu sokete yazana kadar geri dönmez; TCP tamponu
+    dolduğunda yazma bloklanır. yield'den dönüş süresi bu yüzden parçanın sokete yazılma süresidir.
+    Tampona sığan yazmalar neredeyse sıfır sürede döner; parça başına hızların ortalaması bu yüzden
+    yavaş izleyiciyi hızlı gösterir. Hız, son window_seconds içindeki toplam bayt / toplam yazma
+    süresidir: tampon doluyken bloklanan yazmalar süreye tam ağırlığıyla girer. Akışın kare hızında
+    seçili katmanın gerektirdiği hız ölçülenin headroom katını aşarsa hemen bir alt katmana inilir;
+    üst katmana çıkmak için hız hold_seconds boyunca yetmelidir (salınım olmasın diye).
+    """
+
+    def __init__(self, tiers: int, start: int = 1, headroom: float = 0.8, hold_seconds: float = 3.0,
+                 window_seconds: float = 2.0):
+        self.tiers = tiers
+        self.tier = min(start, tiers - 1)
+        self.headroom = headroom
+        self.hold_seconds = hold_seconds
+        self.window_seconds = window_seconds
+        self.throughput = None          # bayt/sn
+        self._samples = deque()         # (bitiş zamanı, bayt, süre)
+        self._bytes = 0
+        self._seconds = 0.0
+        self._ok_since = None
+        self.switches = 0
+
+    def sent(self, nbytes: int, seconds: float, now: float | None = None):
+        """Bir parçanın nbytes baytının seconds saniyede yazıldığını kaydeder."""
+        now = time.monotonic() if now is None else now
+        self._samples.append((now, nbytes, seconds))
+        self._bytes += nbytes
+        self._seconds += seconds
+        # Pencereden taşan örnekler atılır, ama tek örnek kalsa bile ölçüm korunur.
+        while len(self._samples) > 1 and now - self._samples[0][0] > self.window_seconds:
+            _, old_bytes, old_seconds = self._samples.popleft()
+            self._bytes -= old_bytes
+            self._seconds -= old_seconds
+        self.throughput = self._bytes / max(self._seconds, 1e-4)
+
+    def choose(self, need) -> int:
+        """need(i): i. katman için gereken bayt/sn (bilinmiyorsa None). Seçilen katmanı döndürür."""
+        if self.throughput is None:
+            return self.tier
+        budget = self.throughput * self.headroom
+        current = need(self.tier)
+        if current is not None and current > budget and self.tier < self.tiers - 1:
+            self.tier += 1
+            self.switches += 1
+            self._ok_since = None
+            return self.tier
+        if self.tier > 0:
+            better = need(self.tier - 1)
+            # Üst katmanın boyutu henüz bilinmiyorsa mevcut katmanın iki katı varsayılır.
+            if better is None and current is not None:
+                better = current * 2
+            now = time.monotonic()
+            if better is not None and better <= budget:
+                if self._ok_since is None:
+                    self._ok_since = now
+                elif now - self._ok_since >= self.hold_seconds:
+                    self.tier -= 1
+                    self.switches += 1
+                    self._ok_since = None
+            else:
+                self._ok_since = None
+        return self.tier
+
+
+class SharedJPEGEncoder:
+    """
+    Bir video akışı için ortak JPEG önbelleği.
+
+    Yakalama thread'i her yeni kareyi publish() ile bırakır; kare, onu isteyen ilk
+    istemci tarafından sadece bir kez kodlanır ve sıra numarasıyla birlikte
+    saklanır. Diğer istemciler aynı byte'ları kullanır. İstemciler yeni bir sıra
+    numarası oluşana kadar Condition üzerinde bekler, boşuna döngüye girmez.
+    İzleyen yoksa hiçbir kare kodlanmaz.
+
+    Her kare birkaç katmanda (çözünürlük + kalite, bkz. default_tiers) sunulabilir; bir
+    katman sadece o katmanda izleyici varken ve kare başına bir kez kodlanır. stream()
+    izleyicinin gönderim hızını ölçer (ClientRate) ve hızına uyan katmanı seçer; yavaş
+    izleyici her zaman en yeni kareyi alır, aradakileri atlar ve geride kalmaz.
+    """
+
+    def __init__(self, quality: int = 95, tiers=None):
+        self.quality = quality
+        self.tiers = tuple(tiers) if tiers else default_tiers(quality)
+        self._cond = threading.Condition()
+        self._frame = None
+        self._frame_seq = 0
+        self._frame_time = 0.0
+        self._parts = [(0, None)] * len(self.tiers)     # katman başına (seq, multipart parçası)
+        self._encoding = [False] * len(self.tiers)
+        self._resized = {}                              # (genişlik, yükseklik) -> (seq, küçültülmüş kare)
+        self._part_bytes = [None] * len(self.tiers)     # katman başına ortalama parça boyutu
+        self._tier_clients = [0] * len(self.tiers)
+        self.fps = 0.0
+        self.clients = 0
+        self.encoded = 0
+        self.served = 0
+        self.tier_encoded = [0] * len(self.tiers)
+
+    def tier_index(self, name: str) -> int | None:
+        for i, tier in enumerate(self.tiers):
+            if tier.name == name:
+                return i
+        return None
+
+    def publish(self, frame):
+        """Yeni ham kareyi bırakır. Kare artık kodlayıcıya aittir, çağıran değiştirmemelidir."""
+        now = time.monotonic()
+        with self._cond:
+            if self._frame_time:
+                interval = now - self._frame_time
+                if interval > 0:
+                    self.fps += 0.1 * (1.0 / interval - self.fps)
+            self._frame = frame
+            self._frame_seq += 1
+            self._frame_time = now
+            self._cond.notify_all()
+
+    def wait_for_clients(self, timeout: float | None = None) -> bool:
+        """En az bir izleyici bağlanana kadar bekler; zaman aşımında False."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self.clients > 0, timeout)
+
+    def wait_for_part(self, last_seq: int, timeout: float = 5.0, tier: int = 0):
+        """
+        last_seq'ten daha yeni bir kare için tier katmanının hazır multipart parçasını döndürür:
+        (seq, bytes). Zaman aşımında (last_seq, None) döner.
+
+        En yeni kare en fazla bir kez kodlanır ve parça last_seq'ten yeniyse hemen döndürülür;
+        kodlama sürerken yeni kare gelse bile onu kovalamak için tekrar kodlanmaz (kodlama kare
+        aralığından uzun sürdüğünde izleyici donmasın diye).
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._frame_seq > last_seq, timeout):
+                return last_seq, None
+            while self._parts[tier][0] < self._frame_seq:
+                if self._encoding[tier]:
+                    # Başka bir istemci bu katmanda kodluyor, sonucu bekle. Kodlayan istemci hemen
+                    # bir sonraki kareye başlayabileceği için parçanın yenilenmesi de yeterlidir.
+                    stale = self._parts[tier][0]
+                    if not self._cond.wait_for(
+                            lambda: not self._encoding[tier] or self._parts[tier][0] > stale, timeout):
+                        return last_seq, None
+                    if self._parts[tier][0] > last_seq:
+                        break
+                    continue
+                self._encoding[tier] = True
+                frame, seq = self._frame, self._frame_seq
+                self._cond.release()
+                try:
+                    part = self._encode(frame, seq, self.tiers[tier])
+                finally:
+                    self._cond.acquire()
+                    self._encoding[tier] = False
+                if part is not None:
+                    self._parts[tier] = (seq, part)
+                    self.encoded += 1
+                    self.tier_encoded[tier] += 1
+                    average = self._part_bytes[tier]
+                    self._part_bytes[tier] = len(part) if average is None else average + 0.2 * (len(part) - average)
+                self._cond.notify_all()
+                if part is None:
+                    return last_seq, None
+                break
+            self.served += 1
+            return self._parts[tier]
+
+    def _scaled(self, frame, seq: int, tier: Tier):
+        height, width = frame.shape[:2]
+        if tier.width is None or (tier.width >= width and tier.height >= height):
+            return frame
+        size = (tier.width, tier.height)
+        # Aynı çözünürlükteki kalite katmanları küçültülmüş kareyi paylaşır.
+        cached = self._resized.get(size)
+        if cached is not None and cached[0] == seq:
+            return cached[1]
+        small = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        self._resized[size] = (seq, small)
+        return small
+
+    def _encode(self, frame, seq: int, tier: Tier):
+        ok, encoded = cv2.imencode('.jpg', self._scaled(frame, seq, tier), [cv2.IMWRITE_JPEG_QUALITY, tier.quality])
+        if not ok:
+            return None
+        jpeg = encoded.tobytes()
+        return (b'--' + MJPEG_BOUNDARY + b'\r\n'
+                b'Content-Type: image/jpeg\r\n'
+                b'Content-Length: ' + str(len(jpeg)).encode() + b'\r\n\r\n' + jpeg + b'\r\n')
+
+    def _need(self, tier: int):
+        """tier katmanını akışın kare hızında göndermek için gereken bayt/sn; boyut bilinmiyorsa None."""
+        size = self._part_bytes[tier]
+        return None if size is None else size * max(self.fps, 1.0)
+
+    def stream(self, timeout: float = 5.0, tier: str | None = None):
+        """
+        Flask Response için MJPEG üreteci. Her istemci sadece yeni kareleri alır.
+        tier verilirse o katman sabit kullanılır, verilmezse katman gönderim hızına göre seçilir.
+        """
+        fixed = self.tier_index(tier) if tier is not None else None
+        rate = ClientRate(len(self.tiers))
+        current = fixed if fixed is not None else rate.tier
+        seq = 0
+        with self._cond:
+            self.clients += 1
+            self._tier_clients[current] += 1
+            self._cond.notify_all()
+        try:
+            while True:
+                seq, part = self.wait_for_part(seq, timeout, current)
+                if part is None:
+                    continue
+                started = time.perf_counter()
+                yield part
+                rate.sent(len(part), time.perf_counter() - started)
+                if fixed is None:
+                    chosen = rate.choose(self._need)
+                    if chosen != current:
+                        with self._cond:
+                            self._tier_clients[current] -= 1
+                            self._tier_clients[chosen] += 1
+                        current = chosen
+        finally:
+            with self._cond:
+                self.clients -= 1
+                self._tier_clients[current] -= 1
+
+    def stats(self) -> dict:
+        return {
+            'clients': self.clients,
+            'frames': self._frame_seq,
+            'encoded': self.encoded,
+            'served': self.served,
+            'fps': self.fps,
+            'tiers': {
+                tier.name: {
+                    'clients': self._tier_clients[i],
+                    'encoded': self.tier_encoded[i],
+                    'part_bytes': self._part_bytes[i],
+                } for i, tier in enumerate(self.tiers)
+            },
+        }
+
+
+def relay_bus(bus, encoder: SharedJPEGEncoder, idle_timeout: float = 1.0):
+    """
+    FrameBus karelerini kodlayıcıya aktarır (thread içinde, sonsuza kadar çalışır).
+
+    Kare kopyalanmaz: veri yolunun yayınladığı salt okunur dizinin referansı kodlayıcıya
+    geçer. Sadece izleyici varken abone olunur; izleyici yokken veri yolunda kare bekleyen
+    olmadığından çözücü sadece grab() yapar, renk dönüşümü ve kodlama yapılmaz.
+    """
+    while True:
+        if not encoder.wait_for_clients(idle_timeout):
+            continue
+        with bus.subscribe("mjpeg") as sub:
+            while encoder.clients:
+                frame = sub.next(idle_timeout)
+                if frame is not None:
+                    encoder.publish(frame.image)
@@ -0,0 +1,195 @@
+# multipart_parser.py
+
+import json
+from typing import NamedTuple
+
+# Kamera Content-Type başlığında boundary göndermezse kullanılan varsayılan değer.
+DEFAULT_BOUNDARY = b'boundary'
+
+# Sınırı bulunamayan bir parçanın tamponu sonsuza kadar büyütmesini engeller.
+MAX_PART_SIZE = 8 * 1024 * 1024
+
+_HEADER_END = b'\r\n\r\n'
+
+# Ayrıştırıcı durumları
+_SEEK_BOUNDARY = 0
+_HEADERS = 1
+_BODY = 2
+
+
+class MultipartPart(NamedTuple):
+    headers: dict
+    body: bytes
+
+    @property
+    def content_type(self) -> str:
+        return self.headers.get('content-type', '')
+
+    @property
+    def is_json(self) -> bool:
+        return 'json' in self.content_type
+
+    def json(self):
+        return json.loads(self.body)
+
+
+def parse_boundary(content_type: str | None, default: bytes = DEFAULT_BOUNDARY) -> bytes:
+    """
+    'multipart/mixed; boundary=boundary' gibi bir Content-Type değerinden boundary'yi çıkarır.
+    Başlık yoksa veya boundary parametresi bulunamazsa varsayılanı döndürür.
+    """
+    if not content_type:
+        return default
+    for param in content_type.split(';')[1:]:
+        name, _, value = param.strip().partition('=')
+        if name.strip().lower() == 'boundary' and value:
+            return value.strip().strip('"').encode('latin-1')
+    return default
+
+
+def _parse_headers(raw: bytes) -> dict:
+    headers = {}
+    for line in raw.split(b'\r\n'):
+        name, sep, value = line.partition(b':')
+        if sep:
+            headers[name.strip().decode('latin-1').lower()] = value.strip().decode('latin-1')
+    return headers
+
+
+class MultipartStreamParser:
+    """
+    ISAPI'nin multipart/mixed akışları için artımlı (incremental) ayrıştırıcı.
+
+    Gelen parçalar tek bir bytearray'e eklenir ve bir tarama ofseti tutulur; böylece
+    her chunk'ta tamponun tamamı kopyalanmaz ve daha önce taranmış byte'lar tekrar
+    taranmaz. Parça başlığında Content-Length varsa gövde, boundary aranmadan
+    doğrudan uzunluk ile kesilir.
+    """
+
+    def __init__(self, boundary: bytes = DEFAULT_BOUNDARY, max_part_size: int = MAX_PART_SIZE):
+        if isinstance(boundary, str):
+            boundary = boundary.encode('latin-1')
+        self.delimiter = b'--' + boundary
+        self.max_part_size = max_part_size
+        self._buf = bytearray()
+        self._pos = 0      # Henüz tüketilmemiş ilk byte
+        self._scan = 0     # Aramaya devam edilecek ofset
+        self._state = _SEEK_BOUNDARY
+        self._headers = {}
+        self._body_start = 0
+        self._body_end = -1
+        self.parts_parsed = 0
+        self.bytes_dropped = 0
+
+    @classmethod
+    def from_content_type(cls, content_type: str | None, **kwargs):
+        return cls(parse_boundary(content_type), **kwargs)
+
+    @classmethod
+    def from_response(cls, response, **kwargs):
+        """requests/httpx yanıtının Content-Type başlığından boundary'yi okuyarak ayrıştırıcı oluşturur."""
+        return cls.from_content_type(response.headers.get('Content-Type'), **kwargs)
+
+    def reset(self):
+        self._buf.clear()
+        self._pos = self._scan = 0
+        self._state = _SEEK_BOUNDARY
+        self._headers = {}
+        self._body_end = -1
+
+    def feed(self, chunk) -> list[MultipartPart]:
+        """Yeni gelen veriyi ekler ve tamamlanan tüm parçaları döndürür."""
+        if chunk:
+            self._buf += chunk
+        parts = []
+        while True:
+            part = self._next_part()
+            if part is None:
+                break
+            parts.append(part)
+        self._compact()
+        return parts
+
+    def _next_part(self) -> MultipartPart | None:
+        buf = self._buf
+        if self._state == _SEEK_BOUNDARY:
+            idx = buf.find(self.delimiter, self._scan)
+            if idx == -1:
+                # Sınırın bir kısmı tamponun sonunda olabilir, sadece o kadarını tekrar tara.
+                # Öncesindeki byte'lar parça dışı (preamble) olduğundan atılabilir.
+                self._pos = self._scan = max(self._pos, len(buf) - len(self.delimiter) + 1)
+                return None
+            line_end = buf.find(b'\n', idx + len(self.delimiter))
+            if line_end == -1:
+                self._scan = idx
+                return None
+            self._pos = self._scan = line_end + 1
+            self._state = _HEADERS
+
+        if self._state == _HEADERS:
+            idx = buf.find(_HEADER_END, self._scan)
+            if idx == -1:
+                self._scan = max(self._pos, len(buf) - len(_HEADER_END) + 1)
+                return None
+            self._headers = _parse_headers(bytes(buf[self._pos:idx]))
+            self._body_start = self._pos = self._scan = idx + len(_HEADER_END)
+            length = self._headers.get('content-length', '')
+            self._body_end = self._body_start + int(length) if length.isdigit() else -1
+            self._state = _BODY
+
+        if self._body_end != -1:
+            if len(buf) < self._body_end:
+                return None
+            end = next_pos = self._body_end
+        else:
+            idx = buf.find(self.delimiter, self._scan)
+            if idx == -1:
+                self._scan = max(self._body_start, len(buf) - len(self.delimiter) + 1)
+                return None
+            end = next_pos = idx
+            if buf[end - 2:end] == b'\r\n':
+                end -= 2
+
+        with memoryview(buf) as view:
+            body = bytes(view[self._body_start:end])
+        part = MultipartPart(self._headers, body)
+        self._pos = self._scan = next_pos
+        self._state = _SEEK_BOUNDARY
+        self.parts_parsed += 1
+        return part
+
+    def _compact(self):
+        """Tüketilmiş byte'ları tamponun başından atar (CPython'da amortize O(1))."""
+        if self._pos == 0:
+            if len(self._buf) > self.max_part_size:
+                # Sınır bulunamıyor, akış bozuk; belleği korumak için tamponu boşalt.
+                self.bytes_dropped += len(self._buf)
+                self.reset()
+            return
+        offset = self._pos
+        del self._buf[:offset]
+        self._pos = 0
+        self._scan -= offset
+        self._body_start -= offset
+        if self._body_end != -1:
+            self._body_end -= offset
+
+
+def iter_json_payloads(parser: MultipartStreamParser, chunks):
+    """Chunk akışından application/json parçalarını çözülmüş sözlükler olarak üretir."""
+    for chunk in chunks:
+        for part in parser.feed(chunk):
+            if not part.is_json:
+                continue
+            try:
+                yield part.json()
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                # Bazı firmware'ler gövdeye fazladan byte ekliyor; eski davranıştaki gibi
+                # ilk '{' ile son '}' arasını deneyelim.
+                start, end = part.body.find(b'{'), part.body.rfind(b'}')
+                if start == -1 or end == -1:
+                    continue
+                try:
+                    yield json.loads(part.body[start:end + 1])
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    pass
@@ -0,0 +1,195 @@
+# onvif_init.py
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+from onvif import ONVIFCamera
+from zeep.cache import SqliteCache
+from zeep.transports import Transport
+
+# Önbellek dosyaları: profil/limit bilgileri (JSON) ve zeep'in uzaktan yüklediği şemalar (SQLite).
+CACHE_DIR = os.environ.get('ONVIF_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'termal_kamera'))
+PROFILE_CACHE_FILE = 'onvif_profiles.json'
+SCHEMA_CACHE_FILE = 'zeep_schemas.db'
+
+# Önbellekteki profil bilgisi bu süreden eskiyse kameradan yeniden sorgulanır.
+PROFILE_CACHE_MAX_AGE = 24 * 3600
+
+DEFAULT_PTZ_LIMITS = {'pan_min': 0, 'pan_max': 360, 'tilt_min': -90, 'tilt_max': 90}
+
+
+class OnvifPTZ(NamedTuple):
+    """Kullanıma hazır bir kameranın ONVIF servisleri ve başlangıç ölçümü."""
+    camera: ONVIFCamera
+    ptz: object
+    token: str
+    limits: dict
+    elapsed: float
+    warm: bool
+
+    def describe(self) -> str:
+        start = "sıcak" if self.warm else "soğuk"
+        return (f"{self.elapsed:.2f} sn ({start} başlangıç), PTZ Limitleri: "
+                f"Pan [{self.limits['pan_min']:.2f}, {self.limits['pan_max']:.2f}], "
+                f"Tilt [{self.limits['tilt_min']:.2f}, {self.limits['tilt_max']:.2f}]")
+
+
+class ProfileCache:
+    """
+    Kamera başına profil token'ı ve PTZ limitlerini diskte saklar.
+
+    Sıcak başlangıçta GetProfiles ve GetConfigurationOptions SOAP çağrıları atlanır;
+    kayıt max_age'den eskiyse veya invalidate() çağrıldıysa tekrar sorgulanır.
+    """
+
+    def __init__(self, path: str | None = None, max_age: float = PROFILE_CACHE_MAX_AGE):
+        self.path = path or os.path.join(CACHE_DIR, PROFILE_CACHE_FILE)
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._entries = None
+
+    def _load(self) -> dict:
+        if self._entries is None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._entries, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def get(self, key: str) -> dict | None:
+        with self._lock:
+            entry = self._load().get(key)
+        if entry is None or time.time() - entry.get('saved_at', 0) > self.max_age:
+            return None
+        return entry
+
+    def put(self, key: str, token: str, limits: dict):
+        with self._lock:
+            self._load()[key] = {'token': token, 'limits': limits, 'saved_at': time.time()}
+            try:
+                self._save()
+            except OSError as e:
+                print(f"ONVIF profil önbelleği yazılamadı: {e}")
+
+    def invalidate(self, key: str):
+        with self._lock:
+            if self._load().pop(key, None) is not None:
+                try:
+                    self._save()
+                except OSError:
+                    pass
+
+
+_default_cache = None
+_transport = None
+_shared_lock = threading.Lock()
+
+
+def default_profile_cache() -> ProfileCache:
+    global _default_cache
+    with _shared_lock:
+        if _default_cache is None:
+            _default_cache = ProfileCache()
+        return _default_cache
+
+
+def shared_transport() -> Transport:
+    """Tüm kameraların paylaştığı zeep transport'u; uzaktan içe aktarılan şemalar diskte önbelleklenir."""
+    global _transport
+    with _shared_lock:
+        if _transport is None:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            cache = SqliteCache(path=os.path.join(CACHE_DIR, SCHEMA_CACHE_FILE), timeout=30 * 24 * 3600)
+            _transport = Transport(cache=cache, timeout=5, operation_timeout=5)
+        return _transport
+
+
+def _query_profile(camera: ONVIFCamera, ptz):
+    profile = camera.create_media_service().GetProfiles()[0]
+    limits = dict(DEFAULT_PTZ_LIMITS)
+    try:
+        options = ptz.GetConfigurationOptions({'ConfigurationToken': profile.PTZConfiguration.token})
+        if options.Spaces and options.Spaces.AbsolutePanTiltPositionSpace:
+            space = options.Spaces.AbsolutePanTiltPositionSpace[0]
+            limits.update({'pan_min': space.XRange.Min, 'pan_max': space.XRange.Max,
+                           'tilt_min': space.YRange.Min, 'tilt_max': space.YRange.Max})
+    except Exception as e:
+        print(f"PTZ limitleri alınamadı: {e}. Varsayılan limitler kullanılacak.")
+    return profile.token, limits
+
+
+def connect_ptz(host, port, user, password, cache: ProfileCache | None = None, refresh: bool = False) -> OnvifPTZ:
+    """
+    Kameraya ONVIF ile bağlanır ve PTZ servisini, profil token'ını ve limitleri döndürür.
+
+    Profil bilgisi önbellekte varsa (sıcak başlangıç) yalnızca ONVIFCamera'nın kendi
+    GetCapabilities çağrısı yapılır; yoksa (soğuk başlangıç) profil ve limitler
+    kameradan sorgulanıp önbelleğe yazılır.
+    """
+    cache = cache or default_profile_cache()
+    key = f"{host}:{port}"
+    start = time.perf_counter()
+    camera = ONVIFCamera(host, port, user, password, transport=shared_transport())
+    ptz = camera.create_ptz_service()
+    entry = None if refresh else cache.get(key)
+    if entry is not None:
+        token, limits, warm = entry['token'], entry['limits'], True
+    else:
+        token, limits = _query_profile(camera, ptz)
+        cache.put(key, token, limits)
+        warm = False
+    return OnvifPTZ(camera, ptz, token, limits, time.perf_counter() - start, warm)
+
+
+class OnvifInitializer:
+    """
+    Kameraların ONVIF bağlantılarını arka planda paralel kurar.
+
+    Her kamera hazır olduğunda on_ready(key, OnvifPTZ), hata olursa on_error(key, exc)
+    çalışan thread'den çağrılır; arayüz veya API beklemeden açılabilir.
+
+        init = OnvifInitializer()
+        init.submit(1, ip, 80, user, password, on_ready=..., on_error=...)
+    """
+
+    def __init__(self, max_workers: int = 8, cache: ProfileCache | None = None):
+        self.cache = cache or default_profile_cache()
+        self.timings = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="OnvifInit")
+
+    def submit(self, key, host, port, user, password, on_ready=None, on_error=None):
+        return self._executor.submit(self._connect, key, host, port, user, password, on_ready, on_error)
+
+    def _connect(self, key, host, port, user, password, on_ready, on_error):
+        try:
+            result = connect_ptz(host, port, user, password, cache=self.cache)
+        except Exception as e:
+            print(f"Kamera {key}: ONVIF bağlantı hatası: {e}")
+            if on_error is not None:
+                on_error(key, e)
+            return None
+        self.timings[key] = (result.elapsed, result.warm)
+        print(f"Kamera {key}: ONVIF hazır, {result.describe()}")
+        if on_ready is not None:
+            on_ready(key, result)
+        return result
+
+    def summary(self) -> str:
+        lines = [f"Kamera {key}: {elapsed:.2f} sn ({'sıcak' if warm else 'soğuk'})"
+                 for key, (elapsed, warm) in self.timings.items()]
+        return "\n".join(lines)
+
+    def shutdown(self, wait: bool = False):
+        self._executor.shutdown(wait=wait)
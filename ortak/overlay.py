@@ -0,0 +1,153 @@
+# overlay.py
+
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+import cv2
+import numpy as np
+
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+
+
+class Marker(NamedTuple):
+    """Her karede yeri değişebilen işaret (sıcak/soğuk nokta). Koordinatlar 0..1, renk RGB."""
+    x: float
+    y: float
+    color: tuple
+    label: str = ''
+    label_offset: tuple = (15, -15)    # etiketin sol alt köşesi, işarete göre piksel
+    size: int = 20
+    thickness: int = 2
+    font_scale: float = 0.6
+
+
+def grid_lines(rows: int, cols: int) -> list:
+    """rows x cols ızgaranın iç çizgileri; açık çoklu çizgi olarak set_layer'a verilir."""
+    lines = [((0.0, r / rows), (1.0, r / rows)) for r in range(1, rows)]
+    lines += [((c / cols, 0.0), (c / cols, 1.0)) for c in range(1, cols)]
+    return lines
+
+
+class OverlayCompositor:
+    """
+    Ekran çözünürlüğünde bindirme: DisplayScaler'ın döndürdüğü RGB kareye çizer.
+
+    Eski yol işaretleri ve ROI çokgenini tam çözünürlüklü kareye her karede çiziyordu;
+    maliyet kaynak çözünürlüğüyle büyüyordu. Burada:
+      - Sabit katmanlar (kural çokgenleri, ROI, ızgara) girdileri değişince bir kez
+        bir renk tuvaline ve maskeye rasterleştirilir; her karede cv2.copyTo ile basılır.
+      - Dinamik işaretler (artı + etiket) küçük bir alfa karosu olarak önbelleklenir ve
+        cv2.blendLinear ile konumuna karıştırılır; etiket metni değişmedikçe yeniden çizilmez.
+
+        overlay = OverlayCompositor()
+        overlay.set_layer('roi', [roi_points], (0, 255, 0), scale=1000)   # değişmezse maliyetsiz
+        rgb = scaler.scale(frame)
+        overlay.render(rgb, [Marker(x, y, (255, 0, 0), "MAKS: 81.2 C")])
+    """
+
+    def __init__(self, sprite_cache: int = 128):
+        self._layers = OrderedDict()
+        self._dirty = True
+        self._size = None
+        self._canvas = None
+        self._mask = None
+        self._empty = True
+        self._sprites = OrderedDict()
+        self.sprite_cache = sprite_cache
+        self.rasterized = 0
+        self._total_ms = 0.0
+        self.frames = 0
+
+    # --- Sabit katmanlar ---
+    def set_layer(self, name: str, polylines, color: tuple, thickness: int = 2, closed: bool = True,
+                  scale: float = 1.0):
+        """
+        Bir sabit katmanı tanımlar veya günceller. polylines, nokta listelerinin listesidir;
+        noktalar scale'e bölünerek 0..1'e çevrilir (ör. kalibrasyonun 0..1000 ölçeği için 1000).
+        Girdiler öncekiyle aynıysa hiçbir şey yapılmaz.
+        """
+        layer = (tuple(tuple(tuple(p) for p in line) for line in polylines), tuple(color), thickness, closed, scale)
+        if self._layers.get(name) != layer:
+            self._layers[name] = layer
+            self._dirty = True
+
+    def remove_layer(self, name: str):
+        if self._layers.pop(name, None) is not None:
+            self._dirty = True
+
+    def _rasterize(self, height: int, width: int):
+        canvas = np.zeros((height, width, 3), np.uint8)
+        mask = np.zeros((height, width), np.uint8)
+        for lines, color, thickness, closed, scale in self._layers.values():
+            pts = [np.array([(x / scale * width, y / scale * height) for x, y in line], np.int32).reshape(-1, 1, 2)
+                   for line in lines if line]
+            if pts:
+                cv2.polylines(canvas, pts, closed, color, thickness)
+                cv2.polylines(mask, pts, closed, 255, thickness)
+        self._canvas, self._mask, self._empty = canvas, mask, not mask.any()
+        self._size = (height, width)
+        self._dirty = False
+        self.rasterized += 1
+
+    # --- Dinamik işaretler ---
+    def _sprite(self, marker: Marker):
+        key = (marker.color, marker.label, marker.label_offset, marker.size, marker.thickness, marker.font_scale)
+        sprite = self._sprites.get(key)
+        if sprite is not None:
+            self._sprites.move_to_end(key)
+            return sprite
+        half = marker.size // 2 + marker.thickness
+        left, top, right, bottom = -half, -half, half, half
+        if marker.label:
+            (tw, th), baseline = cv2.getTextSize(marker.label, FONT, marker.font_scale, marker.thickness)
+            ox, oy = marker.label_offset
+            left, top = min(left, ox), min(top, oy - th - marker.thickness)
+            right, bottom = max(right, ox + tw), max(bottom, oy + baseline + marker.thickness)
+        alpha = np.zeros((bottom - top + 1, right - left + 1), np.uint8)
+        anchor = (-left, -top)
+        cv2.drawMarker(alpha, anchor, 255, cv2.MARKER_CROSS, marker.size, marker.thickness, cv2.LINE_AA)
+        if marker.label:
+            cv2.putText(alpha, marker.label, (anchor[0] + ox, anchor[1] + oy), FONT, marker.font_scale, 255,
+                        marker.thickness, cv2.LINE_AA)
+        weight = alpha.astype(np.float32) / 255.0
+        color = np.empty(alpha.shape + (3,), np.uint8)
+        color[:] = marker.color
+        sprite = (color, weight, 1.0 - weight, left, top)
+        self._sprites[key] = sprite
+        if len(self._sprites) > self.sprite_cache:
+            self._sprites.popitem(last=False)
+        return sprite
+
+    def _blend(self, frame: np.ndarray, marker: Marker):
+        color, weight, inverse, left, top = self._sprite(marker)
+        h, w = frame.shape[:2]
+        x0, y0 = int(marker.x * w) + left, int(marker.y * h) + top
+        x1, y1 = x0 + weight.shape[1], y0 + weight.shape[0]
+        cx0, cy0, cx1, cy1 = max(x0, 0), max(y0, 0), min(x1, w), min(y1, h)
+        if cx0 >= cx1 or cy0 >= cy1:
+            return
+        sy, sx = slice(cy0 - y0, cy1 - y0), slice(cx0 - x0, cx1 - x0)
+        region = frame[cy0:cy1, cx0:cx1]
+        cv2.blendLinear(region, color[sy, sx], inverse[sy, sx], weight[sy, sx], dst=region)
+
+    # --- Kare ---
+    def render(self, frame: np.ndarray, markers=()) -> np.ndarray:
+        """Katmanları ve işaretleri RGB kareye yerinde çizer ve kareyi döndürür."""
+        start = time.perf_counter()
+        if self._dirty or frame.shape[:2] != self._size:
+            self._rasterize(*frame.shape[:2])
+        if not self._empty:
+            cv2.copyTo(self._canvas, self._mask, frame)
+        for marker in markers:
+            self._blend(frame, marker)
+        self._total_ms += (time.perf_counter() - start) * 1000.0
+        self.frames += 1
+        return frame
+
+    def stats(self, reset: bool = True) -> dict:
+        stats = {'overlay_ms': self._total_ms / (self.frames or 1), 'overlay_rasterized': self.rasterized}
+        if reset:
+            self._total_ms = 0.0
+            self.frames = 0
+        return stats
@@ -0,0 +1,258 @@
+# pixel_data.py
+
+import json
+import threading
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+from ortak.isapi_client import ISAPIClient
+from ortak.multipart_parser import MultipartStreamParser
+
+PIXEL_DATA_PATH = '/ISAPI/Thermal/channels/2/thermometry/pixelToPixelData?format=json'
+# Bazı modellerde tam radyometrik veri JPEG ile birlikte bu uçtan gelir.
+JPEG_WITH_APPEND_DATA_PATH = '/ISAPI/Thermal/channels/2/thermometry/jpegPicWithAppendData?format=json'
+
+# Meta veri gelmezse gövde boyutundan çözünürlük tahmini için bilinen sensör çözünürlükleri.
+KNOWN_RESOLUTIONS = ((640, 512), (384, 288), (256, 192), (160, 120), (1280, 1024))
+
+# Meta veri ve parça başlıklarında aranan alan adları (küçük harfe çevrilerek karşılaştırılır).
+_WIDTH_KEYS = ('width', 'jpegpicwidth', 'p2pwidth', 'x-width', 'x-thermal-width')
+_HEIGHT_KEYS = ('height', 'jpegpicheight', 'p2pheight', 'x-height', 'x-thermal-height')
+_DATA_LENGTH_KEYS = ('temperaturedatalength', 'x-temperature-data-length')
+_SCALE_KEYS = ('scale', 'x-scale')
+_OFFSET_KEYS = ('offset', 'x-offset')
+
+
+class TemperatureFrame(NamedTuple):
+    """Tek bir tam radyometrik kare. matrix: (yükseklik, genişlik) float32, °C; salt okunur olabilir."""
+    matrix: np.ndarray
+    timestamp: float
+    jpeg: bytes | None
+    meta: dict
+
+    @property
+    def width(self) -> int:
+        return self.matrix.shape[1]
+
+    @property
+    def height(self) -> int:
+        return self.matrix.shape[0]
+
+
+def _flatten(meta, out=None) -> dict:
+    """İç içe JSON meta verisini küçük harfli anahtarlarla tek seviyeye indirir (ilk bulunan kazanır)."""
+    out = {} if out is None else out
+    if isinstance(meta, dict):
+        for key, value in meta.items():
+            if isinstance(value, (dict, list)):
+                _flatten(value, out)
+            else:
+                out.setdefault(str(key).lower(), value)
+    elif isinstance(meta, list):
+        for item in meta:
+            _flatten(item, out)
+    return out
+
+
+def _lookup(fields: dict, keys, default=None):
+    for key in keys:
+        value = fields.get(key)
+        if value not in (None, ''):
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                continue
+    return default
+
+
+def payload_layout(meta: dict | None, headers: dict | None, payload_size: int) -> dict:
+    """
+    Sıcaklık verisinin biçimini meta veriden ve parça başlıklarından çıkarır:
+    genişlik, yükseklik, eleman boyutu (2 veya 4 byte), ölçek ve ofset.
+    Çözünürlük bildirilmemişse gövde boyutundan bilinen sensör çözünürlükleri denenir.
+    """
+    fields = _flatten(meta or {})
+    fields.update({k.lower(): v for k, v in (headers or {}).items()})
+    width = _lookup(fields, _WIDTH_KEYS)
+    height = _lookup(fields, _HEIGHT_KEYS)
+    data_length = _lookup(fields, _DATA_LENGTH_KEYS)
+    if width and height:
+        width, height = int(width), int(height)
+        if not data_length:
+            data_length = payload_size // (width * height)
+    else:
+        for w, h in KNOWN_RESOLUTIONS:
+            for size in ((int(data_length),) if data_length else (4, 2)):
+                if w * h * size == payload_size:
+                    width, height, data_length = w, h, size
+                    break
+            if width:
+                break
+        else:
+            raise ValueError(f"Sıcaklık verisinin çözünürlüğü belirlenemedi ({payload_size} byte)")
+    data_length = int(data_length)
+    if data_length not in (2, 4):
+        raise ValueError(f"Desteklenmeyen sıcaklık eleman boyutu: {data_length}")
+    # 4 byte: doğrudan °C float32. 2 byte: ham değer / ölçek + ofset (varsayılan °C * 100).
+    default_scale = 1.0 if data_length == 4 else 100.0
+    return {
+        'width': width,
+        'height': height,
+        'data_length': data_length,
+        'scale': _lookup(fields, _SCALE_KEYS, default_scale) or default_scale,
+        'offset': _lookup(fields, _OFFSET_KEYS, 0.0),
+    }
+
+
+def decode_temperature_payload(payload, layout: dict) -> np.ndarray:
+    """
+    Ham sıcaklık verisini (yükseklik, genişlik) float32 °C matrisine çevirir.
+
+    4 byte'lık veride np.frombuffer gövdenin üzerine bir görünüm (view) oluşturur,
+    hiç kopya yapılmaz; ölçek/ofset gerekiyorsa tek bir vektörel işlem yapılır.
+    """
+    width, height = layout['width'], layout['height']
+    count = width * height
+    if layout['data_length'] == 4:
+        matrix = np.frombuffer(payload, dtype='<f4', count=count)
+    else:
+        matrix = np.frombuffer(payload, dtype='<u2', count=count).astype(np.float32)
+    scale, offset = layout['scale'], layout['offset']
+    if scale != 1.0 or offset != 0.0:
+        matrix = matrix / np.float32(scale) + np.float32(offset)
+    return matrix.reshape(height, width)
+
+
+def _is_binary(part) -> bool:
+    content_type = part.content_type
+    return not part.is_json and not content_type.startswith(('image/', 'text/'))
+
+
+def iter_temperature_frames(parser: MultipartStreamParser, chunks):
+    """
+    Chunk akışından TemperatureFrame üretir. JSON parçası meta veri, image/jpeg parçası
+    görüntü, ikili (octet-stream) parça sıcaklık verisi olarak kabul edilir.
+    """
+    meta, jpeg = {}, None
+    for chunk in chunks:
+        for part in parser.feed(chunk):
+            if part.is_json:
+                try:
+                    meta = part.json()
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    meta = {}
+            elif part.content_type.startswith('image/'):
+                jpeg = part.body
+            elif _is_binary(part):
+                try:
+                    layout = payload_layout(meta, part.headers, len(part.body))
+                    matrix = decode_temperature_payload(part.body, layout)
+                except ValueError as e:
+                    print(f"Sıcaklık verisi çözülemedi: {e}")
+                    continue
+                yield TemperatureFrame(matrix, time.time(), jpeg, meta)
+                jpeg = None
+
+
+class PixelDataStream:
+    """
+    pixelToPixelData ucundan tam radyometrik sıcaklık matrislerini çeker.
+
+    Kamera multipart akış gönderirse bağlantı açık tutulur ve kareler geldikçe
+    yayınlanır; tek seferlik yanıt dönerse istek hemen tekrarlanır. Her iki durumda
+    da kareler kameranın kendi hızında, bekleme eklenmeden dinleyicilere iletilir.
+    """
+
+    def __init__(self, client: ISAPIClient, path: str = PIXEL_DATA_PATH, reconnect_delay: float = 5.0):
+        self.client = client
+        self.path = path
+        self.reconnect_delay = reconnect_delay
+        self.status = "Bağlanmadı"
+        self.frames = 0
+        self.fps = 0.0
+        self.last_frame: TemperatureFrame | None = None
+        self._listeners = []
+        self._status_listeners = []
+        self._running = False
+        self._thread = None
+        self._response = None
+
+    def add_listener(self, callback):
+        """Her yeni karede callback(frame: TemperatureFrame) akış thread'inden çağrılır."""
+        self._listeners.append(callback)
+
+    def add_status_listener(self, callback):
+        self._status_listeners.append(callback)
+        callback(self.status)
+
+    def set_status(self, status: str):
+        if status == self.status:
+            return
+        self.status = status
+        for callback in list(self._status_listeners):
+            callback(status)
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="PixelDataStream", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        response = self._response
+        if response is not None:
+            try:
+                response.close()
+            except Exception:
+                pass
+
+    def _publish(self, frame: TemperatureFrame, rate_window: list):
+        self.frames += 1
+        self.last_frame = frame
+        rate_window.append(frame.timestamp)
+        if len(rate_window) > 1 and rate_window[-1] - rate_window[0] >= 1.0:
+            self.fps = (len(rate_window) - 1) / (rate_window[-1] - rate_window[0])
+            del rate_window[:-1]
+        for callback in list(self._listeners):
+            try:
+                callback(frame)
+            except Exception as e:
+                print(f"Pixel veri dinleyici hatası: {e}")
+
+    def _run(self):
+        rate_window = []
+        while self._running:
+            try:
+                with self.client.get(self.path, stream=True, timeout=(5, 30)) as response:
+                    self._response = response
+                    if response.status_code != 200:
+                        self.set_status(f"Pixel Veri: Hata {response.status_code}")
+                        time.sleep(self.reconnect_delay)
+                        continue
+                    self.set_status("Pixel Veri: Alınıyor")
+                    content_type = response.headers.get('Content-Type', '')
+                    if 'multipart' in content_type:
+                        parser = MultipartStreamParser.from_content_type(content_type)
+                        for frame in iter_temperature_frames(parser, response.iter_content(chunk_size=65536)):
+                            self._publish(frame, rate_window)
+                            if not self._running:
+                                break
+                    else:
+                        # Sadece ikili veri: çözünürlük yanıt başlıklarından veya boyuttan çıkarılır.
+                        body = response.content
+                        layout = payload_layout(None, dict(response.headers), len(body))
+                        self._publish(TemperatureFrame(decode_temperature_payload(body, layout), time.time(), None, {}),
+                                      rate_window)
+            except Exception as e:
+                if not self._running:
+                    break
+                print(f"Pixel veri bağlantı hatası: {e}")
+                self.set_status("Pixel Veri: Bağlantı Hatası")
+                time.sleep(self.reconnect_delay)
+            finally:
+                self._response = None
+        self.set_status("Bağlanmadı")
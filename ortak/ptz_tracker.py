@@ -0,0 +1,175 @@
+# ptz_tracker.py
+
+import threading
+import time
+import xml.etree.ElementTree as ET
+from collections import deque
+from typing import NamedTuple
+
+from ortak.isapi_client import ISAPIClient
+
+ISAPI_NS = {'isapi': 'http://www.isapi.org/ver20/XMLSchema'}
+
+
+class PTZState(NamedTuple):
+    """Kameranın bir andaki PTZ konumu. timestamp yanıtın alındığı andır (time.time())."""
+    pan: float
+    tilt: float
+    zoom: float | None
+    timestamp: float
+    moving: bool
+
+    def as_dict(self) -> dict:
+        return {'pan_degrees': self.pan, 'tilt_degrees': self.tilt, 'zoom': self.zoom,
+                'timestamp': self.timestamp, 'moving': self.moving}
+
+
+def parse_ptz_status(content: bytes):
+    """PTZCtrl status XML'inden (pan, tilt, zoom) derece/kat cinsinden döndürür; eksikse None."""
+    root = ET.fromstring(content)
+    azimuth_node = root.find('.//isapi:azimuth', ISAPI_NS)
+    elevation_node = root.find('.//isapi:elevation', ISAPI_NS)
+    if azimuth_node is None or elevation_node is None:
+        return None
+    zoom_node = root.find('.//isapi:absoluteZoom', ISAPI_NS)
+    # Değerler kameradan 10 ile çarpılmış olarak gelir.
+    zoom = float(zoom_node.text) / 10.0 if zoom_node is not None else None
+    return float(azimuth_node.text) / 10.0, float(elevation_node.text) / 10.0, zoom
+
+
+class PTZTracker:
+    """
+    Olay güdümlü PTZ konum takibi.
+
+    Kamera hareketsizken durum yavaş bir nabızla (idle_interval) sorgulanır. Bir
+    hareket komutu bildirildiğinde (notify_move), tarama açıkken (set_scanning) veya
+    son sorguda konum değiştiyse hızlı (fast_interval) sorguya geçilir ve konum
+    settle_time boyunca sabit kalınca tekrar yavaşlanır. Her yeni durum zaman
+    damgasıyla birlikte dinleyicilere (GUI, olay servisi, kalibrasyon) iletilir.
+
+        tracker = PTZTracker(ISAPIClient.for_camera(ip, user, password))
+        tracker.add_listener(lambda state: print(state.pan, state.tilt))
+        tracker.start()
+        ...
+        ptz.AbsoluteMove(req); tracker.notify_move()
+    """
+
+    def __init__(self, client: ISAPIClient, channel: int = 1, fast_interval: float = 0.1,
+                 idle_interval: float = 2.0, settle_time: float = 1.0, history_size: int = 256):
+        self.client = client
+        self.path = f'/ISAPI/PTZCtrl/channels/{channel}/status'
+        self.fast_interval = fast_interval
+        self.idle_interval = idle_interval
+        self.settle_time = settle_time
+        self.state: PTZState | None = None
+        self.history = deque(maxlen=history_size)
+        self.polls = 0
+        self.errors = 0
+        self._listeners = []
+        self._fast_until = 0.0
+        self._scanning = False
+        self._wake = threading.Event()
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+
+    # --- Dinleyiciler ---
+    def add_listener(self, callback):
+        """Her yeni durumda callback(state: PTZState) tracker thread'inden çağrılır."""
+        self._listeners.append(callback)
+        if self.state is not None:
+            callback(self.state)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    # --- Hareket bildirimleri ---
+    def notify_move(self, duration: float = 0.0):
+        """Bir hareket komutu gönderildi; en az duration + settle_time boyunca hızlı sorgula."""
+        self._fast_until = max(self._fast_until, time.time() + duration + self.settle_time)
+        self._wake.set()
+
+    def set_scanning(self, scanning: bool):
+        """Sürekli hareket (tarama/dönme) açıkken hızlı sorgu kesintisiz sürer."""
+        self._scanning = scanning
+        if scanning:
+            self._wake.set()
+        else:
+            self.notify_move()
+
+    @property
+    def fast_mode(self) -> bool:
+        return self._scanning or time.time() < self._fast_until
+
+    # --- Durum sorgulama ---
+    def wait_for_update(self, after: float = 0.0, timeout: float | None = None) -> PTZState | None:
+        """Zaman damgası 'after'dan yeni bir durum gelene kadar bekler."""
+        with self._cond:
+            self._cond.wait_for(lambda: self.state is not None and self.state.timestamp > after, timeout)
+            return self.state
+
+    def state_at(self, timestamp: float) -> PTZState | None:
+        """Geçmişte verilen ana en yakın durumu döndürür (olay anı konumu için)."""
+        with self._cond:
+            if not self.history:
+                return None
+            return min(self.history, key=lambda s: abs(s.timestamp - timestamp))
+
+    def poll_once(self) -> PTZState | None:
+        self.polls += 1
+        response = self.client.get(self.path, timeout=min(1.0, self.idle_interval))
+        response.raise_for_status()
+        parsed = parse_ptz_status(response.content)
+        if parsed is None:
+            raise ValueError("PTZ XML yanıtında 'azimuth' veya 'elevation' bulunamadı")
+        now = time.time()
+        pan, tilt, zoom = parsed
+        previous = self.state
+        moved = previous is not None and (pan, tilt, zoom) != (previous.pan, previous.tilt, previous.zoom)
+        if moved:
+            # Komut bildirilmeden başlayan hareketler de (ör. başka istemci) hızlı sorguyu tetikler.
+            self._fast_until = max(self._fast_until, now + self.settle_time)
+        state = PTZState(pan, tilt, zoom, now, moved or self._scanning)
+        with self._cond:
+            self.state = state
+            self.history.append(state)
+            self._cond.notify_all()
+        if previous is None or moved or previous.moving != state.moving or now - previous.timestamp >= self.idle_interval:
+            for callback in list(self._listeners):
+                try:
+                    callback(state)
+                except Exception as e:
+                    print(f"PTZ dinleyici hatası: {e}")
+        return state
+
+    # --- Thread ---
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="PTZTracker", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        self._wake.set()
+
+    def _run(self):
+        error_streak = 0
+        while self._running:
+            try:
+                self.poll_once()
+                if error_streak:
+                    print("PTZ durumu tekrar alınıyor.")
+                error_streak = 0
+            except Exception as e:
+                self.errors += 1
+                error_streak += 1
+                if error_streak == 1:
+                    print(f"HATA: PTZ durumu alınamadı: {e}")
+            interval = self.fast_interval if self.fast_mode else self.idle_interval
+            if error_streak:
+                interval = max(interval, min(self.idle_interval, 0.5 * error_streak))
+            self._wake.wait(interval)
+            self._wake.clear()
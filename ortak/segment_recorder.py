@@ -0,0 +1,422 @@
+# segment_recorder.py
+
+import bisect
+import os
+import shutil
+import struct
+import subprocess
+import threading
+import time
+from array import array
+from datetime import datetime, timezone
+
+import numpy as np
+
+TS_PACKET = 188
+# PTS 33 bitlik 90 kHz sayaçtır (~26,5 saatte bir sıfırlanır).
+PTS_WRAP = 2 ** 33 / 90000.0
+SEGMENT_TIME_FORMAT = '%Y%m%dT%H%M%SZ'
+SEGMENT_SUFFIX = '.ts'
+INDEX_NAME = 'index.bin'
+# Anahtar kare kaydı: zaman (epoch sn), segment başlangıcı (epoch sn, dosya adı), segment içi bayt ofseti.
+INDEX_RECORD = struct.Struct('<dqQ')
+
+
+def segment_name(start: int) -> str:
+    return datetime.fromtimestamp(start, timezone.utc).strftime(SEGMENT_TIME_FORMAT) + SEGMENT_SUFFIX
+
+
+def segment_start(name: str) -> int | None:
+    """Segment dosya adındaki UTC başlangıç zamanı (ffmpeg -strftime ile yazılır); ad uymuyorsa None."""
+    try:
+        stamp = datetime.strptime(name[:-len(SEGMENT_SUFFIX)], SEGMENT_TIME_FORMAT)
+    except ValueError:
+        return None
+    return int(stamp.replace(tzinfo=timezone.utc).timestamp())
+
+
+def _pes_pts(packet: bytes) -> float | None:
+    """PES başlığı taşıyan TS paketinden PTS'i (saniye) okur."""
+    start = 4 + (1 + packet[4] if packet[3] & 0x20 else 0)
+    pes = packet[start:start + 14]
+    if len(pes) < 14 or pes[:3] != b'\x00\x00\x01' or not pes[7] & 0x80:
+        return None
+    p = pes[9:14]
+    pts = ((p[0] >> 1) & 0x07) << 30 | p[1] << 22 | (p[2] >> 1) << 15 | p[3] << 7 | p[4] >> 1
+    return pts / 90000.0
+
+
+def scan_keyframes(path: str) -> list:
+    """
+    MPEG-TS dosyasındaki anahtar kareleri (bayt ofseti, PTS sn) listesi olarak döndürür.
+
+    Paket başlıkları numpy ile toplu okunur; sadece anahtar kare paketlerinde PES başlığı
+    çözülür. Anahtar kare, yükü PES başlangıcı olan ve uyarlama alanında random_access
+    bayrağı taşıyan pakettir (kayıt sadece video içerir). Ofset olarak anahtar kareden önceki
+    son PAT paketi verilir; o noktadan okunan bayt dizisi tek başına oynatılabilir.
+    """
+    data = np.fromfile(path, np.uint8)
+    first = int(np.argmax(data[:TS_PACKET] == 0x47)) if data.size else 0
+    count = (data.size - first) // TS_PACKET
+    if count <= 0:
+        return []
+    packets = data[first:first + count * TS_PACKET].reshape(count, TS_PACKET)
+    valid = packets[:, 0] == 0x47
+    pid = (packets[:, 1].astype(np.int32) & 0x1F) << 8 | packets[:, 2]
+    payload_start = (packets[:, 1] & 0x40) != 0
+    random_access = ((packets[:, 3] & 0x20) != 0) & (packets[:, 4] > 0) & ((packets[:, 5] & 0x40) != 0)
+    keys = np.flatnonzero(valid & payload_start & random_access & (pid != 0))
+    pats = np.flatnonzero(valid & (pid == 0) & payload_start)
+    frames = []
+    for i in keys:
+        pts = _pes_pts(packets[i].tobytes())
+        if pts is None:
+            continue
+        j = int(np.searchsorted(pats, i)) - 1
+        packet = pats[j] if j >= 0 else i
+        frames.append((first + int(packet) * TS_PACKET, pts))
+    return frames
+
+
+class SegmentIndex:
+    """
+    Bir kanal klasöründeki segmentlerin zaman -> (segment, bayt ofseti) dizini.
+
+    Kayıtlar anahtar kare başına 24 bayttır (2 sn GOP ile günde ~1 MB) ve index.bin'e
+    eklenerek yazılır; bellekte üç paralel array tutulur, bir zamanın yeri ikili arama ile
+    O(log n)'de bulunur. Silinen segmentlerin kayıtları bellekte hemen düşer, dosya ise
+    eskimiş kayıtlar yarıyı geçince (veya açılışta) sıkıştırılır.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._times = array('d')
+        self._segments = array('q')
+        self._offsets = array('Q')
+        self.segments = {}          # segment başlangıcı -> boyut (bayt), zaman sırasıyla
+        self._stale = 0
+        self._lock = threading.RLock()
+        self._load()
+
+    @property
+    def index_path(self) -> str:
+        return os.path.join(self.directory, INDEX_NAME)
+
+    def path(self, start: int) -> str:
+        return os.path.join(self.directory, segment_name(start))
+
+    def _load(self):
+        files = {}
+        for name in os.listdir(self.directory):
+            start = segment_start(name) if name.endswith(SEGMENT_SUFFIX) else None
+            if start is not None:
+                files[start] = os.path.getsize(os.path.join(self.directory, name))
+        raw = b''
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'rb') as f:
+                raw = f.read()
+        # Yarım yazılmış son kayıt (çökme) atılır.
+        usable = len(raw) - len(raw) % INDEX_RECORD.size
+        kept = 0
+        for ts, start, offset in INDEX_RECORD.iter_unpack(raw[:usable]):
+            if start in files:
+                self._append(ts, start, offset)
+                self.segments[start] = files[start]
+                kept += 1
+        # Kota en eskiden siler; segments başlangıç zamanına göre sıralı tutulur.
+        self.segments = dict(sorted(self.segments.items()))
+        if kept * INDEX_RECORD.size != len(raw):
+            self._rewrite()
+
+    def _append(self, ts, start, offset):
+        self._times.append(ts)
+        self._segments.append(start)
+        self._offsets.append(offset)
+
+    def _rewrite(self):
+        tmp = self.index_path + '.tmp'
+        with open(tmp, 'wb') as f:
+            for record in zip(self._times, self._segments, self._offsets):
+                f.write(INDEX_RECORD.pack(*record))
+        os.replace(tmp, self.index_path)
+        self._stale = 0
+
+    def pending(self, include_newest: bool = False) -> list:
+        """Henüz dizinlenmemiş segment başlangıçları; en yenisi ffmpeg yazarken hariç tutulur."""
+        starts = sorted(s for s in (segment_start(n) for n in os.listdir(self.directory) if n.endswith(SEGMENT_SUFFIX))
+                        if s is not None)
+        if starts and not include_newest:
+            starts = starts[:-1]
+        with self._lock:
+            return [s for s in starts if s not in self.segments]
+
+    def add_segment(self, start: int) -> int:
+        """Tamamlanmış bir segmenti tarar ve anahtar karelerini dizine ekler; eklenen kayıt sayısı döner."""
+        path = self.path(start)
+        frames = scan_keyframes(path)
+        size = os.path.getsize(path)
+        with self._lock:
+            # Anahtar karesi olmayan (dizinde kaydı bulunmayan) eski segment açılışta tekrar
+            # taranır ve en yeni segmentten önce gelebilir.
+            late = bool(self.segments) and start < next(reversed(self.segments))
+            last = self._times[-1] if self._times and not late else float('-inf')
+            records = []
+            if frames:
+                first_pts = frames[0][1]
+                for offset, pts in frames:
+                    # Segment başlangıcı saniye çözünürlüklüdür; zamanlar monoton tutulur.
+                    last = max(last, start + (pts - first_pts) % PTS_WRAP)
+                    records.append((last, start, offset))
+            if late:
+                merged = sorted(list(zip(self._times, self._segments, self._offsets)) + records,
+                                key=lambda record: (record[1], record[0]))
+                self._times, self._segments, self._offsets = array('d'), array('q'), array('Q')
+                for record in merged:
+                    self._append(*record)
+                self.segments[start] = size
+                self.segments = dict(sorted(self.segments.items()))
+                self._rewrite()
+                return len(records)
+            with open(self.index_path, 'ab') as f:
+                f.write(b''.join(INDEX_RECORD.pack(*record) for record in records))
+            for record in records:
+                self._append(*record)
+            self.segments[start] = size
+        return len(records)
+
+    def delete_oldest(self) -> int:
+        """En eski segmenti ve kayıtlarını siler; boşalan bayt sayısını döndürür."""
+        with self._lock:
+            if not self.segments:
+                return 0
+            start = next(iter(self.segments))
+            size = self.segments.pop(start)
+            n = bisect.bisect_right(self._segments, start)
+            del self._times[:n], self._segments[:n], self._offsets[:n]
+            self._stale += n
+            if self._stale > len(self._times):
+                self._rewrite()
+        try:
+            os.remove(self.path(start))
+        except FileNotFoundError:
+            pass
+        return size
+
+    @property
+    def oldest(self) -> int | None:
+        with self._lock:
+            return next(iter(self.segments), None)
+
+    @property
+    def total_bytes(self) -> int:
+        with self._lock:
+            return sum(self.segments.values())
+
+    def locate(self, ts: float):
+        """ts anındaki (veya hemen öncesindeki) anahtar kare: (segment yolu, ofset, kare zamanı); yoksa None."""
+        with self._lock:
+            if not self._times:
+                return None
+            i = max(bisect.bisect_right(self._times, ts) - 1, 0)
+            return self.path(self._segments[i]), self._offsets[i], self._times[i]
+
+    def read(self, start: float, end: float, chunk: int = 1 << 20):
+        """
+        [start, end] aralığını kapsayan MPEG-TS baytlarını parça parça üretir. Okuma start'tan
+        önceki anahtar karede başlar, end'den sonraki ilk anahtar karede biter; yeniden kodlama yoktur.
+        """
+        with self._lock:
+            if not self._times:
+                return
+            i = max(bisect.bisect_right(self._times, start) - 1, 0)
+            j = bisect.bisect_right(self._times, end)
+            plan = []
+            segment, offset = self._segments[i], self._offsets[i]
+            for s in self.segments:
+                if s < segment:
+                    continue
+                if j < len(self._times) and s > self._segments[j]:
+                    break
+                stop = self._offsets[j] if j < len(self._times) and s == self._segments[j] else None
+                plan.append((self.path(s), offset if s == segment else 0, stop))
+        for path, begin, stop in plan:
+            try:
+                with open(path, 'rb') as f:
+                    f.seek(begin)
+                    remaining = None if stop is None else stop - begin
+                    while remaining is None or remaining > 0:
+                        data = f.read(chunk if remaining is None else min(chunk, remaining))
+                        if not data:
+                            break
+                        if remaining is not None:
+                            remaining -= len(data)
+                        yield data
+            except FileNotFoundError:
+                continue
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'segments': len(self.segments),
+                'bytes': sum(self.segments.values()),
+                'keyframes': len(self._times),
+                'first': self._times[0] if self._times else None,
+                'last': self._times[-1] if self._times else None,
+            }
+
+
+class SegmentRecorder:
+    """
+    Tek kanalı ffmpeg ile kod çözmeden kaydeder: RTSP paketleri -c copy ile sabit süreli
+    MPEG-TS segmentlerine aktarılır (-f segment, saat sınırlarına hizalı). Biten her segment
+    taranıp dizine eklenir. ffmpeg düşerse veya segment stall_seconds boyunca büyümezse
+    süreç yeniden başlatılır.
+    """
+
+    def __init__(self, rtsp_url, directory: str, name: str, segment_seconds: int = 60,
+                 stall_seconds: float = 30.0, on_segment=None, ffmpeg: str = 'ffmpeg'):
+        self.rtsp_url = rtsp_url
+        self.name = name
+        self.segment_seconds = segment_seconds
+        self.stall_seconds = stall_seconds
+        self.on_segment = on_segment
+        self.ffmpeg = ffmpeg
+        self.index = SegmentIndex(directory)
+        self.restarts = 0
+        self._running = False
+        self._thread = None
+        self._process = None
+
+    def command(self) -> list:
+        url = self.rtsp_url() if callable(self.rtsp_url) else self.rtsp_url
+        return [self.ffmpeg, '-hide_banner', '-loglevel', 'error', '-nostdin',
+                '-rtsp_transport', 'tcp', '-i', url,
+                '-map', '0:v:0', '-c', 'copy',
+                '-f', 'segment', '-segment_time', str(self.segment_seconds), '-segment_atclocktime', '1',
+                '-segment_format', 'mpegts', '-strftime', '1',
+                os.path.join(self.index.directory, SEGMENT_TIME_FORMAT + SEGMENT_SUFFIX)]
+
+    def start(self):
+        if not shutil.which(self.ffmpeg):
+            print(f"UYARI: ffmpeg bulunamadı, {self.name} sürekli kaydı yapılmayacak.")
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=f"Recorder-{self.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        self._running = False
+        process = self._process
+        if process is not None and process.poll() is None:
+            process.terminate()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def index_completed(self, include_newest: bool = False):
+        added = False
+        for start in self.index.pending(include_newest):
+            try:
+                self.index.add_segment(start)
+                added = True
+            except (OSError, ValueError) as e:
+                print(f"HATA: {self.name} segmenti dizinlenemedi ({segment_name(start)}): {e}")
+        if added and self.on_segment is not None:
+            self.on_segment()
+
+    def _newest_size(self) -> int:
+        names = [n for n in os.listdir(self.index.directory) if n.endswith(SEGMENT_SUFFIX)]
+        return os.path.getsize(os.path.join(self.index.directory, max(names))) if names else 0
+
+    def _run(self):
+        # Önceki çalışmadan kalan (yarım dahil) segmentler ffmpeg başlamadan dizinlenir.
+        self.index_completed(include_newest=True)
+        env = dict(os.environ, TZ='UTC')
+        while self._running:
+            self._process = subprocess.Popen(self.command(), env=env, stdin=subprocess.DEVNULL,
+                                             stdout=subprocess.DEVNULL)
+            print(f"{self.name} sürekli kaydı başladı ({self.segment_seconds} sn segment).")
+            last_size, last_growth = -1, time.monotonic()
+            while self._running and self._process.poll() is None:
+                time.sleep(1.0)
+                self.index_completed()
+                size = self._newest_size()
+                if size != last_size:
+                    last_size, last_growth = size, time.monotonic()
+                elif time.monotonic() - last_growth > self.stall_seconds:
+                    print(f"UYARI: {self.name} kaydı {self.stall_seconds:.0f} sn büyümedi, ffmpeg yeniden başlatılıyor.")
+                    self._process.terminate()
+                    break
+            try:
+                self._process.wait(5)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+                self._process.wait()
+            self.index_completed(include_newest=True)
+            if self._running:
+                self.restarts += 1
+                print(f"UYARI: {self.name} kaydı durdu (kod {self._process.returncode}), 5 saniye sonra yeniden denenecek.")
+                time.sleep(5)
+
+    def stats(self) -> dict:
+        return {**self.index.stats(), 'recording': self._process is not None and self._process.poll() is None,
+                'restarts': self.restarts}
+
+
+class ContinuousRecorder:
+    """
+    Bir kameranın kanallarını (ör. 101 ve 201) sürekli kaydeder ve disk kotasını uygular.
+
+    Her kanal root/<kamera>/<kanal>/ altına yazılır. Yeni segment dizinlendikçe toplam boyut
+    max_bytes'ı aşarsa kanallar arasında en eski segmentler silinir. ffmpeg kanal başına kendi
+    RTSP oturumunu açar: aynı kanal FrameBus ile de çözülüyorsa kamerada iki oturum kullanılır.
+
+        recorder = ContinuousRecorder('recordings', '192.168.1.64', {101: url_101, 201: url_201},
+                                      max_bytes=200 * 2**30)
+        recorder.start()
+        for chunk in recorder.read(201, t0, t1): ...   # oynatılabilir MPEG-TS baytları
+    """
+
+    def __init__(self, root: str, camera: str, channels: dict, segment_seconds: int = 60,
+                 max_bytes: int = 100 * 2 ** 30, ffmpeg: str = 'ffmpeg'):
+        self.root = root
+        self.camera = camera
+        self.max_bytes = max_bytes
+        self.deleted = 0
+        self._quota_lock = threading.Lock()
+        self.channels = {
+            channel: SegmentRecorder(url, os.path.join(root, camera, str(channel)), f"{camera}/{channel}",
+                                     segment_seconds, on_segment=self.enforce_quota, ffmpeg=ffmpeg)
+            for channel, url in channels.items()
+        }
+
+    def start(self):
+        self.enforce_quota()
+        for recorder in self.channels.values():
+            recorder.start()
+
+    def stop(self):
+        for recorder in self.channels.values():
+            recorder.stop()
+
+    def enforce_quota(self):
+        with self._quota_lock:
+            indexes = [recorder.index for recorder in self.channels.values()]
+            total = sum(index.total_bytes for index in indexes)
+            while total > self.max_bytes:
+                candidates = [index for index in indexes if index.oldest is not None]
+                if not candidates:
+                    break
+                total -= min(candidates, key=lambda index: index.oldest).delete_oldest()
+                self.deleted += 1
+
+    def locate(self, channel: int, ts: float):
+        return self.channels[channel].index.locate(ts)
+
+    def read(self, channel: int, start: float, end: float):
+        return self.channels[channel].index.read(start, end)
+
+    def stats(self) -> dict:
+        channels = {channel: recorder.stats() for channel, recorder in self.channels.items()}
+        return {'max_bytes': self.max_bytes, 'bytes': sum(c['bytes'] for c in channels.values()),
+                'deleted_segments': self.deleted, 'channels': channels}
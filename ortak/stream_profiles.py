@@ -0,0 +1,186 @@
+# stream_profiles.py
+
+import threading
+import time
+import xml.etree.ElementTree as ET
+from typing import NamedTuple
+
+import requests
+
+STREAMING_CHANNELS_PATH = '/ISAPI/Streaming/channels'
+
+# Hikvision kanal şeması: <sensör><akış>; sensör 1 görünür, 2 termal; akış 01 ana, 02 alt, 03 üçüncü.
+VISIBLE = 1
+THERMAL = 2
+
+
+class StreamProfile(NamedTuple):
+    channel: int              # ör. 101, 102, 201
+    width: int
+    height: int
+    fps: float
+    bitrate_kbps: int         # CBR'de sabit bit hızı, VBR'de üst sınır
+    codec: str
+    enabled: bool = True
+
+    @property
+    def sensor(self) -> int:
+        return self.channel // 100
+
+    @property
+    def index(self) -> int:
+        return self.channel % 100
+
+    @property
+    def pixel_rate(self) -> float:
+        """Saniyede çözülen piksel sayısı; çözme CPU maliyetiyle kabaca orantılıdır."""
+        return self.width * self.height * self.fps
+
+    def as_dict(self) -> dict:
+        return {**self._asdict(), 'sensor': self.sensor, 'index': self.index}
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+
+def _child_text(node, name: str, default=None):
+    # ISAPI yanıtlarında ad alanı firmware'e göre değişir (hikvision.com / isapi.org); yerel ad yeterli.
+    for child in node:
+        if _local(child.tag) == name:
+            return (child.text or '').strip()
+    return default
+
+
+def _child(node, name: str):
+    for child in node:
+        if _local(child.tag) == name:
+            return child
+    return None
+
+
+def parse_streaming_channels(xml: bytes) -> dict:
+    """/ISAPI/Streaming/channels yanıtını {kanal: StreamProfile} sözlüğüne çevirir."""
+    profiles = {}
+    for node in ET.fromstring(xml).iter():
+        if _local(node.tag) != 'StreamingChannel':
+            continue
+        video = _child(node, 'Video')
+        if video is None:
+            continue
+        try:
+            channel = int(_child_text(node, 'id'))
+            width = int(_child_text(video, 'videoResolutionWidth', 0))
+            height = int(_child_text(video, 'videoResolutionHeight', 0))
+        except (TypeError, ValueError):
+            continue
+        # maxFrameRate yüzde bir fps birimindedir (2500 -> 25 fps).
+        fps = int(_child_text(video, 'maxFrameRate', 0) or 0) / 100.0
+        quality = _child_text(video, 'videoQualityControlType', 'CBR').upper()
+        bitrate = _child_text(video, 'vbrUpperCap' if quality == 'VBR' else 'constantBitRate') \
+            or _child_text(video, 'constantBitRate') or 0
+        enabled = _child_text(node, 'enabled', 'true') == 'true' and _child_text(video, 'enabled', 'true') == 'true'
+        profiles[channel] = StreamProfile(channel, width, height, fps, int(bitrate),
+                                          _child_text(video, 'videoCodecType', ''), enabled)
+    return profiles
+
+
+class StreamProfileManager:
+    """
+    Kameranın akış profillerini ISAPI'den okur ve her kullanım için uygun kanalı seçer.
+
+    Ekran ve MJPEG önizleme 640x360 civarında gösterildiği halde ana akışı (101/201)
+    çözmek, her karede birkaç megapikseli çözüp küçültmek demektir. display_url(),
+    ekran kutusunu büyütme gerektirmeden dolduran en küçük etkin akışı (genelde 102)
+    seçer; main_url() ana akışı verir ve sadece anlık görüntü, kayıt veya analiz için
+    açılmalıdır. Profiller okunamazsa eski davranışa (ana akış) dönülür.
+
+        profiles = StreamProfileManager(isapi, '192.168.1.64', 'admin', 'parola')
+        thread = RTSPVideoThread(lambda: profiles.display_url(VISIBLE), ...)
+    """
+
+    def __init__(self, isapi, host: str, user: str, password: str, rtsp_port: int = 554,
+                 max_width: int = 640, max_height: int = 360, refresh_interval: float = 600.0,
+                 retry_interval: float = 30.0):
+        self.isapi = isapi
+        self.host = host
+        self.user = user
+        self.password = password
+        self.rtsp_port = rtsp_port
+        self.max_width = max_width
+        self.max_height = max_height
+        self.refresh_interval = refresh_interval
+        self.retry_interval = retry_interval
+        self._profiles = {}
+        self._next_refresh = 0.0
+        self._lock = threading.Lock()
+
+    def refresh(self) -> bool:
+        """Profilleri kameradan yeniden okur; başarısızsa eldeki profiller korunur."""
+        try:
+            response = self.isapi.get(STREAMING_CHANNELS_PATH, timeout=3)
+            profiles = parse_streaming_channels(response.content) if response.status_code == 200 else None
+        except (requests.exceptions.RequestException, ET.ParseError) as e:
+            print(f"UYARI: Akış profilleri okunamadı: {e}")
+            profiles = None
+        with self._lock:
+            # Kamera henüz açılmamışsa ana akışta uzun süre kalınmasın diye başarısızlıkta daha sık denenir.
+            self._next_refresh = time.monotonic() + (self.refresh_interval if profiles else self.retry_interval)
+            if profiles:
+                self._profiles = profiles
+            return bool(profiles)
+
+    def profiles(self) -> dict:
+        with self._lock:
+            stale = time.monotonic() >= self._next_refresh
+        if stale:
+            self.refresh()
+        with self._lock:
+            return dict(self._profiles)
+
+    def sensor_profiles(self, sensor: int) -> list:
+        return sorted((p for p in self.profiles().values() if p.sensor == sensor and p.enabled),
+                      key=lambda p: p.channel)
+
+    def main_channel(self, sensor: int) -> int:
+        return sensor * 100 + 1
+
+    def display_channel(self, sensor: int, max_width: int | None = None, max_height: int | None = None) -> int:
+        """
+        Ekran kutusunu büyütmeden dolduran (genişlik veya yükseklik kutuya yeten) akışlar
+        içinden piksel hızı en düşük olanı döndürür. Hiçbiri yetmiyorsa en büyüğü, profil
+        yoksa ana kanalı döndürür; termal sensörün alt akışı ekrandan küçükse ana akışta kalınır.
+        """
+        max_width = max_width or self.max_width
+        max_height = max_height or self.max_height
+        candidates = self.sensor_profiles(sensor)
+        if not candidates:
+            return self.main_channel(sensor)
+        sufficient = [p for p in candidates if p.width >= max_width or p.height >= max_height]
+        if sufficient:
+            return min(sufficient, key=lambda p: (p.pixel_rate, p.bitrate_kbps)).channel
+        return max(candidates, key=lambda p: p.pixel_rate).channel
+
+    def rtsp_url(self, channel: int) -> str:
+        return f'rtsp://{self.user}:{self.password}@{self.host}:{self.rtsp_port}/Streaming/Channels/{channel}'
+
+    def display_url(self, sensor: int) -> str:
+        return self.rtsp_url(self.display_channel(sensor))
+
+    def main_url(self, sensor: int) -> str:
+        return self.rtsp_url(self.main_channel(sensor))
+
+    def saving(self, sensor: int) -> dict:
+        """Ekranda alt akış kullanmanın ana akışa göre bant genişliği ve çözme (piksel) kazancı."""
+        profiles = self.profiles()
+        main = profiles.get(self.main_channel(sensor))
+        display = profiles.get(self.display_channel(sensor))
+        if main is None or display is None:
+            return {'main': None, 'display': None}
+        return {
+            'main': main.as_dict(),
+            'display': display.as_dict(),
+            'bitrate_saving_kbps': main.bitrate_kbps - display.bitrate_kbps,
+            'bitrate_ratio': display.bitrate_kbps / main.bitrate_kbps if main.bitrate_kbps else None,
+            'pixel_rate_ratio': display.pixel_rate / main.pixel_rate if main.pixel_rate else None,
+        }
@@ -0,0 +1,231 @@
+# thermometry_hub.py
+
+import threading
+import time
+from collections import deque
+
+from ortak.isapi_client import ISAPIClient
+from ortak.multipart_parser import MultipartStreamParser, iter_json_payloads
+
+# Abone başına kuyruk boyutu; dolunca en eski kayıt atılır.
+DEFAULT_QUEUE_SIZE = 16
+
+
+def thermometry_uploads(data: dict) -> list:
+    """Bir realTimethermometry mesajındaki ThermometryUpload kayıtlarını liste olarak döndürür."""
+    uploads = data.get('ThermometryUploadList', {}).get('ThermometryUpload', [])
+    return uploads if isinstance(uploads, list) else [uploads]
+
+
+class Subscription:
+    """
+    Hub'a bağlı tek bir tüketici. Kuyruk sınırlıdır; yavaş bir tüketici dolduğunda
+    en eski kayıt atılır (drop-oldest), böylece diğer abonelerin akışı hiç beklemez.
+    """
+
+    def __init__(self, hub, maxsize: int = DEFAULT_QUEUE_SIZE):
+        self.hub = hub
+        self._queue = deque(maxlen=maxsize)
+        self._cond = threading.Condition()
+        self.closed = False
+        self.received = 0
+        self.dropped = 0
+
+    def _put(self, received_at: float, item):
+        with self._cond:
+            if len(self._queue) == self._queue.maxlen:
+                self.dropped += 1
+            self._queue.append((received_at, item))
+            self.received += 1
+            self._cond.notify()
+
+    def get_timed(self, timeout: float | None = None):
+        """Sıradaki mesajı hub'a ulaştığı anla birlikte (zaman, mesaj) olarak döndürür; yoksa (0.0, None)."""
+        with self._cond:
+            if not self._queue and not self.closed:
+                self._cond.wait(timeout)
+            return self._queue.popleft() if self._queue else (0.0, None)
+
+    def get(self, timeout: float | None = None) -> dict | None:
+        """Sıradaki mesajı döndürür; zaman aşımında veya abonelik kapandığında None döner."""
+        return self.get_timed(timeout)[1]
+
+    def get_latest(self) -> dict | None:
+        """Kuyruktaki en yeni mesajı alır, eskileri atar; beklemez."""
+        with self._cond:
+            if not self._queue:
+                return None
+            _, latest = self._queue.pop()
+            self.dropped += len(self._queue)
+            self._queue.clear()
+            return latest
+
+    def close(self):
+        self.hub.unsubscribe(self)
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ThermometryHub:
+    """
+    Kamera başına tek bir realTimethermometry bağlantısı tutar ve ayrıştırılan
+    mesajları süreç içindeki tüm abonelere dağıtır.
+
+    Kameranın oturum sınırı düşük olduğu için GUI, anomali dinleyicisi ve
+    CameraWorker kendi bağlantılarını açmak yerine aynı hub'a abone olmalıdır:
+
+        hub = ThermometryHub.for_camera(url, user, password)
+        with hub.subscribe() as sub:
+            data = sub.get(timeout=1.0)
+    """
+
+    _hubs = {}
+    _hubs_lock = threading.Lock()
+
+    def __init__(self, url, user, password, reconnect_delay: float = 5.0):
+        self.url = url
+        self.client = ISAPIClient.for_url(url, user, password)
+        self.reconnect_delay = reconnect_delay
+        self.status = "Bağlanmadı"
+        self.messages = 0
+        self.last_message_time = 0.0
+        self._subscribers = []
+        self._status_listeners = []
+        self._lock = threading.Lock()
+        self._thread = None
+        # Okuyucu thread başına durdurma bayrağı; start/stop _start_lock ile sıralanır.
+        self._start_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._stop_event.set()
+        self._response = None
+        self.external_upstream = False
+
+    @classmethod
+    def for_camera(cls, url, user, password, **kwargs):
+        """Aynı URL için süreç genelinde tek bir hub döndürür."""
+        with cls._hubs_lock:
+            hub = cls._hubs.get(url)
+            if hub is None:
+                hub = cls._hubs[url] = cls(url, user, password, **kwargs)
+            return hub
+
+    # --- Abonelik yönetimi ---
+    def subscribe(self, maxsize: int = DEFAULT_QUEUE_SIZE, autostart: bool = True) -> Subscription:
+        sub = Subscription(self, maxsize)
+        with self._lock:
+            self._subscribers.append(sub)
+        if autostart:
+            self.start()
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        with self._lock:
+            if sub in self._subscribers:
+                self._subscribers.remove(sub)
+            last = not self._subscribers
+        if last:
+            # Son abone de ayrıldıysa kamera oturumunu boşuna meşgul etme.
+            self.stop()
+
+    def add_status_listener(self, callback):
+        """Bağlantı durumu değiştiğinde callback(status: str) çağrılır (hub thread'inden)."""
+        self._status_listeners.append(callback)
+        callback(self.status)
+
+    def remove_status_listener(self, callback):
+        if callback in self._status_listeners:
+            self._status_listeners.remove(callback)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, data: dict):
+        """Bir mesajı tüm abonelere dağıtır. Dış bir upstream (ör. asenkron istemci) de kullanabilir."""
+        now = time.time()
+        self.messages += 1
+        self.last_message_time = now
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for sub in subscribers:
+            sub._put(now, data)
+
+    def use_external_upstream(self):
+        """
+        Mesajlar dışarıdan publish() ile beslenecekse (ör. asenkron istemci) hub kendi
+        bağlantısını açmaz; böylece kameraya yine tek bağlantı gider.
+        """
+        self.external_upstream = True
+        self.stop()
+
+    def set_status(self, status: str):
+        self.status = status
+        for callback in list(self._status_listeners):
+            try:
+                callback(status)
+            except Exception as e:
+                print(f"Termal hub durum dinleyicisi hatası: {e}")
+
+    # --- Upstream bağlantı ---
+    def start(self):
+        if self.external_upstream:
+            return
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                if not self._stop_event.is_set():
+                    return
+                # Durdurulan okuyucu bitmeden yenisi başlatılmaz; kameraya aynı anda iki bağlantı açılmasın.
+                self._thread.join()
+            self._stop_event = threading.Event()
+            self._thread = threading.Thread(target=self._run, args=(self._stop_event,), name="ThermometryHub",
+                                            daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        with self._start_lock:
+            self._stop_event.set()
+            response = self._response
+        if response is not None:
+            # Bloklanmış iter_content çağrısını hemen sonlandırmak için bağlantıyı kapat.
+            try:
+                response.close()
+            except Exception:
+                pass
+
+    def _run(self, stop: threading.Event):
+        while not stop.is_set():
+            try:
+                with self.client.get(self.url, stream=True, timeout=(5, 65)) as response:
+                    self._response = response
+                    if response.status_code != 200:
+                        self.set_status(f"Termal Veri: Hata {response.status_code}")
+                        stop.wait(self.reconnect_delay)
+                        continue
+                    self.set_status("Termal Veri: Bağlandı")
+                    parser = MultipartStreamParser.from_response(response)
+                    for data in iter_json_payloads(parser, response.iter_content(chunk_size=1024)):
+                        if stop.is_set():
+                            break
+                        self.publish(data)
+                if not stop.is_set():
+                    # Kamera yanıtı düzgün kapattı; hatadaki gibi beklenir, sürekli kapatan kamera
+                    # sıkı bir yeniden bağlanma döngüsüyle yorulmaz.
+                    self.set_status("Termal Veri: Bağlantı Kapandı")
+                    stop.wait(self.reconnect_delay)
+            except Exception as e:
+                if stop.is_set():
+                    break
+                print(f"Termal hub bağlantı hatası: {e}")
+                self.set_status("Termal Veri: Bağlantı Hatası")
+                stop.wait(self.reconnect_delay)
+            finally:
+                self._response = None
+        self.set_status("Bağlanmadı")
+        print("Termal hub durdu.")
@@ -0,0 +1,376 @@
+# thermometry_store.py
+
+import calendar
+import math
+import os
+import shutil
+import threading
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+from ortak.thermometry_hub import thermometry_uploads
+
+# Seviye adı -> kova genişliği (saniye). Ham veri ~1 Hz kabul edilir.
+RAW = 'raw'
+ROLLUP_LEVELS = (('1m', 60), ('15m', 900), ('1h', 3600))
+LEVELS = (RAW,) + tuple(name for name, _ in ROLLUP_LEVELS)
+LEVEL_WIDTH = {RAW: 1.0, **{name: float(width) for name, width in ROLLUP_LEVELS}}
+
+# Sabit genişlikli sütunlar; her sütun bölüm klasöründe ayrı bir dosyadır.
+RAW_COLUMNS = (('ts', '<f8'), ('max', '<f4'), ('min', '<f4'), ('avg', '<f4'), ('hot_x', '<f4'), ('hot_y', '<f4'))
+ROLLUP_COLUMNS = (('ts', '<f8'), ('max', '<f4'), ('min', '<f4'), ('avg', '<f4'), ('count', '<u4'))
+
+
+def _columns(level: str):
+    return RAW_COLUMNS if level == RAW else ROLLUP_COLUMNS
+
+
+def partition_name(level: str, ts: float) -> str:
+    """Ham veri günlük (YYYY-MM-DD), özetler aylık (YYYY-MM) dosyalanır; adlar kronolojik sıralanır."""
+    return time.strftime('%Y-%m-%d' if level == RAW else '%Y-%m', time.gmtime(ts))
+
+
+def partition_end(level: str, name: str) -> float:
+    """Bölümün kapsadığı sürenin bitişi (UTC epoch)."""
+    if level == RAW:
+        year, month, day = (int(p) for p in name.split('-'))
+        return calendar.timegm((year, month, day, 0, 0, 0)) + 86400.0
+    year, month = (int(p) for p in name.split('-'))
+    year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return float(calendar.timegm((year, month, 1, 0, 0, 0)))
+
+
+class QueryResult(NamedTuple):
+    """Aralık sorgusu sonucu. columns: sütun adı -> numpy dizisi (hepsi aynı uzunlukta)."""
+    resolution: str
+    columns: dict
+
+    def __len__(self):
+        return len(self.columns['ts'])
+
+    def as_dict(self) -> dict:
+        return {'resolution': self.resolution,
+                'columns': {name: values.tolist() for name, values in self.columns.items()}}
+
+
+class _Partition:
+    """Tek bir bölüm klasörü: sütun başına bir ikili dosya, sadece sona ekleme yapılır."""
+
+    def __init__(self, path: str, columns):
+        self.path = path
+        self.columns = columns
+
+    def _file(self, name):
+        return os.path.join(self.path, name + '.bin')
+
+    def length(self) -> int:
+        """Tüm sütunlarda eksiksiz bulunan kayıt sayısı (yarım kalmış yazımlar sayılmaz)."""
+        lengths = []
+        for name, dtype in self.columns:
+            try:
+                lengths.append(os.path.getsize(self._file(name)) // np.dtype(dtype).itemsize)
+            except OSError:
+                return 0
+        return min(lengths)
+
+    def repair(self):
+        """Çökme sonrası sütun uzunlukları farklıysa hepsini en kısa olana kırpar."""
+        n = self.length()
+        for name, dtype in self.columns:
+            path = self._file(name)
+            size = n * np.dtype(dtype).itemsize
+            if os.path.exists(path) and os.path.getsize(path) != size:
+                with open(path, 'r+b') as f:
+                    f.truncate(size)
+
+    def append(self, rows: dict):
+        os.makedirs(self.path, exist_ok=True)
+        for name, dtype in self.columns:
+            with open(self._file(name), 'ab') as f:
+                np.asarray(rows[name], dtype=dtype).tofile(f)
+
+    def read(self, start: float, end: float) -> dict:
+        n = self.length()
+        if n == 0:
+            return {}
+        ts = np.fromfile(self._file('ts'), dtype='<f8', count=n)
+        i0, i1 = np.searchsorted(ts, start, 'left'), np.searchsorted(ts, end, 'left')
+        if i0 >= i1:
+            return {}
+        out = {'ts': ts[i0:i1]}
+        for name, dtype in self.columns[1:]:
+            itemsize = np.dtype(dtype).itemsize
+            out[name] = np.fromfile(self._file(name), dtype=dtype, count=int(i1 - i0), offset=int(i0) * itemsize)
+        return out
+
+    def last_ts(self) -> float | None:
+        n = self.length()
+        if n == 0:
+            return None
+        return float(np.fromfile(self._file('ts'), dtype='<f8', count=1, offset=(n - 1) * 8)[0])
+
+
+class _Bucket:
+    """Açık özet kovası: max'ların max'ı, min'lerin min'i, ortalamaların ortalaması."""
+    __slots__ = ('start', 'max', 'min', 'sum', 'count')
+
+    def __init__(self, start):
+        self.start = start
+        self.max = -math.inf
+        self.min = math.inf
+        self.sum = 0.0
+        self.count = 0
+
+    def add(self, max_temp, min_temp, avg_temp):
+        self.max = max(self.max, max_temp)
+        self.min = min(self.min, min_temp)
+        self.sum += avg_temp
+        self.count += 1
+
+
+class _Series:
+    """Bir kamera/kanal/kural serisinin diskteki konumu ve açık özet kovaları."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.pending = []
+        self.last_ts = -math.inf
+        self.buckets = {}
+        self.recovered = False
+
+    def level_dir(self, level):
+        return os.path.join(self.path, level)
+
+    def partitions(self, level):
+        try:
+            return sorted(os.listdir(self.level_dir(level)))
+        except FileNotFoundError:
+            return []
+
+    def partition(self, level, name):
+        return _Partition(os.path.join(self.level_dir(level), name), _columns(level))
+
+
+class ThermometryStore:
+    """
+    Kamera/kanal/kural bazında termal ölçümler için gömülü, sona eklemeli zaman serisi deposu.
+
+    Her ThermometryUpload (Max/Min/Average ve sıcak nokta koordinatı) ham seviyeye yazılır;
+    1 dk / 15 dk / 1 saatlik min/max/ortalama özetleri yazım sırasında artımlı olarak
+    üretilir. Veriler sabit genişlikli sütun dosyalarında tutulur (ham kayıt 28 byte,
+    özet 24 byte), aralık sorguları zaman sütununda ikili arama ile sadece ilgili
+    dilimi okur.
+
+        store = ThermometryStore('thermometry_db')
+        store.start()
+        store.append_message('kamera1', data, received_at)
+        store.query('kamera1', 2, 1, start, end)   # çözünürlük aralığa göre seçilir
+
+    append() sadece belleğe ekler; disk yazımı arka plan thread'inde flush_interval
+    aralıklarla yapılır, böylece event loop veya akış thread'i beklemez.
+    """
+
+    def __init__(self, root: str, flush_interval: float = 5.0):
+        self.root = root
+        self.flush_interval = flush_interval
+        self.appended = 0
+        self.out_of_order = 0
+        self._series = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # --- Yazma ---
+    def _get_series(self, camera, channel, rule) -> _Series:
+        key = (str(camera), int(channel), int(rule))
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = _Series(os.path.join(self.root, *(str(part) for part in key)))
+        return series
+
+    def append(self, camera, channel, rule, ts: float, max_temp: float, min_temp: float, avg_temp: float,
+               hot_x: float = math.nan, hot_y: float = math.nan):
+        with self._lock:
+            self._get_series(camera, channel, rule).pending.append((ts, max_temp, min_temp, avg_temp, hot_x, hot_y))
+            self.appended += 1
+
+    def append_message(self, camera, data: dict, received_at: float, channel: int = 2) -> int:
+        """Bir realTimethermometry mesajındaki tüm kuralları ekler; eklenen kayıt sayısını döndürür."""
+        count = 0
+        for upload in thermometry_uploads(data):
+            cfg = upload.get('LinePolygonThermCfg', {})
+            max_temp = cfg.get('MaxTemperature')
+            rule = upload.get('ruleID')
+            if max_temp is None or rule is None:
+                continue
+            hot = upload.get('HighestPoint') or {}
+            self.append(camera, channel, rule, received_at, max_temp,
+                        cfg.get('MinTemperature', max_temp), cfg.get('AverageTemperature', max_temp),
+                        hot.get('positionX', math.nan), hot.get('positionY', math.nan))
+            count += 1
+        return count
+
+    def _recover(self, series: _Series):
+        """Yeniden açılışta son ham zaman damgasını ve yarım kalmış özet kovalarını diskten kurar."""
+        series.recovered = True
+        raw_partitions = series.partitions(RAW)
+        for name in raw_partitions:
+            series.partition(RAW, name).repair()
+        last_raw = series.partition(RAW, raw_partitions[-1]).last_ts() if raw_partitions else None
+        if last_raw is None:
+            return
+        series.last_ts = last_raw
+        for level, width in ROLLUP_LEVELS:
+            partitions = series.partitions(level)
+            for name in partitions[-1:]:
+                series.partition(level, name).repair()
+            last_bucket = series.partition(level, partitions[-1]).last_ts() if partitions else None
+            # Yazılmış son kovadan sonraki ham kayıtlar açık kovayı yeniden oluşturur.
+            since = last_bucket + width if last_bucket is not None else last_raw - width
+            since = max(since, math.floor(last_raw / width) * width)
+            rows = self._read_level(series, RAW, since, last_raw + 1.0)
+            for ts, mx, mn, avg in zip(rows.get('ts', ()), rows.get('max', ()), rows.get('min', ()), rows.get('avg', ())):
+                self._add_to_bucket(series, level, width, float(ts), float(mx), float(mn), float(avg), emit=None)
+
+    def _add_to_bucket(self, series, level, width, ts, max_temp, min_temp, avg_temp, emit):
+        start = math.floor(ts / width) * width
+        bucket = series.buckets.get(level)
+        if bucket is not None and bucket.start != start:
+            if emit is not None:
+                emit.append(bucket)
+            bucket = None
+        if bucket is None:
+            bucket = series.buckets[level] = _Bucket(start)
+        bucket.add(max_temp, min_temp, avg_temp)
+
+    def flush(self):
+        """Bekleyen kayıtları diske yazar ve kapanan özet kovalarını ekler."""
+        with self._lock:
+            work = [(series, series.pending) for series in self._series.values() if series.pending]
+            for series, _ in work:
+                series.pending = []
+        with self._flush_lock:
+            for series, rows in work:
+                self._flush_series(series, rows)
+
+    def _flush_series(self, series: _Series, rows):
+        if not series.recovered:
+            self._recover(series)
+        accepted = []
+        for row in rows:
+            if row[0] < series.last_ts:
+                self.out_of_order += 1
+                continue
+            series.last_ts = row[0]
+            accepted.append(row)
+        if not accepted:
+            return
+        self._append_rows(series, RAW, accepted)
+        for level, width in ROLLUP_LEVELS:
+            closed = []
+            for ts, max_temp, min_temp, avg_temp, _, _ in accepted:
+                self._add_to_bucket(series, level, width, ts, max_temp, min_temp, avg_temp, emit=closed)
+            if closed:
+                self._append_rows(series, level, [(b.start, b.max, b.min, b.sum / b.count, b.count) for b in closed])
+
+    def _append_rows(self, series, level, rows):
+        """Satırları bölümlerine ayırıp sütun sütun ekler (satırlar zamana göre sıralıdır)."""
+        names = [name for name, _ in _columns(level)]
+        group, group_name = [], None
+        for row in rows:
+            name = partition_name(level, row[0])
+            if name != group_name and group:
+                series.partition(level, group_name).append(dict(zip(names, zip(*group))))
+                group = []
+            group_name = name
+            group.append(row)
+        if group:
+            series.partition(level, group_name).append(dict(zip(names, zip(*group))))
+
+    # --- Okuma ---
+    def _read_level(self, series: _Series, level: str, start: float, end: float) -> dict:
+        first, last = partition_name(level, start), partition_name(level, max(start, end - 1e-6))
+        parts = [series.partition(level, name).read(start, end)
+                 for name in series.partitions(level) if first <= name <= last]
+        parts = [p for p in parts if p]
+        if not parts:
+            return {name: np.empty(0, dtype=dtype) for name, dtype in _columns(level)}
+        return {name: np.concatenate([p[name] for p in parts]) for name, _ in _columns(level)}
+
+    @staticmethod
+    def pick_resolution(start: float, end: float, max_points: int) -> str:
+        """Aralıkta en fazla max_points nokta verecek en ince seviyeyi seçer."""
+        span = max(0.0, end - start)
+        for level in LEVELS:
+            if span / LEVEL_WIDTH[level] <= max_points:
+                return level
+        return LEVELS[-1]
+
+    def query(self, camera, channel, rule, start: float, end: float, resolution: str = 'auto',
+              max_points: int = 2000) -> QueryResult:
+        """
+        [start, end) aralığını döndürür. resolution 'raw', '1m', '15m', '1h' veya 'auto' olabilir.
+        Özet seviyelerinde sadece kapanmış kovalar döner; ts kovanın başlangıcıdır.
+        """
+        if resolution == 'auto':
+            resolution = self.pick_resolution(start, end, max_points)
+        if resolution not in LEVELS:
+            raise ValueError(f"Bilinmeyen çözünürlük: {resolution}")
+        self.flush()
+        with self._lock:
+            series = self._get_series(camera, channel, rule)
+        with self._flush_lock:
+            return QueryResult(resolution, self._read_level(series, resolution, start, end))
+
+    def series(self) -> list:
+        """Diskte veya bellekte bulunan (kamera, kanal, kural) anahtarları."""
+        keys = set(self._series)
+        if os.path.isdir(self.root):
+            for camera in os.listdir(self.root):
+                for channel in os.listdir(os.path.join(self.root, camera)):
+                    for rule in os.listdir(os.path.join(self.root, camera, channel)):
+                        keys.add((camera, int(channel), int(rule)))
+        return sorted(keys)
+
+    def prune(self, retention: dict, now: float | None = None) -> int:
+        """
+        Saklama süresi dolmuş bölümleri siler; retention seviye -> saniye (ör. {'raw': 30 * 86400}).
+        Silinen bölüm sayısını döndürür.
+        """
+        now = time.time() if now is None else now
+        removed = 0
+        with self._flush_lock:
+            for camera, channel, rule in self.series():
+                with self._lock:
+                    series = self._get_series(camera, channel, rule)
+                for level, keep in retention.items():
+                    for name in series.partitions(level):
+                        if partition_end(level, name) < now - keep:
+                            shutil.rmtree(os.path.join(series.level_dir(level), name), ignore_errors=True)
+                            removed += 1
+        return removed
+
+    # --- Arka plan yazımı ---
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="ThermometryStore", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except OSError as e:
+                print(f"Termal veri deposu yazılamadı: {e}")
+
+    def close(self):
+        """Bekleyen kayıtları yazar. Açık özet kovaları yazılmaz; yeniden açılışta ham veriden kurulur."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval + 1.0)
+        self.flush()
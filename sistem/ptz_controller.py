@@ -1,17 +1,37 @@
-from onvif import ONVIFCamera
+import os
+import sys
 import threading
 import time
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from ortak.onvif_init import OnvifInitializer
+
+_onvif_init = OnvifInitializer()
+
 class PTZController:
-    def __init__(self, ip, port, username, password):
-        self.cam = ONVIFCamera(ip, port, username, password)
-        self.media = self.cam.create_media_service()
-        self.ptz = self.cam.create_ptz_service()
-        self.profile = self.media.GetProfiles()[0]
-        self.token = self.profile.token
+    def __init__(self, ip, port, username, password, on_ready=None):
+        # Bağlantı arka planda kurulur; hazır olana kadar komutlar yok sayılır.
+        self.cam = None
+        self.ptz = None
+        self.token = None
+        self.ptz_limits = None
         self.rotating = False
+        self.ready = threading.Event()
+        self._on_ready = on_ready
+        _onvif_init.submit(ip, ip, port, username, password, on_ready=self._set_ready)
+
+    def _set_ready(self, key, result):
+        self.cam = result.camera
+        self.token = result.token
+        self.ptz_limits = result.limits
+        self.ptz = result.ptz
+        self.ready.set()
+        if self._on_ready is not None:
+            self._on_ready(self)
 
     def move(self, pan, tilt):
+        if not self.ready.is_set():
+            return
         req = self.ptz.create_type('ContinuousMove')
         req.ProfileToken = self.token
         req.Velocity = {'PanTilt': {'x': pan, 'y': tilt}}
@@ -19,6 +39,9 @@ class PTZController:
         threading.Timer(0.5, lambda: self.ptz.Stop({'ProfileToken': self.token})).start()
 
     def toggle_rotate(self, btn):
+        if not self.ready.is_set():
+            btn.setChecked(False)
+            return
         if btn.isChecked():
             self.rotating = True
             threading.Thread(target=self._rotate_loop, daemon=True).start()
@@ -1,15 +1,19 @@
+import os
+import sys
 import requests
-from requests.auth import HTTPDigestAuth
 import xml.etree.ElementTree as ET
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from ortak.isapi_client import ISAPIClient
+
 class ThermalSensor:
     def __init__(self, ip, username, password):
         self.url = f"http://{ip}/ISAPI/Thermometry/rule/1"  # Kameranın termometre sensörü endpoint'i
-        self.auth = HTTPDigestAuth(username, password)
+        self.isapi = ISAPIClient.for_camera(ip, username, password)
 
     def get_temperature(self):
         try:
-            response = requests.get(self.url, auth=self.auth, timeout=5)
+            response = self.isapi.get(self.url, timeout=5)
             if response.status_code == 200:
                 root = ET.fromstring(response.content)
                 temp = root.find("ruleTemperature")  # XML içinde sıcaklık verisini alıyoruz
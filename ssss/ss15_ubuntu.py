@@ -1,42 +1,53 @@
 import sys
 import os
-import cv2
 import time
 import threading
-import requests
 import json
 import xml.etree.ElementTree as ET
-import numpy as np
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QLabel, QPushButton, QVBoxLayout,
     QHBoxLayout, QGridLayout, QGroupBox, QLineEdit, QFormLayout
 )
 from PyQt5.QtGui import QImage, QPixmap
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, pyqtSlot
-from onvif import ONVIFCamera
-from requests.auth import HTTPDigestAuth
+from PyQt5.QtCore import QThread, pyqtSignal, pyqtSlot
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from ortak.calibration import ThermalVisibleCalibration
+from ortak.isapi_client import ISAPIClient
+from ortak.onvif_init import OnvifInitializer
+from ortak.ptz_tracker import PTZTracker
+from ortak.frame_bus import FrameBus
+from ortak.display_scaler import DisplayScaler
+from ortak.overlay import Marker, OverlayCompositor
+from ortak.stream_profiles import StreamProfileManager, THERMAL, VISIBLE
+from ortak.thermometry_hub import ThermometryHub
 
 # HATA DÜZELTME: OpenCV'nin RTSP için TCP kullanmasını sağla (video akışı stabilitesini artırır)
 os.environ["OPENCV_FFMPEG_CAPTURE_OPTIONS"] = "rtsp_transport;tcp"
 
 # === KAMERA BİLGİLERİ ===
-CAMERA_IP = '192.168.1.64'
-CAMERA_PORT = 80
-CAMERA_USER = 'admin'
-CAMERA_PASS = 'ErenEnerji'
-
-# === API ve RTSP URL'leri ===
-RTSP_URL_NORMAL = f'rtsp://{CAMERA_USER}:{CAMERA_PASS}@{CAMERA_IP}:554/Streaming/Channels/101'
-RTSP_URL_THERMAL = f'rtsp://{CAMERA_USER}:{CAMERA_PASS}@{CAMERA_IP}:554/Streaming/Channels/201'
-REALTIME_THERMOMETRY_URL = f'http://{CAMERA_IP}/ISAPI/Thermal/channels/2/thermometry/realTimethermometry/rules?format=json'
-CALIB_POINT_RELATION_URL = f'http://{CAMERA_IP}/ISAPI/System/Video/inputs/channels/2/calibPointRelation'
-PTZ_STATUS_URL = f'http://{CAMERA_IP}/ISAPI/PTZCtrl/channels/1/status'
-THERMAL_ALARM_RULES_URL = f'http://{CAMERA_IP}/ISAPI/Thermal/channels/2/thermometry/1/alarmRules'
+# Ortam değişkenleriyle ezilebilir (ör. benchmarks/camera_simulator.py ile yerel test için).
+CAMERA_IP = os.environ.get('CAMERA_IP', '192.168.1.64')
+CAMERA_PORT = int(os.environ.get('CAMERA_PORT', 80))
+CAMERA_USER = os.environ.get('CAMERA_USER', 'admin')
+CAMERA_PASS = os.environ.get('CAMERA_PASS', 'ErenEnerji')
+RTSP_PORT = int(os.environ.get('RTSP_PORT', 554))
+
+# === API URL'leri (RTSP adresleri StreamProfileManager'dan gelir) ===
+REALTIME_THERMOMETRY_URL = f'http://{CAMERA_IP}:{CAMERA_PORT}/ISAPI/Thermal/channels/2/thermometry/realTimethermometry/rules?format=json'
+CALIB_POINT_RELATION_URL = f'http://{CAMERA_IP}:{CAMERA_PORT}/ISAPI/System/Video/inputs/channels/2/calibPointRelation'
+PTZ_STATUS_URL = f'http://{CAMERA_IP}:{CAMERA_PORT}/ISAPI/PTZCtrl/channels/1/status'
+THERMAL_ALARM_RULES_URL = f'http://{CAMERA_IP}:{CAMERA_PORT}/ISAPI/Thermal/channels/2/thermometry/1/alarmRules'
+# PTZ konum takibi: hareket varken ve boştayken sorgu aralıkları (saniye). Boştaki aralık, kameranın
+# web arayüzünden veya ön ayarla yapılan harici hareketin kalibrasyonda (current_zoom) ne kadar geç görüleceğidir.
+PTZ_FAST_INTERVAL = 0.1
+PTZ_IDLE_INTERVAL = 2.0
 
 # === Hata Yönetimli Video Thread ===
 class RTSPVideoThread(QThread):
     change_pixmap_signal = pyqtSignal(QImage)
     connection_status_signal = pyqtSignal(str)
+    stream_stats_signal = pyqtSignal(dict)
 
     def __init__(self, rtsp_url, is_thermal=False, parent=None):
         super().__init__()
@@ -45,68 +56,57 @@ class RTSPVideoThread(QThread):
         self.is_thermal = is_thermal
         self.parent_ui = parent
         self.stream_name = "Termal" if is_thermal else "Normal"
+        # Küçültme + renk dönüşümü önceden ayrılmış tamponlarda yapılır (QImage.scaled yerine).
+        self.scaler = DisplayScaler(640, 360)
+        self.overlay = OverlayCompositor()
+
+    def overlay_markers(self) -> list:
+        """Termal akışta sıcak/soğuk nokta işaretleri (renkler RGB)."""
+        markers = []
+        if self.is_thermal:
+            if self.parent_ui.thermal_hotspot_coords:
+                x, y = self.parent_ui.thermal_hotspot_coords
+                markers.append(Marker(x, y, (255, 0, 0), f"MAKS: {self.parent_ui.last_max_temp:.1f} C", (15, -15)))
+            if self.parent_ui.thermal_coldspot_coords:
+                x, y = self.parent_ui.thermal_coldspot_coords
+                markers.append(Marker(x, y, (0, 0, 255), f"MIN: {self.parent_ui.last_min_temp:.1f} C", (15, 15)))
+        return markers
 
     def run(self):
-        while self._run_flag:
-            cap = None
-            try:
-                cap = cv2.VideoCapture(self.rtsp_url, cv2.CAP_FFMPEG)
-                if not cap.isOpened():
-                    self.connection_status_signal.emit(f"{self.stream_name}: Bağlantı Hatası")
+        # Akış süreç içindeki diğer tüketicilerle tek çözücüden paylaşılır; URL (fonksiyon) her
+        # bağlanışta çözülür, profil yöneticisi o an uygun akışı (ör. 102) seçer.
+        bus = FrameBus.shared(self.rtsp_url, self.stream_name)
+        report = lambda status: self.connection_status_signal.emit(f"{self.stream_name}: {status}")
+        bus.add_status_listener(report)
+        try:
+            while self._run_flag:
+                try:
+                    with bus.subscribe("ekran") as sub:
+                        last_stats_time = time.time()
+                        while self._run_flag:
+                            # Sadece en yeni kare işlenir; ekran yetişemezse aradaki kareler atlanır.
+                            frame = sub.next(timeout=1.0)
+                            if frame is None or frame.image.ndim < 3:
+                                continue
+
+                            # Bindirme küçültülmüş karede yapılır; maliyeti kaynak çözünürlüğüne bağlı değildir.
+                            rgb_image = self.overlay.render(self.scaler.scale(frame.image), self.overlay_markers())
+                            # Halka tamponu sonraki karelerde yeniden yazılır; GUI thread'ine kuyrukla giden
+                            # QImage ekran boyutunda kopyalanır ki yavaş GUI yırtık kare göstermesin.
+                            h_disp, w_disp = rgb_image.shape[:2]
+                            qt_img = QImage(rgb_image.data, w_disp, h_disp, rgb_image.strides[0], QImage.Format_RGB888).copy()
+                            self.change_pixmap_signal.emit(qt_img)
+                            sub.mark_displayed(frame.timestamp)
+
+                            if time.time() - last_stats_time >= 1.0:
+                                last_stats_time = time.time()
+                                self.stream_stats_signal.emit({**sub.stats(), **self.scaler.stats(), **self.overlay.stats()})
+                except Exception as e:
+                    print(f"HATA ({self.stream_name} Thread): {e}")
+                    self.connection_status_signal.emit(f"{self.stream_name}: Thread Çöktü")
                     time.sleep(5)
-                    continue
-
-                self.connection_status_signal.emit(f"{self.stream_name}: Bağlandı")
-                
-                while self._run_flag:
-                    ret, frame = cap.read()
-                    if not ret:
-                        self.connection_status_signal.emit(f"{self.stream_name}: Veri Alınamıyor...")
-                        break
-                    
-                    if frame is None or len(frame.shape) < 3:
-                        continue
-                    
-                    h_frame, w_frame, _ = frame.shape
-                    
-                    # Görüntü Boyutlarını Kontrol Et
-                    if len(frame.shape) == 3:  # Renkli (RGB) bir görüntü
-                        h_frame, w_frame, _ = frame.shape
-                    elif len(frame.shape) == 2:  # Gri tonlama (2D) bir görüntü
-                        h_frame, w_frame = frame.shape
-                    else:
-                        raise ValueError("Beklenmeyen görüntü boyutu")
-
-                    # Eğer termal görüntü ise, ROI işlemleri eklenebilir veya kaldırılabilir
-                    if self.is_thermal:
-                        if self.parent_ui.thermal_hotspot_coords:
-                            x, y = self.parent_ui.thermal_hotspot_coords
-                            px, py = int(x * w_frame), int(y * h_frame)
-                            cv2.drawMarker(frame, (px, py), (0, 0, 255), cv2.MARKER_CROSS, 20, 2)
-                            temp_text = f"MAKS: {self.parent_ui.last_max_temp:.1f} C"
-                            cv2.putText(frame, temp_text, (px + 15, py - 15), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
-                        
-                        if self.parent_ui.thermal_coldspot_coords:
-                            x, y = self.parent_ui.thermal_coldspot_coords
-                            px, py = int(x * w_frame), int(y * h_frame)
-                            cv2.drawMarker(frame, (px, py), (255, 0, 0), cv2.MARKER_CROSS, 20, 2)
-                            temp_text = f"MIN: {self.parent_ui.last_min_temp:.1f} C"
-                            cv2.putText(frame, temp_text, (px + 15, py + 15), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 0, 0), 2)
-                    else:
-                        # Normal video işlemleri
-                        pass
-
-                    rgb_image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                    qt_img = QImage(rgb_image.data, w_frame, h_frame, 3 * w_frame, QImage.Format_RGB888)
-                    scaled_img = qt_img.scaled(640, 360, Qt.KeepAspectRatio)
-                    self.change_pixmap_signal.emit(scaled_img)
-            except Exception as e:
-                print(f"HATA ({self.stream_name} Thread): {e}")
-                self.connection_status_signal.emit(f"{self.stream_name}: Thread Çöktü")
-                time.sleep(5)
-            finally:
-                if cap:
-                    cap.release()
+        finally:
+            bus.remove_status_listener(report)
         print(f"{self.stream_name} video thread durdu.")
 
     def stop(self):
@@ -122,36 +122,18 @@ class ThermalDataThread(QThread):
         super().__init__()
         self._run_flag = True
         self.url = url
-        self.auth = HTTPDigestAuth(user, password)
+        # Aynı kameraya tek bağlantı: GUI, kameranın ortak termal hub'ına abone olur.
+        self.hub = ThermometryHub.for_camera(url, user, password)
+        self._status_callback = self.connection_status.emit
 
     def run(self):
-        while self._run_flag:
-            try:
-                with requests.get(self.url, auth=self.auth, stream=True, timeout=(5, 65)) as response:
-                    if response.status_code == 200:
-                        self.connection_status.emit("Termal Veri: Bağlandı")
-                        buffer = b''
-                        for chunk in response.iter_content(chunk_size=1024):
-                            if not self._run_flag: break
-                            buffer += chunk
-                            while b'--boundary' in buffer:
-                                parts = buffer.split(b'--boundary', 1)
-                                block, buffer = parts[0], parts[1]
-                                if b'Content-Type: application/json' in block:
-                                    json_start = block.find(b'{')
-                                    json_end = block.rfind(b'}')
-                                    if json_start != -1 and json_end != -1:
-                                        json_str = block[json_start:json_end+1].decode('utf-8')
-                                        try:
-                                            self.thermal_data_updated.emit(json.loads(json_str))
-                                        except json.JSONDecodeError:
-                                            pass
-                    else:
-                        self.connection_status.emit(f"Termal Veri: Hata {response.status_code}")
-                        time.sleep(5)
-            except requests.exceptions.RequestException:
-                self.connection_status.emit("Termal Veri: Bağlantı Hatası")
-                time.sleep(5)
+        self.hub.add_status_listener(self._status_callback)
+        with self.hub.subscribe() as sub:
+            while self._run_flag:
+                data = sub.get(timeout=0.5)
+                if data is not None:
+                    self.thermal_data_updated.emit(data)
+        self.hub.remove_status_listener(self._status_callback)
         print("Termal Veri Thread durdu.")
 
     def stop(self):
@@ -161,6 +143,9 @@ class ThermalDataThread(QThread):
 
 # === ANA GUI SINIFI ===
 class PTZControlApp(QWidget):
+    ptz_state_signal = pyqtSignal(object)
+    onvif_ready_signal = pyqtSignal(object)
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Kalibrasyonlu Termal PTZ Kontrol Paneli")
@@ -168,7 +153,14 @@ class PTZControlApp(QWidget):
         
         self.rotating = False
         self.ptz = None
-        self.auth = HTTPDigestAuth(CAMERA_USER, CAMERA_PASS)
+        # Tüm ISAPI çağrıları kalıcı bağlantı havuzu ve Digest nonce önbelleği olan tek istemciden geçer.
+        self.isapi = ISAPIClient.for_camera(CAMERA_IP, CAMERA_USER, CAMERA_PASS, CAMERA_PORT)
+        # PTZ konumu: hareket varken 10 Hz, boştayken yavaş nabız; durum GUI thread'ine sinyal ile gelir.
+        self.ptz_tracker = PTZTracker(self.isapi, fast_interval=PTZ_FAST_INTERVAL, idle_interval=PTZ_IDLE_INTERVAL)
+        # Ekran ana akışı (101/201) değil, ekranı dolduran en küçük alt akışı (genelde 102) çözer.
+        self.stream_profiles = StreamProfileManager(self.isapi, CAMERA_IP, CAMERA_USER, CAMERA_PASS, RTSP_PORT)
+        self.ptz_state_signal.connect(self.update_ptz_state)
+        self.ptz_tracker.add_listener(self.ptz_state_signal.emit)
         
         self.last_max_temp = 0.0
         self.last_min_temp = 0.0
@@ -177,6 +169,9 @@ class PTZControlApp(QWidget):
         self.calibrated_hotspot_coords = None
         self.calibrated_coldspot_coords = None
         self.thermal_roi_on_visible = []
+        self.current_zoom = None
+        # Termal -> görünür eşleme: ızgara bir kez sorgulanır, homografi zoom durumuna göre önbelleklenir.
+        self.calibration = ThermalVisibleCalibration(self.query_calib_point)
         self.ptz_limits = {'pan_min': 0, 'pan_max': 360, 'tilt_min': -90, 'tilt_max': 90}
         
         self.init_onvif()
@@ -190,21 +185,24 @@ class PTZControlApp(QWidget):
             threading.Timer(1.0, self.load_initial_data).start()
 
     def init_onvif(self):
-        try:
-            self.cam = ONVIFCamera(CAMERA_IP, CAMERA_PORT, CAMERA_USER, CAMERA_PASS)
-            self.ptz = self.cam.create_ptz_service()
-            media_service = self.cam.create_media_service()
-            self.profile = media_service.GetProfiles()[0]
-            self.token = self.profile.token
-            ptz_config_options = self.ptz.GetConfigurationOptions({'ConfigurationToken': self.profile.PTZConfiguration.token})
-            if ptz_config_options.Spaces and ptz_config_options.Spaces.AbsolutePanTiltPositionSpace:
-                pan_limits = ptz_config_options.Spaces.AbsolutePanTiltPositionSpace[0].XRange
-                tilt_limits = ptz_config_options.Spaces.AbsolutePanTiltPositionSpace[0].YRange
-                self.ptz_limits.update({'pan_min': pan_limits.Min, 'pan_max': pan_limits.Max, 'tilt_min': tilt_limits.Min, 'tilt_max': tilt_limits.Max})
-            print(f"ONVIF bağlantısı başarılı. Gerçek PTZ Limitleri: Pan [{self.ptz_limits['pan_min']:.2f}, {self.ptz_limits['pan_max']:.2f}], Tilt [{self.ptz_limits['tilt_min']:.2f}, {self.ptz_limits['tilt_max']:.2f}]")
-        except Exception as e:
-            print(f"ONVIF bağlantı/limit alma hatası: {e}. Varsayılan limitler kullanılacak.")
-            self.ptz = None
+        # ONVIF (WSDL ayrıştırma + SOAP çağrıları) arka planda kurulur; pencere beklemeden açılır,
+        # PTZ kontrolleri kamera hazır olunca etkinleşir.
+        self._startup_time = time.perf_counter()
+        self.onvif_ready_signal.connect(self.on_onvif_ready)
+        self.onvif_init = OnvifInitializer(max_workers=1)
+        self.onvif_init.submit(CAMERA_IP, CAMERA_IP, CAMERA_PORT, CAMERA_USER, CAMERA_PASS,
+                               on_ready=lambda key, result: self.onvif_ready_signal.emit(result))
+
+    @pyqtSlot(object)
+    def on_onvif_ready(self, result):
+        self.cam = result.camera
+        self.token = result.token
+        self.ptz_limits.update(result.limits)
+        self.ptz = result.ptz
+        self.pan_input_label.setText(f"Pan [{self.ptz_limits['pan_min']:.1f}°, {self.ptz_limits['pan_max']:.1f}°]:")
+        self.tilt_input_label.setText(f"Tilt [{self.ptz_limits['tilt_min']:.1f}°, {self.ptz_limits['tilt_max']:.1f}°]:")
+        self.ptz_main_box.setEnabled(True)
+        print(f"PTZ kontrolleri açılıştan {time.perf_counter() - self._startup_time:.2f} sn sonra hazır.")
 
     def init_ui(self):
         main_layout = QHBoxLayout()
@@ -247,6 +245,8 @@ class PTZControlApp(QWidget):
         ptz_main_layout.addLayout(ptz_directional_layout)
         ptz_main_layout.addLayout(ptz_absolute_layout)
         ptz_main_box.setLayout(ptz_main_layout)
+        ptz_main_box.setEnabled(self.ptz is not None)
+        self.ptz_main_box = ptz_main_box
 
         thermal_box = QGroupBox("Termal Ayarlar")
         thermal_layout = QVBoxLayout()
@@ -269,8 +269,17 @@ class PTZControlApp(QWidget):
         thermal_layout.addLayout(coloring_layout)
         thermal_box.setLayout(thermal_layout)
 
+        stream_stats_box = QGroupBox("Akış Durumu")
+        stream_stats_layout = QFormLayout()
+        self.normal_stats_label = QLabel("-")
+        self.thermal_stats_label = QLabel("-")
+        stream_stats_layout.addRow("Normal:", self.normal_stats_label)
+        stream_stats_layout.addRow("Termal:", self.thermal_stats_label)
+        stream_stats_box.setLayout(stream_stats_layout)
+
         right_panel_layout.addWidget(ptz_main_box)
         right_panel_layout.addWidget(thermal_box)
+        right_panel_layout.addWidget(stream_stats_box)
         right_panel_layout.addStretch()
 
         main_layout.addLayout(camera_layout)
@@ -278,8 +287,8 @@ class PTZControlApp(QWidget):
         self.setLayout(main_layout)
 
     def init_threads(self):
-        self.thread_normal = RTSPVideoThread(RTSP_URL_NORMAL, False, self)
-        self.thread_thermal = RTSPVideoThread(RTSP_URL_THERMAL, True, self)
+        self.thread_normal = RTSPVideoThread(lambda: self.stream_profiles.display_url(VISIBLE), False, self)
+        self.thread_thermal = RTSPVideoThread(lambda: self.stream_profiles.display_url(THERMAL), True, self)
         self.thread_thermal_data = ThermalDataThread(REALTIME_THERMOMETRY_URL, CAMERA_USER, CAMERA_PASS)
         
         self.thread_normal.change_pixmap_signal.connect(self.update_image1)
@@ -288,6 +297,9 @@ class PTZControlApp(QWidget):
         self.thread_normal.connection_status_signal.connect(lambda s: self.camera1_label.setText(s) if "Hata" in s or "Çöktü" in s else None)
         self.thread_thermal.connection_status_signal.connect(lambda s: self.camera2_label.setText(s) if "Hata" in s or "Çöktü" in s else None)
         
+        self.thread_normal.stream_stats_signal.connect(lambda st: self.update_stream_stats(self.normal_stats_label, st))
+        self.thread_thermal.stream_stats_signal.connect(lambda st: self.update_stream_stats(self.thermal_stats_label, st))
+        
         self.thread_thermal_data.thermal_data_updated.connect(self.update_thermal_data)
         
         self.thread_normal.start()
@@ -296,15 +308,14 @@ class PTZControlApp(QWidget):
 
     def load_initial_data(self):
         self.load_initial_thermal_rules()
-        self.ptz_status_thread_active = True
-        threading.Thread(target=self.update_ptz_status_loop, daemon=True).start()
+        self.ptz_tracker.start()
         self.roi_calib_thread_active = True
         threading.Thread(target=self.calibrate_roi_loop, daemon=True).start()
 
     def load_initial_thermal_rules(self):
         print("Mevcut hedef renklendirme kuralları yükleniyor...")
         try:
-            response = requests.get(THERMAL_ALARM_RULES_URL, auth=self.auth, timeout=3)
+            response = self.isapi.get(THERMAL_ALARM_RULES_URL, timeout=3)
             if response.status_code == 200:
                 root = ET.fromstring(response.content)
                 ns = {'isapi': 'http://www.isapi.org/ver20/XMLSchema'}
@@ -319,7 +330,7 @@ class PTZControlApp(QWidget):
     def update_thermal_coloring_rules(self):
         print("Hedef renklendirme kuralları güncelleniyor...")
         try:
-            response_get = requests.get(THERMAL_ALARM_RULES_URL, auth=self.auth, timeout=3)
+            response_get = self.isapi.get(THERMAL_ALARM_RULES_URL, timeout=3)
             if response_get.status_code != 200: return
             
             root = ET.fromstring(response_get.content)
@@ -329,26 +340,18 @@ class PTZControlApp(QWidget):
             
             updated_xml = ET.tostring(root, encoding='UTF-8')
             headers = {'Content-Type': 'application/xml'}
-            response_put = requests.put(THERMAL_ALARM_RULES_URL, auth=self.auth, data=updated_xml, headers=headers)
+            response_put = self.isapi.put(THERMAL_ALARM_RULES_URL, data=updated_xml, headers=headers)
             
             if response_put.status_code == 200: print("Hedef renklendirme başarıyla güncellendi.")
             else: print(f"Güncelleme Hatası: {response_put.status_code} - {response_put.text}")
         except Exception as e:
             print(f"Güncelleme sırasında hata: {e}")
 
-    def update_ptz_status_loop(self):
-        while getattr(self, 'ptz_status_thread_active', False):
-            try:
-                response = requests.get(PTZ_STATUS_URL, auth=self.auth, timeout=1)
-                if response.status_code == 200:
-                    root = ET.fromstring(response.content)
-                    ns = {'isapi': 'http://www.isapi.org/ver20/XMLSchema'}
-                    azimuth = float(root.find('.//isapi:azimuth', ns).text) / 10.0
-                    elevation = float(root.find('.//isapi:elevation', ns).text) / 10.0
-                    self.current_pan_label.setText(f"Mevcut P: {azimuth:.1f}°")
-                    self.current_tilt_label.setText(f"Mevcut T: {elevation:.1f}°")
-            except: pass
-            time.sleep(1)
+    @pyqtSlot(object)
+    def update_ptz_state(self, state):
+        self.current_zoom = state.zoom
+        self.current_pan_label.setText(f"Mevcut P: {state.pan:.1f}°")
+        self.current_tilt_label.setText(f"Mevcut T: {state.tilt:.1f}°")
 
     def degree_to_onvif_accurate(self, pan_deg, tilt_deg):
         pan_range = self.ptz_limits['pan_max'] - self.ptz_limits['pan_min']
@@ -375,10 +378,12 @@ class PTZControlApp(QWidget):
         req = self.ptz.create_type('ContinuousMove'); req.ProfileToken = self.token
         req.Velocity = {'PanTilt': {'x': pan, 'y': tilt}}; self.ptz.ContinuousMove(req)
         threading.Timer(0.5, lambda: self.ptz.Stop({'ProfileToken': self.token})).start()
+        self.ptz_tracker.notify_move(0.5)
     
     def toggle_rotate(self, checked):
         if not self.ptz: return
         self.rotating = checked
+        self.ptz_tracker.set_scanning(checked)
         if self.rotating: threading.Thread(target=self.rotate_loop, daemon=True).start()
         else: self.ptz.Stop({'ProfileToken': self.token})
 
@@ -395,6 +400,7 @@ class PTZControlApp(QWidget):
             req = self.ptz.create_type('AbsoluteMove'); req.ProfileToken = self.token
             req.Position = {'PanTilt': {'x': onvif_pan, 'y': onvif_tilt}}
             self.ptz.AbsoluteMove(req)
+            self.ptz_tracker.notify_move()
         except Exception as e: print(f"Pozisyonlama hatası: {e}")
             
     @pyqtSlot(QImage)
@@ -403,6 +409,13 @@ class PTZControlApp(QWidget):
     @pyqtSlot(QImage)
     def update_image2(self, qt_img): self.camera2_label.setPixmap(QPixmap.fromImage(qt_img))
 
+    def update_stream_stats(self, label, stats):
+        # Gecikme: grab -> ekran; akış: kameranın zaman damgasının ne kadar gerisindeyiz.
+        label.setText(f"Gecikme {stats['latency_ms']:.0f} ms (maks {stats['latency_max_ms']:.0f}), "
+                      f"akış {stats['stream_lag_ms']:.0f} ms, atlanan kare {stats['dropped']}\n"
+                      f"Ekran: küçültme {stats['resize_ms']:.1f} ms + renk {stats['convert_ms']:.1f} ms "
+                      f"+ bindirme {stats.get('overlay_ms', 0.0):.1f} ms")
+
     @pyqtSlot(dict)
     def update_thermal_data(self, data):
         try:
@@ -427,38 +440,55 @@ class PTZControlApp(QWidget):
 
             if coldspot_node: self.thermal_coldspot_coords = (coldspot_node.get('positionX', 0), coldspot_node.get('positionY', 0))
             else: self.thermal_coldspot_coords = None
+
+            # Görünür kamera üzerindeki karşılıklar yerel homografi ile hesaplanır (ağ isteği yok).
+            self.calibrated_hotspot_coords = self.calibration.map_point(*self.thermal_hotspot_coords) if self.thermal_hotspot_coords else None
+            self.calibrated_coldspot_coords = self.calibration.map_point(*self.thermal_coldspot_coords) if self.thermal_coldspot_coords else None
         except Exception as e: print(f"Termal JSON işleme hatası: {e}")
             
     def calibrate_roi_loop(self):
+        # Köşeler her saniye kameraya sorulmaz; homografi sadece zoom değişince veya süre dolunca yenilenir.
         thermal_corners = [(0, 0), (1, 0), (1, 1), (0, 1)]
         while getattr(self, 'roi_calib_thread_active', False):
-            visible_corners = [self.calibrate_point(tx, ty) for tx, ty in thermal_corners]
-            self.thermal_roi_on_visible = visible_corners
+            if self.calibration.update(zoom=self.current_zoom):
+                visible_corners = self.calibration.map_points(thermal_corners)
+                self.thermal_roi_on_visible = [(int(x * 1000), int(y * 1000)) for x, y in visible_corners]
             time.sleep(1)
 
-    def calibrate_point(self, thermal_x, thermal_y):
+    def query_calib_point(self, thermal_x, thermal_y):
+        """Kameraya tek bir noktanın görünür karşılığını sorar (0..1000 ölçeği); başarısızsa None."""
         xml_request = f"<PointRelation><srcPoint><positionX>{int(thermal_x*1000)}</positionX><positionY>{int(thermal_y*1000)}</positionY></srcPoint></PointRelation>"
         headers = {'Content-Type': 'application/xml'}
         try:
-            response = requests.post(CALIB_POINT_RELATION_URL, auth=self.auth, data=xml_request, headers=headers, timeout=0.5)
+            response = self.isapi.post(CALIB_POINT_RELATION_URL, data=xml_request, headers=headers, timeout=0.5)
             if response.status_code == 200:
                 root = ET.fromstring(response.content)
                 ns = {'isapi': 'http://www.isapi.org/ver20/XMLSchema'}
                 dest_point = root.find('isapi:destPoint', ns)
-                if dest_point: return (int(dest_point.find('isapi:positionX', ns).text), int(dest_point.find('isapi:positionY', ns).text))
-        except: return (int(thermal_x*1000), int(thermal_y*1000))
-        return (int(thermal_x*1000), int(thermal_y*1000))
+                if dest_point is not None:
+                    return (int(dest_point.find('isapi:positionX', ns).text), int(dest_point.find('isapi:positionY', ns).text))
+        except Exception:
+            return None
+        return None
+
+    def calibrate_point(self, thermal_x, thermal_y):
+        mapped = self.calibration.map_point(thermal_x, thermal_y)
+        if mapped is not None:
+            return (int(mapped[0] * 1000), int(mapped[1] * 1000))
+        return self.query_calib_point(thermal_x, thermal_y) or (int(thermal_x*1000), int(thermal_y*1000))
 
     def closeEvent(self, event):
         print("Uygulama kapatılıyor...")
-        self.ptz_status_thread_active = False
+        self.ptz_tracker.stop()
         self.roi_calib_thread_active = False
         self.rotating = False
         if self.ptz: self.ptz.Stop({'ProfileToken': self.token})
+        self.onvif_init.shutdown()
         
         self.thread_normal.stop()
         self.thread_thermal.stop()
         self.thread_thermal_data.stop()
+        print("ISAPI gecikme özeti:\n" + self.isapi.latency.summary())
         
         event.accept()
 
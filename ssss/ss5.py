@@ -15,6 +15,11 @@ from PyQt5.QtCore import Qt, QThread, pyqtSignal, pyqtSlot
 from onvif import ONVIFCamera
 from requests.auth import HTTPDigestAuth
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from ortak.isapi_client import ISAPIClient
+from ortak.hotspot_blobs import HotspotDetector
+from ortak.pixel_data import PixelDataStream
+
 # ÇÖZÜM: OpenCV'nin RTSP için TCP kullanmasını sağla (H.264 hatalarını azaltır)
 os.environ["OPENCV_FFMPEG_CAPTURE_OPTIONS"] = "rtsp_transport;tcp"
 
@@ -30,9 +35,9 @@ RTSP_URL_THERMAL = f'rtsp://{CAMERA_USER}:{CAMERA_PASS}@{CAMERA_IP}:554/Streamin
 THERMAL_ALARM_RULES_URL = f'http://{CAMERA_IP}/ISAPI/Thermal/channels/2/thermometry/1/alarmRules'
 PTZ_STATUS_URL = f'http://{CAMERA_IP}/ISAPI/PTZCtrl/channels/1/status'
 
-# Termal sensörün gerçek çözünürlüğü (Kamera modelinize göre güncelleyin)
-THERMAL_SENSOR_WIDTH = 640
-THERMAL_SENSOR_HEIGHT = 512
+# Sıcak bölge eşiği kameradaki kırmızı renklendirme kuralından okunana kadar kullanılır.
+DEFAULT_HOT_THRESHOLD = 60.0
+HOTSPOT_MIN_AREA = 4
 
 
 # === Hata Yönetimli Video Thread ===
@@ -87,26 +92,33 @@ class RTSPVideoThread(QThread):
         self._run_flag = False
         self.wait()
 
-# === Pixel-to-Pixel Sıcaklık Verisini Çekmek İçin Thread (Simülasyonlu) ===
+# === Pixel-to-Pixel Sıcaklık Verisini Çekmek İçin Thread ===
 class PixelDataThread(QThread):
+    # (yükseklik, genişlik) float32 °C matrisi; çözünürlük kameranın bildirdiği değerdir.
     pixel_data_ready = pyqtSignal(np.ndarray)
+    # Karedeki sıcak bölgeler, BLOB_DTYPE dizisi (en sıcaktan soğuğa).
+    hotspots_ready = pyqtSignal(np.ndarray)
+    connection_status_signal = pyqtSignal(str)
 
     def __init__(self):
         super().__init__()
-        self._run_flag = True
+        isapi = ISAPIClient.for_camera(CAMERA_IP, CAMERA_USER, CAMERA_PASS, CAMERA_PORT)
+        self.stream = PixelDataStream(isapi)
+        self.hotspots = HotspotDetector(DEFAULT_HOT_THRESHOLD, min_area=HOTSPOT_MIN_AREA)
 
     def run(self):
-        # Bu thread, gerçek bir sistemde kameranın pixelToPixelData endpoint'inden
-        # ham termal veriyi çekmelidir. Şimdilik simülasyon yapılıyor.
-        while self._run_flag:
-            width, height = THERMAL_SENSOR_WIDTH, THERMAL_SENSOR_HEIGHT
-            # Simülasyon: Sıcaklık değerleri Celsius * 100 olarak (örn. 25.50 C -> 2550)
-            simulated_data = np.random.randint(2200, 5000, size=(height, width)).astype(np.uint16)
-            self.pixel_data_ready.emit(simulated_data)
-            time.sleep(0.5)
+        # Kareler kameranın kendi hızında gelir; her biri doğrudan GUI'ye iletilir.
+        self.stream.add_status_listener(self.connection_status_signal.emit)
+        self.stream.add_listener(lambda frame: self.pixel_data_ready.emit(frame.matrix))
+        # Bölge çıkarma akış thread'inde yapılır; GUI'ye sadece küçük kayıt dizisi gider.
+        self.hotspots.add_listener(lambda frame, blobs: self.hotspots_ready.emit(blobs))
+        self.stream.add_listener(self.hotspots.process)
+        self.stream.start()
+        self.exec_()
 
     def stop(self):
-        self._run_flag = False
+        self.stream.stop()
+        self.quit()
         self.wait()
 
 
@@ -203,12 +215,15 @@ class PTZControlApp(QWidget):
         self.cursor_temp_label = QLabel("-")
         self.hot_area_temp_label = QLabel("-")
         self.cold_area_temp_label = QLabel("-")
+        self.hotspot_label = QLabel("-")
         temp_info_layout.addRow("İmleç Sıcaklığı:", self.cursor_temp_label)
         temp_info_layout.addRow("Sıcak Alan Ort.:", self.hot_area_temp_label)
         temp_info_layout.addRow("Soğuk Alan Ort.:", self.cold_area_temp_label)
+        temp_info_layout.addRow("Sıcak Bölgeler:", self.hotspot_label)
         
         coloring_layout = QFormLayout()
         self.above_thresh_input = QLineEdit()
+        self.above_thresh_input.editingFinished.connect(self.update_hotspot_threshold)
         self.between_min_input = QLineEdit()
         self.between_max_input = QLineEdit()
         update_coloring_btn = QPushButton("Hedef Renklendirmeyi Güncelle")
@@ -242,6 +257,8 @@ class PTZControlApp(QWidget):
         self.thread_thermal.connection_status_signal.connect(lambda status: self.camera2_label.setText(status) if "Hata" in status else None)
         
         self.thread_pixel_data.pixel_data_ready.connect(self.update_pixel_data_matrix)
+        self.thread_pixel_data.hotspots_ready.connect(self.update_hotspots)
+        self.thread_pixel_data.connection_status_signal.connect(lambda status: print(status))
         
         self.thread_normal.start()
         self.thread_thermal.start()
@@ -260,7 +277,9 @@ class PTZControlApp(QWidget):
                 root = ET.fromstring(response.content)
                 ns = {'isapi': 'http://www.isapi.org/ver20/XMLSchema'}
                 above_node = root.find('.//isapi:ThermometryAlarmMode[isapi:rule="highestGreater"]/isapi:alarm', ns)
-                if above_node is not None: self.above_thresh_input.setText(above_node.text)
+                if above_node is not None:
+                    self.above_thresh_input.setText(above_node.text)
+                    self.update_hotspot_threshold()
 
                 print("Hedef renklendirme kuralları başarıyla yüklendi.")
             else:
@@ -370,13 +389,14 @@ class PTZControlApp(QWidget):
     def update_image2(self, qt_img): self.camera2_label.setPixmap(QPixmap.fromImage(qt_img))
 
     @pyqtSlot(np.ndarray)
-    def update_pixel_data_matrix(self, data_matrix):
-        self.pixel_data_matrix = data_matrix
-        if data_matrix is not None:
-            temps_celsius = data_matrix.astype(np.float32) / 100.0
-            self.last_max_temp = np.max(temps_celsius)
-            max_index = np.unravel_index(np.argmax(data_matrix, axis=None), data_matrix.shape)
-            self.hotspot_coords = (max_index[1] / THERMAL_SENSOR_WIDTH, max_index[0] / THERMAL_SENSOR_HEIGHT)
+    def update_pixel_data_matrix(self, temps_celsius):
+        # Matris zaten °C cinsinden float32; ölçek/ofset çözme aşamasında uygulandı.
+        self.pixel_data_matrix = temps_celsius
+        if temps_celsius is not None:
+            height, width = temps_celsius.shape
+            max_index = np.unravel_index(np.argmax(temps_celsius, axis=None), temps_celsius.shape)
+            self.last_max_temp = float(temps_celsius[max_index])
+            self.hotspot_coords = (max_index[1] / width, max_index[0] / height)
             try:
                 above_thresh = float(self.above_thresh_input.text())
                 hot_pixels = temps_celsius[temps_celsius > above_thresh]
@@ -388,14 +408,30 @@ class PTZControlApp(QWidget):
                 self.hot_area_temp_label.setText("Geçersiz Eşik")
                 self.cold_area_temp_label.setText("Geçersiz Eşik")
     
+    def update_hotspot_threshold(self):
+        try:
+            self.thread_pixel_data.hotspots.set_threshold(float(self.above_thresh_input.text()))
+        except (ValueError, AttributeError):
+            pass
+
+    @pyqtSlot(np.ndarray)
+    def update_hotspots(self, blobs):
+        if len(blobs) == 0:
+            self.hotspot_label.setText("-")
+            return
+        top = blobs[0]
+        self.hotspot_label.setText(f"{len(blobs)} bölge, en sıcak {top['max']:.1f} °C "
+                                   f"(ort. {top['mean']:.1f} °C, {top['area']} px)")
+
     def thermal_image_mouse_move(self, event):
         if self.pixel_data_matrix is None: return
         x, y = event.pos().x(), event.pos().y()
         label_w, label_h = self.camera2_label.width(), self.camera2_label.height()
-        sensor_x = int((x / label_w) * THERMAL_SENSOR_WIDTH)
-        sensor_y = int((y / label_h) * THERMAL_SENSOR_HEIGHT)
-        if 0 <= sensor_x < THERMAL_SENSOR_WIDTH and 0 <= sensor_y < THERMAL_SENSOR_HEIGHT:
-            actual_temp = self.pixel_data_matrix[sensor_y, sensor_x] / 100.0
+        height, width = self.pixel_data_matrix.shape
+        sensor_x = int((x / label_w) * width)
+        sensor_y = int((y / label_h) * height)
+        if 0 <= sensor_x < width and 0 <= sensor_y < height:
+            actual_temp = self.pixel_data_matrix[sensor_y, sensor_x]
             self.cursor_temp_label.setText(f"{actual_temp:.1f} °C")
 
     def closeEvent(self, event):
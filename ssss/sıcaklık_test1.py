@@ -1,75 +1,79 @@
-import requests
+import os
+import sys
+import time
+
 import numpy as np
-from requests.auth import HTTPDigestAuth
+import requests
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from ortak.isapi_client import ISAPIClient
+from ortak.multipart_parser import MultipartStreamParser
+from ortak.pixel_data import PIXEL_DATA_PATH, decode_temperature_payload, iter_temperature_frames, payload_layout
 
 # === KAMERA BİLGİLERİ ===
 CAMERA_IP = '192.168.1.64'
 CAMERA_USER = 'admin'
 CAMERA_PASS = 'ErenEnerji'
 
-# Test edilecek ISAPI uç noktası
-PIXEL_DATA_URL = f'http://{CAMERA_IP}/ISAPI/Thermal/channels/2/thermometry/pixelToPixelData' 
+# Multipart akışta kaç kare okunup hız ölçüleceği
+FRAME_COUNT = 10
+
+
+def print_matrix_summary(temps_celsius):
+    print(f"Matris boyutu: {temps_celsius.shape} ({temps_celsius.dtype})")
+    print("\n--- Örnek Sıcaklık Değerleri ---")
+    print(f"Min Sıcaklık: {np.min(temps_celsius):.2f} °C")
+    print(f"Maks Sıcaklık: {np.max(temps_celsius):.2f} °C")
+    print(f"Ort. Sıcaklık: {np.mean(temps_celsius):.2f} °C")
+
 
 def test_thermal_data():
     """ISAPI'den pixel-to-pixel verisini almayı dener ve analiz eder."""
-    print(f"Bağlanılan URL: {PIXEL_DATA_URL}")
-    auth = HTTPDigestAuth(CAMERA_USER, CAMERA_PASS)
-    
+    isapi = ISAPIClient.for_camera(CAMERA_IP, CAMERA_USER, CAMERA_PASS)
+    print(f"Bağlanılan URL: {isapi.url(PIXEL_DATA_PATH)}")
+
     try:
-        # GET isteği gönder. Timeout süresini artırabilirsiniz.
-        response = requests.get(PIXEL_DATA_URL, auth=auth, timeout=5)
-        
-        print(f"HTTP Durum Kodu: {response.status_code}")
-        print("--- Yanıt Başlıkları (Headers) ---")
-        for key, value in response.headers.items():
-            print(f"{key}: {value}")
-        print("---------------------------------")
+        with isapi.get(PIXEL_DATA_PATH, stream=True, timeout=(5, 30)) as response:
+            print(f"HTTP Durum Kodu: {response.status_code}")
+            print("--- Yanıt Başlıkları (Headers) ---")
+            for key, value in response.headers.items():
+                print(f"{key}: {value}")
+            print("---------------------------------")
+
+            if response.status_code != 200:
+                print(f"\nHata İçeriği:\n{response.text}")
+                return
 
-        if response.status_code == 200:
-            # Yanıt başarılıysa içeriği analiz et
             content_type = response.headers.get('Content-Type', '')
             print(f"\nİçerik Tipi: {content_type}")
-            
-            # Yanıt bir resim ve ek data içeriyorsa (multipart)
-            if 'multipart' in content_type:
-                print("Multipart yanıt algılandı. Sınır (boundary) ile ayrıştırma denenmeli.")
-                # Bu kısım daha karmaşık bir ayrıştırma gerektirir.
-                # Şimdilik sadece içeriğin ilk 500 byte'ını gösterelim.
-                print(f"İçeriğin başı: {response.content[:500]}")
 
-            # Yanıt sadece ham binary veri ise
+            if 'multipart' in content_type:
+                print("Multipart yanıt algılandı.")
+                parser = MultipartStreamParser.from_content_type(content_type)
+                start, count = time.time(), 0
+                for frame in iter_temperature_frames(parser, response.iter_content(chunk_size=65536)):
+                    count += 1
+                    if count == 1:
+                        print(f"Meta veri: {frame.meta}")
+                        print_matrix_summary(frame.matrix)
+                    if count >= FRAME_COUNT:
+                        break
+                elapsed = time.time() - start
+                if count > 1 and elapsed > 0:
+                    print(f"\n{count} kare {elapsed:.2f} sn'de alındı ({count / elapsed:.1f} FPS)")
             else:
                 print("Ham binary veri algılandı.")
-                # Veriyi 16-bit unsigned integer dizisine dönüştürmeyi dene
-                # Byte sırası ('<': little-endian, '>': big-endian) önemli olabilir.
+                body = response.content
                 try:
-                    data_array = np.frombuffer(response.content, dtype=np.uint16)
-                    print(f"Başarıyla numpy dizisine dönüştürüldü. Toplam eleman sayısı: {data_array.size}")
-                    
-                    # Varsayımsal çözünürlüğe göre yeniden şekillendir
-                    width, height = THERMAL_SENSOR_WIDTH, THERMAL_SENSOR_HEIGHT
-                    if data_array.size == width * height:
-                        temp_matrix = data_array.reshape((height, width))
-                        print(f"Matris boyutu: {temp_matrix.shape}")
-                        
-                        # Sıcaklık dönüşümünü yap (Varsayım: Celsius = Değer / 100)
-                        temps_celsius = temp_matrix.astype(np.float32) / 100.0
-                        
-                        print("\n--- Örnek Sıcaklık Değerleri ---")
-                        print(f"Min Sıcaklık: {np.min(temps_celsius):.2f} °C")
-                        print(f"Maks Sıcaklık: {np.max(temps_celsius):.2f} °C")
-                        print(f"Ort. Sıcaklık: {np.mean(temps_celsius):.2f} °C")
-                    else:
-                        print(f"HATA: Beklenen piksel sayısı ({width*height}) ile gelen veri boyutu ({data_array.size}) uyuşmuyor.")
-                
-                except Exception as e:
-                    print(f"Numpy'a dönüştürme hatası: {e}")
-
-        else:
-            print(f"\nHata İçeriği:\n{response.text}")
+                    layout = payload_layout(None, dict(response.headers), len(body))
+                except ValueError as e:
+                    print(f"HATA: {e}")
+                    return
+                print(f"Algılanan biçim: {layout}")
+                print_matrix_summary(decode_temperature_payload(body, layout))
 
     except requests.exceptions.RequestException as e:
         print(f"\nBağlantı Hatası: {e}")
 
 if __name__ == "__main__":
-    test_thermal_data()
\ No newline at end of file
+    test_thermal_data()
@@ -0,0 +1,65 @@
+# test_alarm_engine.py
+
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from ortak.alarm_engine import AlarmEngine, AlarmSettings, CLOSED, OPENED
+
+
+def upload(temperature, x=0.5, y=0.5, rule_id=1):
+    return {
+        'ruleID': rule_id,
+        'LinePolygonThermCfg': {'MaxTemperature': temperature},
+        'HighestPoint': {'positionX': x, 'positionY': y},
+    }
+
+
+class AlarmEngineTest(unittest.TestCase):
+
+    def feed(self, engine, temperatures, start=0.0, step=1.0):
+        transitions = []
+        for i, temperature in enumerate(temperatures):
+            transition = engine.update('kamera', upload(temperature), start + i * step)
+            if transition is not None and transition.kind in (OPENED, CLOSED):
+                transitions.append((transition.kind, start + i * step, temperature))
+        return transitions
+
+    def test_ramp_below_threshold_stays_one_incident(self):
+        # 3 °C/sn rampa: eşiğin altında yükselme hızıyla açılır, eşiği geçip tırmanırken kapanmamalı.
+        engine = AlarmEngine(AlarmSettings(threshold=75.0, rise_rate=2.0, clear_duration=10.0))
+        transitions = self.feed(engine, [20.0 + 3.0 * i for i in range(30)])
+        self.assertEqual([kind for kind, _, _ in transitions], [OPENED])
+        self.assertEqual(len(engine.incidents), 1)
+        incident = next(iter(engine.incidents.values()))
+        self.assertEqual(incident.trigger, 'rise_rate')
+        self.assertLess(incident.opened_temperature, 75.0 - 5.0)
+
+    def test_rate_incident_closes_after_cooling_below_opening(self):
+        engine = AlarmEngine(AlarmSettings(threshold=75.0, rise_rate=2.0, clear_duration=10.0))
+        ramp = [20.0 + 3.0 * i for i in range(10)]
+        transitions = self.feed(engine, ramp + [20.0] * 15)
+        self.assertEqual([kind for kind, _, _ in transitions], [OPENED, CLOSED])
+        self.assertFalse(engine.incidents)
+
+    def test_hotspot_jumping_cells_stays_one_incident(self):
+        engine = AlarmEngine(AlarmSettings(threshold=75.0, min_duration=0.0))
+        first = engine.update('kamera', upload(90.0, x=0.1, y=0.1), 0.0)
+        jumped = engine.update('kamera', upload(92.0, x=0.9, y=0.9), 1.0)
+        other_rule = engine.update('kamera', upload(92.0, x=0.9, y=0.9, rule_id=2), 1.0)
+        self.assertEqual(first.kind, OPENED)
+        self.assertNotEqual(getattr(jumped, 'kind', None), OPENED)
+        self.assertEqual(other_rule.kind, OPENED)
+        self.assertEqual(len(engine.incidents), 2)
+        self.assertEqual(len(first.incident.cells), 2)
+
+    def test_threshold_incident_clears_at_hysteresis(self):
+        engine = AlarmEngine(AlarmSettings(threshold=75.0, min_duration=3.0, clear_duration=10.0))
+        transitions = self.feed(engine, [80.0] * 5 + [69.0] * 12)
+        self.assertEqual([kind for kind, _, _ in transitions], [OPENED, CLOSED])
+        self.assertEqual(transitions[1][1] - 5.0, 10.0)
+
+
+if __name__ == '__main__':
+    unittest.main()